@@ -0,0 +1,151 @@
+"""
+Compare the threaded Flask-SocketIO server with the asyncio server.
+
+Starts the chosen server in a subprocess, opens `--clients` Socket.IO
+connections that each join their own room, then measures the round trip of
+`request_player_list` -> `player_list_snapshot` across all of them. Reports
+connect time, event latency percentiles and the server's resident memory.
+Needs the `socketio` async client (python-socketio with aiohttp, see
+requirements-dev.txt); memory is read from /proc, so it runs on Linux.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_async --mode sync async --clients 100 500
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import socketio
+
+SERVER = """
+import sys
+from segments.audio import SilentAudio
+port = int(sys.argv[2])
+if sys.argv[1] == "async":
+    import uvicorn
+    from server.async_app import create_async_app
+    app, _ = create_async_app(metrics_enabled=False, audio=SilentAudio())
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="error")
+else:
+    from server.app import create_app
+    app, socketio = create_app(metrics_enabled=False)
+    socketio.run(app, host="127.0.0.1", port=port, allow_unsafe_werkzeug=True)
+"""
+
+
+def rss_mb(pid):
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def wait_for_port(port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+    raise RuntimeError(f"Server did not start on port {port}")
+
+
+async def open_client(url, index):
+    client = socketio.AsyncClient(reconnection=False)
+    joined = asyncio.get_running_loop().create_future()
+    client.on("player_data", lambda data: joined.done() or joined.set_result(data))
+    # The room in the query string is what the cluster router routes on
+    await client.connect(f"{url}?room=r{index}", transports=["websocket"])
+    await client.emit("add_player", {"name": f"bench_{index}", "room": f"r{index}"})
+    await asyncio.wait_for(joined, 10)
+    return client
+
+
+async def round_trip(client):
+    reply = asyncio.get_running_loop().create_future()
+    client.on("player_list_snapshot", lambda data: reply.done() or reply.set_result(0))
+    start = time.perf_counter()
+    await client.emit("request_player_list", {})
+    await asyncio.wait_for(reply, 10)
+    return time.perf_counter() - start
+
+
+async def measure(url, clients, rounds):
+    start = time.perf_counter()
+    connected = await asyncio.gather(*(open_client(url, i) for i in range(clients)))
+    connect_seconds = time.perf_counter() - start
+
+    latencies = []
+    for _ in range(rounds):
+        latencies += await asyncio.gather(*(round_trip(c) for c in connected))
+    await asyncio.gather(*(c.disconnect() for c in connected))
+    # Let aiohttp release its connections before the loop closes
+    await asyncio.sleep(0.25)
+    return connect_seconds, latencies
+
+
+async def wait_and_measure(port, clients, rounds):
+    await wait_for_port(port)
+    return await measure(f"http://127.0.0.1:{port}", clients, rounds)
+
+
+def run(mode, clients, rounds, port):
+    server = subprocess.Popen(
+        [sys.executable, "-c", SERVER, mode, str(port)],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        # Werkzeug logs every request and a traceback per closed websocket
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        connect_seconds, latencies = asyncio.run(
+            wait_and_measure(port, clients, rounds)
+        )
+        return {
+            "connect_seconds": connect_seconds,
+            "p50_ms": percentile(latencies, 0.50) * 1e3,
+            "p99_ms": percentile(latencies, 0.99) * 1e3,
+            "rss_mb": rss_mb(server.pid),
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mode", nargs="+", default=["sync", "async"])
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--port", type=int, default=5099)
+    args = parser.parse_args()
+
+    print(
+        f"{'mode':>6} {'clients':>8} {'connect s':>10} {'p50 ms':>8} "
+        f"{'p99 ms':>8} {'RSS MB':>8}"
+    )
+    for clients in args.clients:
+        for mode in args.mode:
+            result = run(mode, clients, args.rounds, args.port)
+            print(
+                f"{mode:>6} {clients:>8} {result['connect_seconds']:>10.2f} "
+                f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+                f"{result['rss_mb']:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
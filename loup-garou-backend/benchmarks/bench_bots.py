@@ -0,0 +1,106 @@
+"""
+Drive bot-only tables through the real handlers and measure throughput.
+
+Every room is filled with bots of one policy and a standard role mix, then
+played to the end by the BotDriver: each decision goes through GameEvents and
+SegmentManager exactly as a client's would, with a counting emitter instead
+of sockets and instant narration. Reports bot actions per second and games
+per second for each policy.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_bots --rooms 100 --players 12
+"""
+
+import argparse
+import random
+import time
+from collections import deque
+
+from segments.audio import SilentAudio
+from server.bots import BotDriver
+from server.events import GameEvents
+from server.rooms import RoomRegistry
+from simulation.headless import default_roles
+from simulation.policies import POLICIES
+
+
+class QueueEmitter:
+    """Counts emits and runs `call_later` callbacks from a queue, in order."""
+
+    def __init__(self):
+        self.emits = 0
+        self.server = self
+        self.later = deque()
+
+    def emit(self, *args, **kwargs):
+        self.emits += 1
+
+    def enter_room(self, *args, **kwargs):
+        pass
+
+    def leave_room(self, *args, **kwargs):
+        pass
+
+    def sleep(self, seconds):
+        pass
+
+    def call_later(self, delay, callback):
+        self.later.append(callback)
+
+    def run(self, limit):
+        ran = 0
+        while self.later and ran < limit:
+            self.later.popleft()()
+            ran += 1
+        return ran
+
+
+def run(policy, room_count, players, seed, max_batches):
+    emitter = QueueEmitter()
+    rooms = RoomRegistry(emitter, audio=SilentAudio())
+    events = GameEvents(rooms, None, emitter)
+    events.define_handlers()
+    events.bots = BotDriver(events, think_time=0, seed=seed)
+    rng = random.Random(seed)
+    roles = default_roles(players)
+    start = time.perf_counter()
+    for r in range(room_count):
+        room = rooms.get_or_create(f"room_{r}", seed=rng.getrandbits(32))
+        events.seat_bots(room, players, policy, start=False)
+        dealt = list(roles)
+        rng.shuffle(dealt)
+        events.start_game(room, dealt)
+    batches = emitter.run(max_batches)
+    elapsed = time.perf_counter() - start
+    finished = sum(1 for room in rooms.rooms.values() if room.game.winners)
+    return events.bots.actions, finished, batches, emitter.emits, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--policies", nargs="+", default=list(POLICIES))
+    parser.add_argument("--rooms", type=int, default=100)
+    parser.add_argument("--players", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-batches", type=int, default=100000)
+    args = parser.parse_args()
+
+    bots = args.rooms * args.players
+    print(f"{args.rooms} rooms, {bots} bots")
+    print(
+        f"{'policy':>12} {'finished':>9} {'batches':>8} {'actions':>8}"
+        f" {'actions/s':>10} {'games/s':>8} {'emits':>8}"
+    )
+    for policy in args.policies:
+        actions, finished, batches, emits, elapsed = run(
+            policy, args.rooms, args.players, args.seed, args.max_batches
+        )
+        print(
+            f"{policy:>12} {finished:>9} {batches:>8} {actions:>8}"
+            f" {actions / elapsed:>10.0f} {finished / elapsed:>8.1f} {emits:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Measure how event throughput scales with the number of worker processes.
+
+Starts `python main.py --workers N`-style clusters (router, bus and workers)
+in a subprocess, then drives them from `--client-procs` client processes,
+each holding `--clients` connections spread over distinct rooms and sending
+`request_player_list` round trips back to back. Scaling is only meaningful
+with at least as many cores as workers plus client processes.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_cluster --workers 1 2 4 --clients 50
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.bench_async import open_client, round_trip, wait_for_port
+
+SERVER = """
+import sys
+from server.cluster import run_cluster
+run_cluster(int(sys.argv[1]), host="127.0.0.1", port=int(sys.argv[2]),
+            base_port=int(sys.argv[2]) + 1, metrics_enabled=False)
+"""
+
+
+async def drive(port, first_index, clients, rounds):
+    url = f"http://127.0.0.1:{port}"
+    connected = await asyncio.gather(
+        *(open_client(url, first_index + i) for i in range(clients))
+    )
+
+    async def loop(client):
+        for _ in range(rounds):
+            await round_trip(client)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(loop(c) for c in connected))
+    elapsed = time.perf_counter() - start
+    await asyncio.gather(*(c.disconnect() for c in connected))
+    await asyncio.sleep(0.25)
+    return elapsed
+
+
+def client_process(port, first_index, clients, rounds, results):
+    results.put(asyncio.run(drive(port, first_index, clients, rounds)))
+
+
+def run(workers, client_procs, clients, rounds, port):
+    server = subprocess.Popen(
+        [sys.executable, "-c", SERVER, str(workers), str(port)],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        asyncio.run(wait_for_port(port))
+        for offset in range(workers):
+            asyncio.run(wait_for_port(port + 1 + offset))
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(
+                target=client_process,
+                args=(port, p * clients, clients, rounds, results),
+            )
+            for p in range(client_procs)
+        ]
+        for process in processes:
+            process.start()
+        elapsed = max(results.get() for _ in processes)
+        for process in processes:
+            process.join()
+        return client_procs * clients * rounds / elapsed
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--client-procs", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--port", type=int, default=5200)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'events/s':>10} {'speedup':>8}  ({os.cpu_count()} cores)")
+    baseline = None
+    for workers in args.workers:
+        throughput = run(
+            workers, args.client_procs, args.clients, args.rounds, args.port
+        )
+        baseline = baseline or throughput
+        print(f"{workers:>8} {throughput:>10.0f} {throughput / baseline:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
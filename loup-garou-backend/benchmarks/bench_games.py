@@ -0,0 +1,60 @@
+"""
+Regression benchmark: play complete headless games through Game and
+SegmentManager and report throughput and per-phase timings.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_games --games 2000 --players 8 --seed 0
+"""
+
+import argparse
+import time
+from collections import Counter, defaultdict
+
+from core.logs import setup_logging
+from simulation.headless import simulate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--players", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--log-level", help="write the game's logs at this level, e.g. DEBUG"
+    )
+    args = parser.parse_args()
+    if args.log_level:
+        setup_logging(args.log_level)
+
+    start = time.perf_counter()
+    results = simulate(args.games, args.players, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    emits = sum(r.emits for r in results)
+    actions = sum(r.actions for r in results)
+    winners = Counter(r.winners for r in results)
+    phase_seconds = defaultdict(float)
+    phase_calls = defaultdict(int)
+    for result in results:
+        for phase, seconds in result.phase_seconds.items():
+            phase_seconds[phase] += seconds
+            phase_calls[phase] += result.phase_calls[phase]
+
+    print(f"games:      {len(results)} in {elapsed:.2f}s")
+    print(f"games/sec:  {len(results) / elapsed:.1f}")
+    print(f"events/sec: {(emits + actions) / elapsed:.1f} ({emits} emits, {actions} actions)")
+    print(f"avg days:   {sum(r.days for r in results) / len(results):.2f}")
+    print(f"winners:    {dict(winners)}")
+    print()
+    print(f"{'phase':<20} {'calls':>8} {'avg us':>10} {'total s':>10}")
+    for phase in sorted(phase_seconds, key=phase_seconds.get, reverse=True):
+        calls = phase_calls[phase]
+        print(
+            f"{phase:<20} {calls:>8} {phase_seconds[phase] / calls * 1e6:>10.1f} "
+            f"{phase_seconds[phase]:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Measure the memory held per player and per game.
+
+Compares the slotted Player with the previous `__dict__`-backed dataclass,
+both with their serialized form cached, then fills games of `--per-game`
+players until `--players` are held in one process.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_players --players 1000 10000 50000
+"""
+
+import argparse
+import gc
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Optional
+
+from core.game import Game
+from core.player import Player
+from core.roles import PlayerRole
+
+
+@dataclass
+class DictPlayer:
+    """The Player record before it was slotted."""
+
+    name: str
+    sid: str
+    role: Optional[PlayerRole] = None
+    is_alive: bool = True
+    lover_sid: Optional[str] = None
+    death_cause: Optional[str] = None
+    _dict: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name != "_dict":
+            object.__setattr__(self, "_dict", None)
+
+    to_dict = Player.to_dict
+
+
+def traced(build):
+    """Bytes allocated by `build()` and still alive once it returns."""
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    kept = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current - baseline
+
+
+def players(cls, count, names, sids):
+    built = [cls(name, sid, role=PlayerRole.VILLAGER) for name, sid in zip(names, sids)]
+    for player in built:
+        player.to_dict()
+    return built
+
+
+def games(count, per_game):
+    built = []
+    for g in range(count // per_game):
+        game = Game(seed=g)
+        for p in range(per_game):
+            game.add_player(f"Player {p}", f"game_{g}_player_{p:04d}")
+        built.append(game)
+    return built
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--players", type=int, nargs="+", default=[1000, 10000, 50000]
+    )
+    parser.add_argument("--per-game", type=int, default=10)
+    args = parser.parse_args()
+
+    print(
+        f"{'players':>8} {'dict B/player':>14} {'slots B/player':>15}"
+        f" {'B/game':>8} {'game MiB':>9}"
+    )
+    for count in args.players:
+        # Strings are shared between both runs so only the records are counted
+        names = [f"Player {i}" for i in range(count)]
+        sids = [f"sid_{i:08d}" for i in range(count)]
+        old = traced(lambda: players(DictPlayer, count, names, sids))
+        new = traced(lambda: players(Player, count, names, sids))
+        game_bytes = traced(lambda: games(count, args.per_game))
+        game_count = max(1, count // args.per_game)
+        print(
+            f"{count:>8} {old / count:>14.1f} {new / count:>15.1f}"
+            f" {game_bytes / game_count:>8.0f} {game_bytes / 2**20:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
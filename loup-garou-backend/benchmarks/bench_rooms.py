@@ -0,0 +1,94 @@
+"""
+Benchmark how memory and per-event latency grow with the number of rooms.
+
+Events go through `GameEvents.dispatcher` like a client's, so the latency
+covers the sid to room lookup, the handler and the emit back to the sender.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_rooms --rooms 1 10 100 500
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from segments.audio import SilentAudio
+from server.events import GameEvents
+from server.rooms import RoomRegistry
+
+
+class StubSocketIO:
+    def __init__(self):
+        self.emits = 0
+
+    def emit(self, *args, **kwargs):
+        self.emits += 1
+
+    def sleep(self, seconds):
+        pass
+
+
+def fill_registry(registry, room_count, players_per_room):
+    for r in range(room_count):
+        room_id = f"room_{r}"
+        for p in range(players_per_room):
+            sid = f"{room_id}_player_{p}"
+            room = registry.bind_sid(sid, room_id)
+            room.game.add_player(f"Player {p}", sid)
+        room.game.assign_roles()
+
+
+def measure_events(registry, room_count, players_per_room, events):
+    """
+    Dispatch `events` player list requests, round-robin over rooms. Each one
+    is looked up, handled and answered with a snapshot emit.
+    """
+    game_events = GameEvents(registry, None, registry.socketio)
+    game_events.define_handlers()
+    dispatch = game_events.dispatcher(
+        "request_player_list", game_events.handlers["request_player_list"]
+    )
+    sids = [
+        f"room_{r}_player_{p}"
+        for r in range(room_count)
+        for p in range(players_per_room)
+    ]
+    start = time.perf_counter()
+    for i in range(events):
+        dispatch(sids[i % len(sids)])
+    return (time.perf_counter() - start) / events
+
+
+def run(room_count, players_per_room, events):
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    registry = RoomRegistry(StubSocketIO(), audio=SilentAudio())
+    fill_registry(registry, room_count, players_per_room)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    per_event = measure_events(registry, room_count, players_per_room, events)
+    return current - baseline, per_event
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rooms", type=int, nargs="+", default=[1, 10, 100, 500])
+    parser.add_argument("--players", type=int, default=8)
+    parser.add_argument("--events", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'rooms':>8} {'memory (KiB)':>14} {'KiB/room':>10} {'us/event':>10}")
+    for room_count in args.rooms:
+        memory, per_event = run(room_count, args.players, args.events)
+        print(
+            f"{room_count:>8} {memory / 1024:>14.1f} "
+            f"{memory / 1024 / room_count:>10.2f} {per_event * 1e6:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Measure the cold start of a server process.
+
+Every run is a fresh interpreter that imports the app factory and calls it
+(`create_app` or `create_async_app`), as a newly spawned worker does. Reports
+the median import time, factory time and whole process time (interpreter
+startup included), the number of modules loaded, and whether the audio
+backend was imported, for each `LOUP_GAROU_AUDIO` profile.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_startup --mode sync async --runs 10
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+STARTUP = """
+import sys, time
+start = time.perf_counter()
+if sys.argv[1] == "async":
+    from server.async_app import create_async_app as factory
+else:
+    from server.app import create_app as factory
+imported = time.perf_counter()
+factory(metrics_enabled=False)
+created = time.perf_counter()
+print(imported - start, created - imported, len(sys.modules), "playsound" in sys.modules)
+"""
+
+
+def run_once(mode, profile):
+    env = dict(os.environ, LOUP_GAROU_AUDIO=profile, LOUP_GAROU_STATE_DB="")
+    env.pop("LOUP_GAROU_RECORD_DIR", None)
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", STARTUP, mode],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    total = time.perf_counter() - start
+    imported, created, modules, playsound = output.split()[-4:]
+    return float(imported), float(created), total, int(modules), playsound == "True"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mode", nargs="+", default=["sync", "async"])
+    parser.add_argument("--audio", nargs="+", default=["speaker", "silent", "stream"])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{'mode':>6} {'audio':>8} {'import ms':>10} {'create ms':>10}"
+        f" {'process ms':>11} {'modules':>8} {'playsound':>10}"
+    )
+    for mode in args.mode:
+        for profile in args.audio:
+            runs = [run_once(mode, profile) for _ in range(args.runs)]
+            imported, created, total, modules, playsound = zip(*runs)
+            print(
+                f"{mode:>6} {profile:>8}"
+                f" {statistics.median(imported) * 1e3:>10.1f}"
+                f" {statistics.median(created) * 1e3:>10.1f}"
+                f" {statistics.median(total) * 1e3:>11.1f}"
+                f" {max(modules):>8} {'loaded' if any(playsound) else 'no':>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Compare the incremental VoteTally with the previous sort-on-every-vote tally.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_votes --players 10 100 1000
+"""
+
+import argparse
+import random
+import timeit
+from collections import OrderedDict
+
+from core.votes import VoteTally
+
+
+class SortedVoteCount:
+    """The tally Game.set_player_vote used to keep: re-sorted on every vote."""
+
+    def __init__(self):
+        self.player_votes_count = {}
+
+    def vote(self, player_sid):
+        if player_sid in self.player_votes_count:
+            self.player_votes_count[player_sid] += 1
+        else:
+            self.player_votes_count[player_sid] = 1
+
+        self.player_votes_count = OrderedDict(
+            sorted(
+                self.player_votes_count.items(), key=lambda item: item[1], reverse=True
+            )
+        )
+
+    def leaders(self):
+        if not self.player_votes_count:
+            return []
+        max_votes = next(iter(self.player_votes_count.values()))
+        return [p for p, v in self.player_votes_count.items() if v == max_votes]
+
+
+def day_vote_sorted(ballots):
+    tally = SortedVoteCount()
+    for _, target in ballots:
+        tally.vote(target)
+    return tally.leaders()
+
+
+def day_vote_incremental(ballots):
+    tally = VoteTally()
+    for voter, target in ballots:
+        tally.vote(target, voter)
+    return tally.leaders()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--players", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'players':>8} {'sorted us/vote':>15} {'tally us/vote':>14} {'speedup':>8}")
+    for players in args.players:
+        sids = [f"player_{i}" for i in range(players)]
+        ballots = [(voter, rng.choice(sids)) for voter in sids]
+        assert sorted(day_vote_sorted(ballots)) == sorted(day_vote_incremental(ballots))
+
+        number = max(1, 20000 // players)
+        old = min(
+            timeit.repeat(lambda: day_vote_sorted(ballots), number=number, repeat=args.repeat)
+        )
+        new = min(
+            timeit.repeat(
+                lambda: day_vote_incremental(ballots), number=number, repeat=args.repeat
+            )
+        )
+        per_old = old / (number * players) * 1e6
+        per_new = new / (number * players) * 1e6
+        print(f"{players:>8} {per_old:>15.2f} {per_new:>14.2f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Compare the JSON and msgpack wire formats on a full player list broadcast.
+
+For each player count a game is filled and its `player_list_snapshot` payload
+is encoded both ways, as the complete Socket.IO packet a client receives
+(msgpack payloads travel as a binary attachment). Reports bytes on the wire
+and encode/decode time per broadcast.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_wire --players 10 50 200
+"""
+
+import argparse
+import json
+import timeit
+
+from socketio import packet
+
+from core.game import Game
+from server import wire
+
+
+def snapshot_payload(players):
+    game = Game(seed=0)
+    for i in range(players):
+        game.add_player(f"Player {i}", f"sid_{i:04d}_{'x' * 12}")
+    game.assign_roles()
+    version, player_list = game.players_snapshot()
+    return {"version": version, "players": player_list}
+
+
+def json_packet(payload):
+    return packet.Packet(packet.EVENT, data=["player_list_snapshot", payload]).encode()
+
+
+def msgpack_packet(payload):
+    return packet.Packet(
+        packet.EVENT, data=["player_list_snapshot", wire.encode(payload)]
+    ).encode()
+
+
+def packet_bytes(encoded):
+    parts = encoded if isinstance(encoded, list) else [encoded]
+    return sum(len(p.encode() if isinstance(p, str) else p) for p in parts)
+
+
+def best(fn, number, repeat):
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--players", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    if wire.msgpack is None:
+        parser.error("msgpack is not installed")
+
+    print(
+        f"{'players':>8} {'json B':>8} {'msgpack B':>10} {'ratio':>6}"
+        f" {'json enc us':>12} {'mp enc us':>10} {'json dec us':>12} {'mp dec us':>10}"
+    )
+    for players in args.players:
+        payload = snapshot_payload(players)
+        as_json = json_packet(payload)
+        as_msgpack = msgpack_packet(payload)
+        text = json.dumps(payload)
+        binary = wire.encode(payload)
+        assert wire.decode(binary) == payload
+
+        number = max(10, 20000 // players)
+        json_enc = best(lambda: json_packet(payload), number, args.repeat)
+        mp_enc = best(lambda: msgpack_packet(payload), number, args.repeat)
+        json_dec = best(lambda: json.loads(text), number, args.repeat)
+        mp_dec = best(lambda: wire.decode(binary), number, args.repeat)
+
+        json_size = packet_bytes(as_json)
+        mp_size = packet_bytes(as_msgpack)
+        print(
+            f"{players:>8} {json_size:>8} {mp_size:>10} {mp_size / json_size:>6.2f}"
+            f" {json_enc:>12.1f} {mp_enc:>10.1f} {json_dec:>12.1f} {mp_dec:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
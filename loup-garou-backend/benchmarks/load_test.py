@@ -0,0 +1,435 @@
+"""
+Load-test the game server over real Socket.IO connections.
+
+Starts the server the way main.py does (threaded Flask-SocketIO, or the
+asyncio server with `--mode async`) in a subprocess, then for each step of
+`--games` plays that many games at once, every seat being its own client
+connection. Clients speak the real protocol: `add_player`, then they answer
+their prompts with `cupidon_selection_complete`, `lover_alert_closed`,
+`seer_check`, `werewolf_kill`, `witch_*`, `vote_kill` and `hunter_selection`
+until the server sends `game_over`. Every answer carries a sequence number;
+`--resend` sends that fraction of answers twice, as a client retrying after a
+reconnect does, to check that the server drops the copies.
+
+Each step reports connection setup time, event-to-emit latency (from a
+table's last answer to the next emit that table receives, per event), and the
+server's CPU time and resident memory. The server runs without narration
+audio and deals a standard role mix (simulation.headless.default_roles) so
+that every prompt is exercised. `--json` writes the results for regression
+tracking; `--url` targets a server that is already running instead. Needs the
+packages in requirements-dev.txt; CPU and memory are read from /proc (Linux).
+
+Run from the backend directory:
+
+    python -m benchmarks.load_test --games 1 10 50 --json load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import socketio
+
+from benchmarks.bench_async import percentile, rss_mb, wait_for_port
+
+SERVER = """
+import sys
+from core.game import Game
+from segments.audio import SilentAudio
+from simulation.headless import default_roles
+
+def assign_roles(self):
+    roles = default_roles(len(self.players))
+    self.rng.shuffle(roles)
+    for player, role in zip(self.players.values(), roles):
+        self.set_player_role(player, role)
+
+Game.assign_roles = assign_roles
+port = int(sys.argv[2])
+if sys.argv[1] == "async":
+    import uvicorn
+    from server.async_app import create_async_app
+    app, _ = create_async_app(metrics_enabled=False, audio=SilentAudio())
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="error")
+else:
+    from server.app import create_app
+    app, socketio = create_app(metrics_enabled=False, audio=SilentAudio())
+    socketio.run(app, host="127.0.0.1", port=port, allow_unsafe_werkzeug=True)
+"""
+
+# The server deals the roles when a room's sixth player joins
+TABLE_SIZE = 6
+CONNECT_CONCURRENCY = 100
+
+
+def cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as stat:
+        # Fields after the command name, which may contain spaces
+        fields = stat.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def peak_rss_mb(pid):
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def summarize(samples: List[float]) -> dict:
+    """Percentiles in milliseconds of samples in seconds."""
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 0.50) * 1e3, 3),
+        "p95_ms": round(percentile(samples, 0.95) * 1e3, 3),
+        "p99_ms": round(percentile(samples, 0.99) * 1e3, 3),
+        "max_ms": round(max(samples) * 1e3, 3),
+    }
+
+
+class Seat:
+    """One player: a client connection and what it knows of the game."""
+
+    def __init__(self, table, index: int):
+        self.table = table
+        self.name = f"{table.room}-p{index}"
+        self.client = socketio.AsyncClient(reconnection=False)
+        self.sid: Optional[str] = None
+        self.alive = True
+        self.joined = asyncio.get_running_loop().create_future()
+        self.join_sent = 0.0
+        self.seq = 0
+
+        on = self.client.on
+        on("*", self.on_any)
+        on("player_data", self.on_player_data)
+        on("player_joined", table.on_player_change)
+        on("player_updated", table.on_player_change)
+        on("alert_dead", self.on_alert_dead)
+        on("cupidon_choice", self.on_cupidon_choice)
+        on("lover_can_close", self.on_lover_can_close)
+        on("werewolf_wake_up", self.on_werewolf_wake_up)
+        on("witch_heal", self.on_witch_heal)
+        on("witch_kill", self.on_witch_kill)
+        on("seer_choice", self.on_seer_choice)
+        on("hunter_selection", self.on_hunter_selection)
+        on("day_vote", self.on_day_vote)
+        on("game_over", table.on_game_over)
+        on("turn_timeout", table.on_turn_timeout)
+        on("error", table.on_error)
+
+    async def connect(self, url: str):
+        start = time.perf_counter()
+        await self.client.connect(
+            f"{url}?room={self.table.room}", transports=["websocket"]
+        )
+        self.table.stats.connects.append(time.perf_counter() - start)
+
+    async def join(self):
+        self.join_sent = time.perf_counter()
+        await self.client.emit(
+            "add_player", {"name": self.name, "room": self.table.room}
+        )
+        await asyncio.wait_for(self.joined, 30)
+
+    async def answer(self, event: str, *args):
+        await asyncio.sleep(self.table.think_time)
+        self.table.sent(event)
+        self.seq += 1
+        envelope = {"seq": self.seq}
+        await self.client.emit(event, (*args, envelope))
+        if self.table.rng.random() < self.table.resend:
+            self.table.stats.resent += 1
+            await self.client.emit(event, (*args, envelope))
+
+    async def on_any(self, event, *args):
+        # Events without their own handler still close a pending answer
+        self.table.received()
+
+    async def on_player_data(self, data):
+        self.table.received()
+        self.sid = data["sid"]
+        self.table.stats.latency("add_player", time.perf_counter() - self.join_sent)
+        if not self.joined.done():
+            self.joined.set_result(data)
+
+    async def on_alert_dead(self, data=None):
+        self.table.received()
+        self.alive = False
+
+    async def on_cupidon_choice(self, data=None):
+        self.table.received()
+        first, second = self.table.rng.sample(list(self.table.players), 2)
+        await self.answer(
+            "cupidon_selection_complete", [{"sid": first}, {"sid": second}]
+        )
+
+    async def on_lover_can_close(self, data=None):
+        self.table.received()
+        await self.answer("lover_alert_closed")
+
+    async def on_werewolf_wake_up(self, data):
+        self.table.received()
+        # Every wolf is prompted, the first one named answers for the pack
+        pack = data["werewolves"]
+        if pack and pack[0] == self.name:
+            target = self.table.pick(lambda p: p["name"] not in pack)
+            if target is not None:
+                await self.answer("werewolf_kill", target)
+
+    async def on_witch_heal(self, data):
+        self.table.received()
+        if self.table.rng.random() < 0.5:
+            await self.answer("witch_heal_victim")
+        else:
+            await self.answer("witch_no_heal")
+
+    async def on_witch_kill(self, data=None):
+        self.table.received()
+        target = self.table.pick(self.other)
+        if target is not None and self.table.rng.random() < 0.3:
+            await self.answer("witch_kill_victim", {"sid": target})
+        else:
+            await self.answer("witch_no_kill")
+
+    async def on_seer_choice(self, data=None):
+        self.table.received()
+        target = self.table.pick(self.other)
+        if target is not None:
+            await self.answer("seer_check", {"sid": target})
+
+    async def on_hunter_selection(self, data=None):
+        self.table.received()
+        target = self.table.pick(self.other)
+        await self.answer(
+            "hunter_selection", {"sid": target} if target is not None else None
+        )
+
+    async def on_day_vote(self, data=None):
+        self.table.received()
+        if not self.alive:
+            return
+        target = self.table.pick(self.other) or self.sid
+        await self.answer("vote_kill", {"sid": target})
+
+    def other(self, player: dict) -> bool:
+        return player["name"] != self.name
+
+
+class Table:
+    """The seats of one game and the answer waiting for the server's reply."""
+
+    def __init__(self, room: str, stats, rng, think_time: float, resend: float):
+        self.room = room
+        self.stats = stats
+        self.rng = rng
+        self.think_time = think_time
+        self.resend = resend
+        self.seats = [Seat(self, i) for i in range(TABLE_SIZE)]
+        self.players: Dict[str, dict] = {}  # sid -> latest player payload
+        self.pending = None  # (event, sent at) of the table's last answer
+        self.over = asyncio.get_running_loop().create_future()
+
+    def pick(self, allowed) -> Optional[str]:
+        """Sid of a random living player `allowed(player)` accepts."""
+        sids = [
+            sid for sid, p in self.players.items() if p["is_alive"] and allowed(p)
+        ]
+        return self.rng.choice(sids) if sids else None
+
+    def sent(self, event: str):
+        self.pending = (event, time.perf_counter())
+
+    def received(self):
+        if self.pending is not None:
+            event, start = self.pending
+            self.pending = None
+            self.stats.latency(event, time.perf_counter() - start)
+
+    async def on_player_change(self, data):
+        self.received()
+        player = data["player"]
+        self.players[player["sid"]] = player
+
+    async def on_game_over(self, data):
+        self.received()
+        if not self.over.done():
+            self.over.set_result(data["winners"])
+
+    async def on_turn_timeout(self, data):
+        self.received()
+        self.stats.turn_timeouts += 1
+
+    async def on_error(self, data):
+        self.received()
+        self.stats.errors += 1
+
+
+class StepStats:
+    def __init__(self):
+        self.connects: List[float] = []
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors = 0
+        self.turn_timeouts = 0
+        self.resent = 0
+
+    def latency(self, event: str, seconds: float):
+        self.latencies.setdefault(event, []).append(seconds)
+
+
+async def play_step(url, step, games, think_time, resend, timeout, seed):
+    stats = StepStats()
+    rng = random.Random(seed)
+    tables = [
+        Table(
+            f"load{step}-g{g}",
+            stats,
+            random.Random(rng.random()),
+            think_time,
+            resend,
+        )
+        for g in range(games)
+    ]
+    seats = [seat for table in tables for seat in table.seats]
+    limit = asyncio.Semaphore(CONNECT_CONCURRENCY)
+
+    async def connect(seat):
+        async with limit:
+            await seat.connect(url)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(connect(s) for s in seats))
+    connect_seconds = time.perf_counter() - start
+    await asyncio.gather(*(seat.join() for seat in seats))
+    done, _ = await asyncio.wait([t.over for t in tables], timeout=timeout)
+    duration = time.perf_counter() - start
+
+    await asyncio.gather(*(s.client.disconnect() for s in seats))
+    # Let aiohttp release its connections before the loop closes
+    await asyncio.sleep(0.25)
+    samples = [x for values in stats.latencies.values() for x in values]
+    return {
+        "games": games,
+        "clients": len(seats),
+        "finished": len(done),
+        "duration_s": round(duration, 3),
+        "connect": dict(summarize(stats.connects), total_s=round(connect_seconds, 3)),
+        "latency": summarize(samples),
+        "latency_by_event": {
+            event: summarize(values)
+            for event, values in sorted(stats.latencies.items())
+        },
+        "errors": stats.errors,
+        "turn_timeouts": stats.turn_timeouts,
+        "resent": stats.resent,
+    }
+
+
+async def serve_and_play(server, port, play):
+    await wait_for_port(port)
+    cpu = cpu_seconds(server.pid)
+    start = time.perf_counter()
+    result = await play_step(f"http://127.0.0.1:{port}", *play)
+    cpu = cpu_seconds(server.pid) - cpu
+    result["server"] = {
+        "cpu_s": round(cpu, 3),
+        "cpu_percent": round(100 * cpu / (time.perf_counter() - start), 1),
+        "rss_mb": round(rss_mb(server.pid), 1),
+        "peak_rss_mb": round(peak_rss_mb(server.pid), 1),
+    }
+    return result
+
+
+def run_step(args, step, games):
+    play = (step, games, args.think_ms / 1e3, args.resend, args.timeout, args.seed)
+    if args.url:
+        result = asyncio.run(play_step(args.url, *play))
+        result["server"] = None
+        return result
+
+    server = subprocess.Popen(
+        [sys.executable, "-c", SERVER, args.mode, str(args.port)],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        # The game logs every action and Werkzeug every request
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        return asyncio.run(serve_and_play(server, args.port, play))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def print_step(result):
+    connect = result["connect"]
+    latency = result["latency"]
+    server = result["server"] or {}
+    print(
+        f"{result['games']:>6} {result['clients']:>8} {result['finished']:>9}"
+        f" {connect['p50_ms']:>11.1f} {connect['p99_ms']:>11.1f}"
+        f" {latency.get('p50_ms', 0):>8.2f} {latency.get('p95_ms', 0):>8.2f}"
+        f" {latency.get('p99_ms', 0):>8.2f} {result['errors']:>7}"
+        f" {server.get('cpu_percent', 0):>6.1f}"
+        f" {server.get('peak_rss_mb', 0):>8.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--games", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--think-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--resend", type=float, default=0.0, help="Fraction of answers sent twice"
+    )
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--url", help="Server to test instead of starting one")
+    parser.add_argument("--json", help="Write the results to this file (- for stdout)")
+    args = parser.parse_args()
+
+    table = args.json != "-"
+    if table:
+        print(
+            f"{'games':>6} {'clients':>8} {'finished':>9} {'conn p50 ms':>11}"
+            f" {'conn p99 ms':>11} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+            f" {'errors':>7} {'CPU %':>6} {'RSS MB':>8}"
+        )
+    steps = []
+    for step, games in enumerate(args.games):
+        result = run_step(args, step, games)
+        steps.append(result)
+        if table:
+            print_step(result)
+
+    report = {
+        "mode": None if args.url else args.mode,
+        "url": args.url,
+        "players_per_game": TABLE_SIZE,
+        "think_ms": args.think_ms,
+        "resend": args.resend,
+        "seed": args.seed,
+        "timestamp": time.time(),
+        "steps": steps,
+    }
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
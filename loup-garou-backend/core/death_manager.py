@@ -1,72 +1,99 @@
 # core/death_manager.py
-from typing import List
+from collections import deque
+from typing import Callable, Deque, List, Optional, Set
 
+from core.death_types import DeathEffect, DeathTrigger
 from core.player import Player
 from core.roles import PlayerRole
 
 
 class DeathManager:
+    """
+    Resolve deaths and everything they trigger in a single iterative pass.
+
+    Deaths are queued as DeathEffects and worked through in FIFO order. Killing
+    a lover queues their partner, and killing the hunter pauses resolution
+    until `hunter_revenge` (or `hunter_pass`) is called, after which `resolve`
+    carries on with the rest of the chain. A player is only ever queued once
+    per resolution, so the queue is bounded by the number of players.
+    """
+
     def __init__(self, game):
         self.game = game
-        self.pending_deaths: List[str] = []  # List of player_sids
-        self.awaiting_special_power = False
-        self.queud_deaths = []
+        self.queue: Deque[DeathEffect] = deque()
+        self.queued: Set[str] = set()
+        self.resolved: List[DeathEffect] = []
+        self.awaiting_hunter: Optional[str] = None
 
-    def kill_player(self, player_sid: str):
-        """Kill a player and update team counts"""
+    def queue_death(self, player_sid: str, trigger: DeathTrigger) -> bool:
+        """Queue a death unless that player is already queued or dead"""
+        if player_sid in self.queued:
+            return False
         player = self.game.get_player(player_sid)
-        if player is None:
-            print("Player not found")
-            return
+        if player is None or not player.is_alive:
+            return False
+        self.queued.add(player_sid)
+        self.queue.append(DeathEffect(player_sid, trigger))
+        return True
 
-        player.is_alive = False
-        print(f"Player's list is now: {self.game.players}")
-        self._update_team_counts(player)
-        self.queud_deaths.append(player)
-
-    def handle_kill(self, target_sid: str) -> List[str]:
-        """
-        Handle a kill action and return list of players who died
+    def resolve(
+        self, on_death: Optional[Callable[[Player, DeathEffect], None]] = None
+    ) -> bool:
         """
-        killed_players = []
-        target = self.game.get_player(target_sid)
-
-        if target:
-            self.kill_player(target_sid)
-            killed_players.append(target_sid)
-
-            self._check_special_powers(target)
-
-            if target.lover_sid:
-                lover = self.game.get_player(target.lover_sid)
-                if lover:
-                    self._check_special_powers(target)
-                    self.kill_player(lover.sid)
-                    killed_players.append(lover.sid)
-
-        return killed_players
-
-    def _update_team_counts(self, player: Player):
-        """Update team counts when a player dies"""
-        if player.role == PlayerRole.WEREWOLF:
-            self.game.werewolves_alive -= 1
-        else:
-            self.game.villagers_alive -= 1
-
-    def add_pending_death(self, player: Player):
-        """Add a player to pending deaths list"""
-        if player.sid not in self.pending_deaths:
-            self.pending_deaths.append(player.sid)
-
-    def remove_pending_death(self, player: Player):
-        """Remove a player from pending deaths list"""
-        if player.sid in self.pending_deaths:
-            self.pending_deaths.remove(player.sid)
-
-    def _check_special_powers(self, player: Player):
-        """
-        Handle any special powers when a player dies
+        Kill every queued player, following lover and hunter chains.
+
+        Returns False when paused waiting for the hunter's choice, True once
+        the queue is empty.
         """
-        if player.role == PlayerRole.HUNTER:
-            print(f"Checking if {player.name} is hunter")
-            pass
+        if self.awaiting_hunter is not None:
+            return False
+        while self.queue:
+            effect = self.queue.popleft()
+            player = self.game.get_player(effect.player_sid)
+            if player is None or not player.is_alive:
+                continue
+
+            player.death_cause = effect.trigger.value
+            self.game.kill_player(player.sid)
+            effect.processed = True
+            self.resolved.append(effect)
+            if on_death is not None:
+                on_death(player, effect)
+
+            if player.lover_sid:
+                self.queue_death(player.lover_sid, DeathTrigger.LOVER_DEATH)
+
+            if player.role == PlayerRole.HUNTER and self.game.hunter_is_alive:
+                self.game.hunter_is_alive = False
+                self.awaiting_hunter = player.sid
+                return False
+        return True
+
+    def hunter_revenge(self, target_sid: str):
+        """Queue the hunter's target and allow resolution to continue"""
+        self.awaiting_hunter = None
+        self.queue_death(target_sid, DeathTrigger.HUNTER_REVENGE)
+
+    def hunter_pass(self):
+        """The hunter chose nobody: allow resolution to continue"""
+        self.awaiting_hunter = None
+
+    def reset(self):
+        self.queue.clear()
+        self.queued.clear()
+        self.resolved = []
+        self.awaiting_hunter = None
+
+    def to_state(self) -> dict:
+        return {
+            "queue": [[e.player_sid, e.trigger.value] for e in self.queue],
+            "queued": sorted(self.queued),
+            "awaiting_hunter": self.awaiting_hunter,
+        }
+
+    def load_state(self, state: dict):
+        self.reset()
+        for player_sid, trigger in state["queue"]:
+            self.queue.append(DeathEffect(player_sid, DeathTrigger(trigger)))
+        self.queued.update(state["queued"])
+        self.awaiting_hunter = state["awaiting_hunter"]
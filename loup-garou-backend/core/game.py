@@ -1,34 +1,150 @@
 import random
-from collections import OrderedDict
 from typing import Dict, List, Optional
 
+from core.death_types import DeathTrigger
+from core.logs import get_logger
 from core.player import Player
+from core.player_list import (
+    PLAYER_JOINED,
+    PLAYER_LEFT,
+    PLAYER_UPDATED,
+    PlayerListLog,
+)
 from core.roles import ROLE_DESCRIPTIONS, PlayerRole
+from core.votes import VoteTally
+
+
+WEREWOLF_TEAM = ROLE_DESCRIPTIONS[PlayerRole.WEREWOLF].team
 
 
 class Game:
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None):
+        # Every random decision of the game comes from this generator, so a
+        # game is reproducible from its seed and its inputs
+        self.seed = seed if seed is not None else random.SystemRandom().getrandbits(63)
+        self.rng = random.Random(self.seed)
         self.players: Dict[str, Player] = {}
-        self.pending_deaths: List[str] = []
+        self.player_list = PlayerListLog()
+        # Indexes kept in sync by add_player, set_player_role and kill_player
+        self.players_by_role: Dict[PlayerRole, Dict[str, Player]] = {
+            role: {} for role in PlayerRole
+        }
+        self.alive_players: Dict[str, Player] = {}
+        self.alive_by_team: Dict[str, Dict[str, Player]] = {
+            role.team: {} for role in ROLE_DESCRIPTIONS.values()
+        }
+        # Night victims (sid -> cause), resolved when the night ends
+        self.pending_deaths: Dict[str, DeathTrigger] = {}
         self.witch_heal_available = True
         self.witch_kill_available = True
         self.hunter_is_alive = True
         self.lovers: List[Player] = []
         self.veto_player = None
-        self.player_votes_count: Dict[str, int] = {}
-        self.werewolves_alive = 0
-        self.villagers_alive = 0
+        self.votes = VoteTally()
         self.winners = None
         self.lovers_are_opposited_teams_and_alive = True
         self.lover_is_hunter = False
         self.reda_sid = None
         self.carl_sid = None
+        self.cupid = None
+        # Tagged with the room and segment once a SegmentManager runs the game
+        self.log = get_logger("game")
+
+    @property
+    def werewolves_alive(self) -> int:
+        return len(self.alive_by_team[WEREWOLF_TEAM])
+
+    @property
+    def villagers_alive(self) -> int:
+        return len(self.alive_players) - self.werewolves_alive
 
     def add_player(self, name: str, sid: str) -> Player:
         player = Player(name=name, sid=sid)
         self.players[sid] = player
+        self.alive_players[sid] = player
+        self.player_list.record(PLAYER_JOINED, player.to_dict())
+        return player
+
+    def remove_player(self, sid: str) -> Optional[Player]:
+        """Remove a player who left the lobby before roles were assigned."""
+        player = self.players.pop(sid, None)
+        if player is None:
+            return None
+        self.alive_players.pop(sid, None)
+        if player.role is not None:
+            self.players_by_role[player.role].pop(sid, None)
+            self.alive_by_team[ROLE_DESCRIPTIONS[player.role].team].pop(sid, None)
+        self.player_list.record(PLAYER_LEFT, {"sid": sid})
         return player
 
+    def players_snapshot(self):
+        """Return the player list version and the full serialized list."""
+        return self.player_list.version, [p.to_dict() for p in self.players.values()]
+
+    def to_state(self) -> dict:
+        """Everything needed to rebuild this game with `load_state`."""
+        version, internal, gauss_next = self.rng.getstate()
+        return {
+            "seed": self.seed,
+            "rng": [version, list(internal), gauss_next],
+            "players": [
+                [p.name, p.sid, p.role.value if p.role else None, p.is_alive,
+                 p.lover_sid, p.death_cause]
+                for p in self.players.values()
+            ],
+            "player_list_version": self.player_list.version,
+            "pending_deaths": [
+                [sid, trigger.value] for sid, trigger in self.pending_deaths.items()
+            ],
+            "witch_heal_available": self.witch_heal_available,
+            "witch_kill_available": self.witch_kill_available,
+            "hunter_is_alive": self.hunter_is_alive,
+            "lovers": [p.sid for p in self.lovers],
+            "veto_player": self.veto_player,
+            "votes": self.votes.to_state(),
+            "winners": self.winners,
+            "lovers_are_opposited_teams_and_alive": (
+                self.lovers_are_opposited_teams_and_alive
+            ),
+            "lover_is_hunter": self.lover_is_hunter,
+            "reda_sid": self.reda_sid,
+            "carl_sid": self.carl_sid,
+            "cupid": self.cupid,
+        }
+
+    def load_state(self, state: dict):
+        """
+        Replace this game's state, rebuilding the indexes. No deltas are sent,
+        and the change listener and room logger set up by the owner are kept.
+        """
+        on_change = self.player_list.on_change
+        log = self.log
+        self.__init__(state["seed"])
+        self.log = log
+        version, internal, gauss_next = state["rng"]
+        self.rng.setstate((version, tuple(internal), gauss_next))
+        self.player_list.on_change = on_change
+        self.player_list.version = state["player_list_version"]
+        for name, sid, role, is_alive, lover_sid, death_cause in state["players"]:
+            player = Player(name=name, sid=sid, is_alive=is_alive,
+                            lover_sid=lover_sid, death_cause=death_cause)
+            self.players[sid] = player
+            if is_alive:
+                self.alive_players[sid] = player
+            if role is not None:
+                self.set_player_role(player, PlayerRole(role))
+        self.pending_deaths = {
+            sid: DeathTrigger(trigger) for sid, trigger in state["pending_deaths"]
+        }
+        self.lovers = [self.players[sid] for sid in state["lovers"]]
+        self.votes.load_state(state["votes"])
+        for key in (
+            "witch_heal_available", "witch_kill_available", "hunter_is_alive",
+            "veto_player", "winners", "lovers_are_opposited_teams_and_alive",
+            "lover_is_hunter", "reda_sid", "carl_sid", "cupid",
+        ):
+            setattr(self, key, state[key])
+
     def add_mock_players(self, count: int):
         mock_names = ["Alice", "Bob", "Charlie", "Eve"]
         for i, name in enumerate(mock_names[:count]):
@@ -39,10 +155,23 @@ class Game:
         return self.players[sid] if sid in self.players else None
 
     def get_player_by_role(self, role: PlayerRole) -> Optional[Player]:
-        return next((p for p in self.players.values() if p.role == role), None)
+        return next(iter(self.players_by_role[role].values()), None)
 
     def get_players_by_role(self, role: PlayerRole) -> List[Player]:
-        return [p for p in self.players.values() if p.role == role]
+        return list(self.players_by_role[role].values())
+
+    def get_alive_players_by_team(self, team: str) -> List[Player]:
+        return list(self.alive_by_team[team].values())
+
+    def set_player_role(self, player: Player, role: PlayerRole):
+        if player.role is not None:
+            del self.players_by_role[player.role][player.sid]
+            if player.is_alive:
+                del self.alive_by_team[ROLE_DESCRIPTIONS[player.role].team][player.sid]
+        player.role = role
+        self.players_by_role[role][player.sid] = player
+        if player.is_alive:
+            self.alive_by_team[ROLE_DESCRIPTIONS[role].team][player.sid] = player
 
     def assign_roles(self):
         # TODO: Uncomment werewolves and increate number to 5, removed to assign to specific player for testing
@@ -55,25 +184,20 @@ class Game:
             PlayerRole.CUPID,
         ] + [PlayerRole.VILLAGER] * (num_players - 2)
 
-        random.shuffle(roles_to_assign)
+        self.rng.shuffle(roles_to_assign)
         for player, role in zip(self.players.values(), roles_to_assign):
             if player.name == "reda":
                 self.reda_sid = player.sid
                 role = PlayerRole.WEREWOLF
                 self.set_veto_player(player.sid)
-                player.role = role
+                self.set_player_role(player, role)
             elif player.name == "carl":
                 self.cupid = player.sid
                 self.carl_sid = player.sid
                 role = PlayerRole.HUNTER
-                player.role = role
+                self.set_player_role(player, role)
             else:
-                player.role = role
-        self.set_teams_count(1)
-
-    def set_teams_count(self, numberOfWerewolves: int):
-        self.werewolves_alive = numberOfWerewolves
-        self.villagers_alive = len(self.players) - numberOfWerewolves
+                self.set_player_role(player, role)
 
     def set_lovers(self, player1: Player, player2: Player):
         player1.lover_sid = player2.sid
@@ -83,64 +207,64 @@ class Game:
     def get_lovers(self) -> List[Player]:
         return self.lovers
 
-    def add_pending_death(self, player: Player):
+    def add_pending_death(
+        self, player: Player, trigger: DeathTrigger = DeathTrigger.WEREWOLF_KILL
+    ):
         if player.sid not in self.pending_deaths:
-            self.pending_deaths.append(player.sid)
+            self.pending_deaths[player.sid] = trigger
 
     def remove_pending_death(self, player: Player):
-        if player.sid in self.pending_deaths:
-            self.pending_deaths.remove(player.sid)
+        self.pending_deaths.pop(player.sid, None)
+
+    def get_last_pending_death(self) -> Optional[Player]:
+        if not self.pending_deaths:
+            return None
+        return self.get_player(next(reversed(self.pending_deaths)))
+
+    def clear_pending_deaths(self):
+        self.pending_deaths = {}
 
     def set_veto_player(self, player_sid: str):
         self.veto_player = player_sid
 
-    def set_player_vote(self, player_sid: str):
-        print("The sid of the player is ", player_sid)
-        if player_sid in self.player_votes_count:
-            self.player_votes_count[player_sid] += 1
-        else:
-            self.player_votes_count[player_sid] = 1
+    @property
+    def player_votes_count(self) -> Dict[str, int]:
+        return self.votes.counts
 
-        self.player_votes_count = OrderedDict(
-            sorted(
-                self.player_votes_count.items(), key=lambda item: item[1], reverse=True
-            )
-        )
+    def set_player_vote(self, player_sid: str, voter_sid: Optional[str] = None):
+        self.log.debug("Vote from %s against %s", voter_sid, player_sid)
+        self.votes.vote(player_sid, voter_sid)
 
-    def update_team_counts(self, player: Player):
-        if player.role == PlayerRole.WEREWOLF:
-            self.werewolves_alive -= 1
-        else:
-            self.villagers_alive -= 1
+    def retract_player_vote(self, voter_sid: str):
+        self.votes.retract(voter_sid)
 
     def kill_player(self, player_sid):
         player = self.get_player(player_sid)
         if player is None:
-            print("Player not found")
+            self.log.warning("Cannot kill unknown player %s", player_sid)
+            return
+        if not player.is_alive:
             return
         player.is_alive = False
-        print(f"Player's list is now: {self.players}")
-        self.update_team_counts(player)
+        del self.alive_players[player_sid]
+        if player.role is not None:
+            del self.alive_by_team[ROLE_DESCRIPTIONS[player.role].team][player_sid]
+        self.player_list.record(PLAYER_UPDATED, player.to_dict())
+        self.log.debug(
+            "%s died, %d players alive", player.name, len(self.alive_players)
+        )
 
     def get_top_voted_players(self) -> List[str]:
-        if not self.player_votes_count:
-            return []
-        max_votes = next(iter(self.player_votes_count.values()))
-        top_players = [
-            player
-            for player, votes in self.player_votes_count.items()
-            if votes == max_votes
-        ]
-        return top_players
+        return self.votes.leaders()
 
     def reset_top_voted_players(self):
-        self.player_votes_count = {}
+        self.votes.reset()
 
     def get_werewolves_count(self):
-        return len(self.get_players_by_role(PlayerRole.WEREWOLF))
+        return len(self.players_by_role[PlayerRole.WEREWOLF])
 
     def reset_player_votes(self):
-        self.player_votes_count = {}
+        self.votes.reset()
 
     def check_game_over(self):
         if self.lovers_are_opposited_teams_and_alive:
@@ -150,11 +274,11 @@ class Game:
 
         if self.werewolves_alive == 0:
             self.winners = "Villagers"
-            print("Villagers won")
+            self.log.info("Villagers won")
             return True
         if self.werewolves_alive >= village_count:
             self.winners = "Werewolves"
-            print("Werewolves won")
+            self.log.info("Werewolves won")
             return True
         return False
 
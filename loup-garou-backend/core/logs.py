@@ -0,0 +1,175 @@
+"""
+Structured logging for the game server.
+
+Every subsystem logs through `loup_garou.<subsystem>` (game, segments,
+events, rooms, audio, persistence, timers, bots), and records about a table
+carry its `room` and current `segment`, added by `RoomLog` only when the
+record is actually emitted. Messages use %-style arguments so a disabled
+level costs one level check and nothing is formatted.
+
+`setup_logging` (called by the app factories) routes every record through a
+bounded queue to a listener thread that formats and writes it, so a handler
+never blocks on stdout. When the queue is full the record is dropped and
+counted instead. Without it, Python's default applies: warnings and errors
+on stderr, nothing else, which is what the headless simulators want.
+
+Environment:
+    LOUP_GAROU_LOG_LEVEL: Level of every subsystem (default INFO).
+    LOUP_GAROU_LOG_LEVELS: Per-subsystem overrides, e.g.
+        "segments=DEBUG,events=WARNING".
+    LOUP_GAROU_LOG_FORMAT: "text" (default) or "json", one object per line.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from typing import Callable, Dict, Optional
+
+ROOT = "loup_garou"
+QUEUE_SIZE = 10000
+TEXT_FORMAT = (
+    "%(asctime)s %(levelname)s %(subsystem)s [%(room)s/%(segment)s] %(message)s"
+)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    return logging.getLogger(f"{ROOT}.{subsystem}")
+
+
+class RoomLog(logging.LoggerAdapter):
+    """
+    Logger tagging its records with a room id and the room's current segment.
+
+    Args:
+        logger: The subsystem's logger.
+        room_id: The room's id.
+        segment: Returns the current segment id. Only called for records
+            that pass the level check.
+    """
+
+    def __init__(self, logger, room_id, segment: Optional[Callable[[], str]] = None):
+        super().__init__(logger, {"room": room_id})
+        self.segment = segment
+
+    def process(self, msg, kwargs):
+        extra = kwargs.setdefault("extra", {})
+        extra["room"] = self.extra["room"]
+        extra["segment"] = self.segment() if self.segment is not None else None
+        return msg, kwargs
+
+
+def room_log(subsystem: str, room_id, segment=None) -> RoomLog:
+    return RoomLog(get_logger(subsystem), room_id, segment)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records instead of blocking when full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Formatting happens on the listener thread. Arguments are logged
+        # as they are when the record is written, so pass immutable values.
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Tags(logging.Filter):
+    """Give every record the fields the formatters expect."""
+
+    def filter(self, record):
+        record.subsystem = record.name.rpartition(".")[2]
+        if not hasattr(record, "room"):
+            record.room = None
+        if not hasattr(record, "segment"):
+            record.segment = None
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, for log pipelines to index."""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "subsystem": record.subsystem,
+            "room": record.room,
+            "segment": record.segment,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """`"segments=DEBUG,events=WARNING"` -> {"segments": "DEBUG", ...}."""
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        subsystem, _, level = item.partition("=")
+        levels[subsystem.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(level=None, levels=None, fmt=None, stream=None):
+    """
+    Send the game's logs through a queue to a background writer.
+
+    Arguments default to the LOUP_GAROU_LOG_* environment variables. Calling
+    it again only updates the levels.
+
+    Returns:
+        DroppingQueueHandler: The handler records are queued on.
+    """
+    global _listener
+    root = logging.getLogger(ROOT)
+    root.setLevel(level or os.environ.get("LOUP_GAROU_LOG_LEVEL", "INFO").upper())
+    if levels is None:
+        levels = parse_levels(os.environ.get("LOUP_GAROU_LOG_LEVELS", ""))
+    for subsystem, subsystem_level in levels.items():
+        get_logger(subsystem).setLevel(subsystem_level)
+
+    for handler in root.handlers:
+        if isinstance(handler, DroppingQueueHandler):
+            return handler
+
+    fmt = fmt or os.environ.get("LOUP_GAROU_LOG_FORMAT", "text")
+    output = logging.StreamHandler(stream or sys.stdout)
+    if fmt == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        formatter = logging.Formatter(TEXT_FORMAT)
+        formatter.converter = time.gmtime
+        output.setFormatter(formatter)
+
+    handler = DroppingQueueHandler(queue.Queue(QUEUE_SIZE))
+    handler.addFilter(_Tags())
+    root.addHandler(handler)
+    root.propagate = False
+    _listener = logging.handlers.QueueListener(handler.queue, output)
+    _listener.start()
+    atexit.register(stop_logging)
+    return handler
+
+
+def stop_logging():
+    """Write out every queued record and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,25 +1,40 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
 from .roles import PlayerRole
 
 
-@dataclass
+@dataclass(slots=True)
 class Player:
+    """
+    One seat in a game. Slotted, since a process can hold tens of thousands.
+
+    `to_dict` caches the serialized form; any attribute write drops the cache.
+    """
+
     name: str
     sid: str
     role: Optional[PlayerRole] = None
     is_alive: bool = True
     lover_sid: Optional[str] = None
     death_cause: Optional[str] = None
+    _dict: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name != "_dict":
+            object.__setattr__(self, "_dict", None)
 
     def to_dict(self):
-        return {
-            "name": self.name,
-            "sid": self.sid,
-            "role": self.role.value if self.role else None,
-            "is_alive": self.is_alive,
-        }
+        """Serialized form, cached until the player changes. Do not mutate it."""
+        if self._dict is None:
+            self._dict = {
+                "name": self.name,
+                "sid": self.sid,
+                "role": self.role.value if self.role else None,
+                "is_alive": self.is_alive,
+            }
+        return self._dict
 
     def __repr__(self):
         role_name = self.role if self.role else "No role assigned"
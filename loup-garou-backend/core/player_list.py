@@ -0,0 +1,42 @@
+from collections import deque
+from typing import Callable, Deque, List, Optional, Tuple
+
+PLAYER_JOINED = "player_joined"
+PLAYER_LEFT = "player_left"
+PLAYER_UPDATED = "player_updated"
+
+Change = Tuple[int, str, dict]
+
+
+class PlayerListLog:
+    """
+    Versioned history of player list changes.
+
+    Every join, leave or update bumps `version` and is kept in a bounded log
+    so a client that missed a few deltas can catch up without a full snapshot.
+    `on_change(version, event, payload)` is called for each change, which is
+    how rooms broadcast deltas.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.version = 0
+        self.entries: Deque[Change] = deque(maxlen=max_entries)
+        self.on_change: Optional[Callable[[int, str, dict], None]] = None
+
+    def record(self, event: str, payload: dict) -> int:
+        self.version += 1
+        self.entries.append((self.version, event, payload))
+        if self.on_change is not None:
+            self.on_change(self.version, event, payload)
+        return self.version
+
+    def since(self, version: int) -> Optional[List[Change]]:
+        """
+        Changes made after `version`, or None when they are no longer all in
+        the log and the caller needs a full snapshot instead.
+        """
+        if version >= self.version:
+            return []
+        if not self.entries or self.entries[0][0] > version + 1:
+            return None
+        return [entry for entry in self.entries if entry[0] > version]
@@ -0,0 +1,87 @@
+from typing import Dict, List, Optional
+
+
+class VoteTally:
+    """
+    Running vote count that keeps the set of leaders up to date.
+
+    Targets are grouped in buckets by vote count, so casting, changing or
+    retracting a vote is O(1) and reading the leaders is O(k) in the number
+    of tied leaders. A voter identified by sid only ever counts once: voting
+    again moves their ballot. Anonymous votes (voter is None) always add one.
+    """
+
+    def __init__(self):
+        self.ballots: Dict[str, str] = {}  # voter sid -> target sid
+        self.counts: Dict[str, int] = {}  # target sid -> votes
+        self.buckets: Dict[int, Dict[str, None]] = {}  # votes -> targets
+        self.max_votes = 0
+
+    def vote(self, target_sid: str, voter_sid: Optional[str] = None):
+        if voter_sid is not None:
+            previous = self.ballots.get(voter_sid)
+            if previous == target_sid:
+                return
+            if previous is not None:
+                self._decrement(previous)
+            self.ballots[voter_sid] = target_sid
+        self._increment(target_sid)
+
+    def retract(self, voter_sid: str):
+        target_sid = self.ballots.pop(voter_sid, None)
+        if target_sid is not None:
+            self._decrement(target_sid)
+
+    def leaders(self) -> List[str]:
+        if self.max_votes == 0:
+            return []
+        return list(self.buckets[self.max_votes])
+
+    def reset(self):
+        self.ballots.clear()
+        self.counts.clear()
+        self.buckets.clear()
+        self.max_votes = 0
+
+    def __len__(self):
+        return len(self.counts)
+
+    def to_state(self) -> dict:
+        return {"ballots": dict(self.ballots), "counts": dict(self.counts)}
+
+    def load_state(self, state: dict):
+        self.reset()
+        self.ballots.update(state["ballots"])
+        for target_sid, count in state["counts"].items():
+            self.counts[target_sid] = count
+            self.buckets.setdefault(count, {})[target_sid] = None
+            self.max_votes = max(self.max_votes, count)
+
+    def _increment(self, target_sid: str):
+        count = self.counts.get(target_sid, 0)
+        if count:
+            self._leave_bucket(target_sid, count)
+        count += 1
+        self.counts[target_sid] = count
+        self.buckets.setdefault(count, {})[target_sid] = None
+        if count > self.max_votes:
+            self.max_votes = count
+
+    def _decrement(self, target_sid: str):
+        count = self.counts[target_sid]
+        self._leave_bucket(target_sid, count)
+        count -= 1
+        if count:
+            self.counts[target_sid] = count
+            self.buckets.setdefault(count, {})[target_sid] = None
+        else:
+            del self.counts[target_sid]
+        if self.max_votes not in self.buckets:
+            # The target was the only one at the top and is now one below it
+            self.max_votes -= 1
+
+    def _leave_bucket(self, target_sid: str, count: int):
+        bucket = self.buckets[count]
+        del bucket[target_sid]
+        if not bucket:
+            del self.buckets[count]
@@ -1,6 +1,39 @@
-from server.app import create_app
+import argparse
+import os
+
+
+def wsgi_app():
+    """The Flask application, for WSGI servers (`gunicorn 'main:wsgi_app()'`)."""
+    from server.app import create_app
+
+    app, _ = create_app()
+    return app
 
-app, socketio = create_app()
 
 if __name__ == "__main__":
-    socketio.run(app, host="0.0.0.0", port=5001, debug=True)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--async", dest="use_async", action="store_true")
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        from server.cluster import run_cluster
+
+        run_cluster(args.workers, host="0.0.0.0", port=5001)
+    elif args.use_async:
+        import uvicorn
+
+        from server.async_app import create_async_app
+
+        asgi_app, _ = create_async_app()
+        uvicorn.run(asgi_app, host="0.0.0.0", port=5001)
+    else:
+        from server.app import create_app
+
+        app, socketio = create_app()
+        # The reloader runs the app in a second process, which would restore
+        # and journal the same rooms as this one
+        persistent = bool(os.environ.get("LOUP_GAROU_STATE_DB"))
+        socketio.run(
+            app, host="0.0.0.0", port=5001, debug=True, use_reloader=not persistent
+        )
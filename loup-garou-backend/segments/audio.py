@@ -0,0 +1,191 @@
+"""
+Background narration playback.
+
+`AudioScheduler` keeps one FIFO queue of clips per room and plays it on a
+worker thread, so socket handlers return as soon as a clip is queued. A worker
+only lives while its room has clips waiting; idle rooms cost no thread.
+
+`StreamingAudio` narrates to each room's clients instead of the server
+speaker: it tells them which in-memory clip to play and moves on once the
+clip's known duration has passed. The servers narrate this way unless
+`LOUP_GAROU_AUDIO=speaker` asks for the server speaker, whose `play_asset`
+reads each clip from disk as it plays it.
+"""
+
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+from core.logs import get_logger
+
+Clip = Tuple[str, Optional[Callable[[], None]]]
+log = get_logger("audio")
+
+
+def play_asset(filename):
+    """Play `./assets/<filename>.mp3` on the server speaker, blocking until done."""
+    # Imported on first play, so servers that never use the speaker do not
+    # load the audio backend (PyObjC on macOS) at startup
+    from playsound import playsound
+
+    playsound(f"./assets/{filename}.mp3")
+
+
+class AudioScheduler:
+    """
+    Queue narration clips per room and play them in order in the background.
+
+    Attributes:
+        player: Blocking callable that plays a single clip by name.
+    """
+
+    def __init__(self, player: Callable[[str], None] = play_asset):
+        self.player = player
+        self._lock = threading.Lock()
+        self._queues: Dict[str, Deque[Clip]] = {}
+        self._running = set()
+
+    def play(self, room_id, filename, on_done: Optional[Callable[[], None]] = None):
+        """
+        Queue a clip for a room and return immediately.
+
+        Args:
+            room_id (str): The room the clip belongs to. Clips of one room are
+                played in the order they were queued.
+            filename (str): The clip name (without extension).
+            on_done: Called on the worker thread once the clip has finished,
+                or failed to play.
+        """
+        with self._lock:
+            self._queues.setdefault(room_id, deque()).append((filename, on_done))
+            if room_id in self._running:
+                return
+            self._running.add(room_id)
+        threading.Thread(target=self._drain, args=(room_id,), daemon=True).start()
+
+    def pending(self, room_id) -> int:
+        """Number of clips queued for a room, not counting the one playing."""
+        with self._lock:
+            return len(self._queues.get(room_id, ()))
+
+    def clear(self, room_id):
+        """Drop every clip still queued for a room, e.g. when it is evicted."""
+        with self._lock:
+            self._queues.pop(room_id, None)
+
+    def _next_clip(self, room_id) -> Optional[Clip]:
+        with self._lock:
+            clips = self._queues.get(room_id)
+            if not clips:
+                self._queues.pop(room_id, None)
+                self._running.discard(room_id)
+                return None
+            return clips.popleft()
+
+    def _drain(self, room_id):
+        clip = self._next_clip(room_id)
+        while clip is not None:
+            filename, on_done = clip
+            try:
+                self.player(filename)
+            except Exception as e:
+                log.warning("Error playing %s in room %s: %s", filename, room_id, e)
+            if on_done is not None:
+                try:
+                    on_done()
+                except Exception:
+                    log.exception("Error after playing %s", filename)
+            clip = self._next_clip(room_id)
+
+
+class SilentAudio:
+    """Audio sink that plays nothing and completes every clip immediately."""
+
+    def play(self, room_id, filename, on_done=None):
+        if on_done is not None:
+            on_done()
+
+    def pending(self, room_id) -> int:
+        return 0
+
+    def clear(self, room_id):
+        pass
+
+
+class StreamingAudio:
+    """
+    Narrate to a room's clients from a `ClipLibrary`.
+
+    For each clip a `narration` event carrying its name, URL and duration is
+    emitted to the room, and the next clip starts (and `on_done` runs) once the
+    duration has elapsed. Clients fetch the clip from the shared in-memory
+    copy, so no room reads the disk or holds a buffer of its own.
+
+    Args:
+        library: The ClipLibrary to narrate from.
+        emit: `emit(event, data, to=room_id)`, usually the server's emitter.
+        schedule: `schedule(delay, callback)`, e.g. `GameEvents.call_later`.
+    """
+
+    def __init__(self, library, emit=None, schedule=None):
+        self.library = library
+        self.emit = emit
+        self.schedule = schedule
+        self._lock = threading.Lock()
+        self._queues: Dict[str, Deque[Clip]] = {}
+        self._running = set()
+
+    def bind(self, emit, schedule):
+        """Set the emitter and scheduler once the server has built them."""
+        self.emit = emit
+        self.schedule = schedule
+
+    def play(self, room_id, filename, on_done: Optional[Callable[[], None]] = None):
+        with self._lock:
+            self._queues.setdefault(room_id, deque()).append((filename, on_done))
+            if room_id in self._running:
+                return
+            self._running.add(room_id)
+        self._start_next(room_id)
+
+    def pending(self, room_id) -> int:
+        with self._lock:
+            return len(self._queues.get(room_id, ()))
+
+    def clear(self, room_id):
+        with self._lock:
+            self._queues.pop(room_id, None)
+
+    def _start_next(self, room_id):
+        while True:
+            with self._lock:
+                clips = self._queues.get(room_id)
+                if not clips:
+                    self._queues.pop(room_id, None)
+                    self._running.discard(room_id)
+                    return
+                filename, on_done = clips.popleft()
+            clip = self.library.get(filename)
+            if clip is not None:
+                self.emit(
+                    "narration",
+                    {"name": clip.name, "url": clip.url, "duration": clip.duration},
+                    to=room_id,
+                )
+                self.schedule(
+                    clip.duration, lambda: self._finish(room_id, filename, on_done)
+                )
+                return
+            log.warning("Unknown narration clip: %s", filename)
+            self._done(filename, on_done)
+
+    def _finish(self, room_id, filename, on_done):
+        self._done(filename, on_done)
+        self._start_next(room_id)
+
+    def _done(self, filename, on_done):
+        if on_done is not None:
+            try:
+                on_done()
+            except Exception:
+                log.exception("Error after playing %s", filename)
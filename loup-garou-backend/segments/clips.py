@@ -0,0 +1,217 @@
+"""
+Narration clips loaded once and served from memory.
+
+`ClipLibrary` indexes every MP3 under the assets directory once, keeps
+its bytes and works out its duration from the MPEG frame headers, so playing
+a clip never touches the disk and every room shares the same buffer. Clips are
+served over HTTP at `/audio/<name>.mp3` with byte-range support, which is how
+remote tables fetch the narration `StreamingAudio` tells them to play.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from core.logs import get_logger
+
+ASSETS_DIR = "./assets"
+CLIP_ROUTE = "/audio/"
+
+# MPEG audio frame header tables, indexed by the header's bit fields
+_BITRATES = {  # (version, layer) -> kbps for bitrate index 1..14
+    (1, 1): [32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (1, 2): [32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (1, 3): [32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (2, 1): [32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (2, 2): [8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_BITRATES[(2, 3)] = _BITRATES[(2, 2)]
+_SAMPLE_RATES = {1: (44100, 48000, 32000), 2: (22050, 24000, 16000)}
+_VERSIONS = {3: 1, 2: 2, 0: 25}  # MPEG 1, 2 and 2.5
+_LAYERS = {3: 1, 2: 2, 1: 3}
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+log = get_logger("audio")
+
+
+def _frame(data: bytes, i: int) -> Optional[Tuple[int, int, int]]:
+    """(frame length, samples, sample rate) of a frame header at `i`, if any."""
+    if data[i] != 0xFF or data[i + 1] & 0xE0 != 0xE0:
+        return None
+    version = _VERSIONS.get((data[i + 1] >> 3) & 3)
+    layer = _LAYERS.get((data[i + 1] >> 1) & 3)
+    bitrate_index = data[i + 2] >> 4
+    rate_index = (data[i + 2] >> 2) & 3
+    if version is None or layer is None or rate_index == 3:
+        return None
+    if not 0 < bitrate_index < 15:
+        return None
+    padding = (data[i + 2] >> 1) & 1
+    bitrate = _BITRATES[(min(version, 2), layer)][bitrate_index - 1] * 1000
+    rate = _SAMPLE_RATES[min(version, 2)][rate_index]
+    if version == 25:
+        rate //= 2
+    if layer == 1:
+        return (12 * bitrate // rate + padding) * 4, 384, rate
+    samples = 1152 if layer == 2 or version == 1 else 576
+    return samples // 8 * bitrate // rate + padding, samples, rate
+
+
+def mp3_duration(data: bytes) -> float:
+    """
+    Duration in seconds of an MP3, from its frame headers.
+
+    Uses the frame count of a Xing/Info header when the first frame has one,
+    otherwise walks every frame, so VBR files are measured exactly.
+    """
+    i = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        i = 10 + size + (10 if data[5] & 0x10 else 0)
+    seconds = 0.0
+    first = True
+    while i + 4 <= len(data):
+        frame = _frame(data, i)
+        if frame is None:
+            i += 1
+            continue
+        length, samples, rate = frame
+        if first:
+            first = False
+            header = data[i : i + min(length, 200)]
+            for tag in (b"Xing", b"Info"):
+                at = header.find(tag)
+                if at != -1 and header[at + 7] & 1:
+                    frames = int.from_bytes(header[at + 8 : at + 12], "big")
+                    return frames * samples / rate
+        seconds += samples / rate
+        i += max(length, 1)
+    return seconds
+
+
+@dataclass(slots=True)
+class Clip:
+    """One narration clip, as served to every room."""
+
+    name: str
+    data: bytes
+    duration: float
+    etag: str
+
+    @property
+    def url(self) -> str:
+        return f"{CLIP_ROUTE}{self.name}.mp3"
+
+
+class ClipLibrary:
+    """
+    Every narration clip under `root`, read once.
+
+    Clips are named by their path without the extension, e.g. "Seer/Seer-1",
+    as `SegmentManager.play_audio` refers to them. Lookups ignore case.
+
+    Args:
+        root: Directory the clips are read from.
+        preload: Read every clip now. Otherwise they are read on first use,
+            which keeps startup fast for servers that may never serve one.
+    """
+
+    def __init__(self, root: str = ASSETS_DIR, preload: bool = True):
+        self.root = root
+        self.clips: Dict[str, Clip] = {}
+        self._by_key: Dict[str, Clip] = {}
+        self.loaded = False
+        self._lock = threading.Lock()
+        if preload:
+            self.load()
+
+    def load(self):
+        with self._lock:
+            if not self.loaded:
+                self._read_all()
+                self.loaded = True
+
+    def _read_all(self):
+        if not os.path.isdir(self.root):
+            log.warning("No narration clips: %s does not exist", self.root)
+            return
+        for directory, _, files in os.walk(self.root):
+            for filename in files:
+                if not filename.lower().endswith(".mp3"):
+                    continue
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, self.root)[: -len(".mp3")]
+                name = name.replace(os.sep, "/")
+                with open(path, "rb") as f:
+                    data = f.read()
+                clip = Clip(
+                    name,
+                    data,
+                    mp3_duration(data),
+                    hashlib.sha1(data).hexdigest()[:16],
+                )
+                self.clips[name] = clip
+                self._by_key[name.lower()] = clip
+
+    def __len__(self):
+        if not self.loaded:
+            self.load()
+        return len(self.clips)
+
+    def get(self, name: str) -> Optional[Clip]:
+        if not self.loaded:
+            self.load()
+        return self._by_key.get(name.lower())
+
+    def index(self) -> List[dict]:
+        """Name, URL and duration of every clip, for clients to preload."""
+        if not self.loaded:
+            self.load()
+        return [
+            {"name": c.name, "url": c.url, "duration": round(c.duration, 3)}
+            for c in sorted(self.clips.values(), key=lambda c: c.name)
+        ]
+
+    def response(
+        self, path: str, range_header: Optional[str] = None
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        HTTP response for `/audio/<name>.mp3`, honouring a single byte range.
+
+        Returns:
+            tuple: (status, headers, body).
+        """
+        name = path[len(CLIP_ROUTE) :] if path.startswith(CLIP_ROUTE) else path
+        if name.lower().endswith(".mp3"):
+            name = name[: -len(".mp3")]
+        clip = self.get(name)
+        if clip is None:
+            return 404, {"Content-Type": "text/plain"}, b"Not found"
+
+        size = len(clip.data)
+        headers = {
+            "Content-Type": "audio/mpeg",
+            "Accept-Ranges": "bytes",
+            "ETag": f'"{clip.etag}"',
+            # Clips only change with a deploy, which changes their ETag too
+            "Cache-Control": "public, max-age=86400",
+        }
+        match = _RANGE.match(range_header.strip()) if range_header else None
+        if match is None or not any(match.groups()):
+            headers["Content-Length"] = str(size)
+            return 200, headers, clip.data
+
+        first, last = match.groups()
+        if first:
+            start, end = int(first), min(int(last), size - 1) if last else size - 1
+        else:
+            # bytes=-N: the last N bytes
+            start, end = max(0, size - int(last)), size - 1
+        if start >= size or start > end:
+            headers["Content-Range"] = f"bytes */{size}"
+            return 416, headers, b""
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return 206, headers, clip.data[start : end + 1]
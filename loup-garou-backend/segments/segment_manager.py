@@ -5,15 +5,16 @@ This module defines the `SegmentManager` class and related functionality
 for controlling the flow of game segments in the Werewolf game.
 """
 
+import threading
+import time
 from enum import Enum
 
-from colorama import Fore, Style, init
-from playsound import playsound
-
+from core.death_manager import DeathManager
+from core.death_types import DeathTrigger
 from core.game import Game
+from core.logs import room_log
 from core.roles import PlayerRole
-
-init()
+from segments.audio import AudioScheduler
 
 
 class SegmentType(Enum):
@@ -28,6 +29,49 @@ class SegmentType(Enum):
     DAY = "day"
 
 
+# Night segments in the order they are played, with the clip that closes each
+# one. The witch's closing clip is attached to whichever of her two segments
+# is last in the night's plan.
+NIGHT_SEGMENTS = [
+    (SegmentType.CUPID, "Cupidon/Cupidon-2"),
+    (SegmentType.LOVERS, "Lovers/Lover-3"),
+    (SegmentType.SEER, "Seer/Seer-2"),
+    (SegmentType.WEREWOLF, "Werewolves/Werewolves-2"),
+    (SegmentType.WITCH_HEAL, None),
+    (SegmentType.WITCH_KILL, None),
+]
+WITCH_END_AUDIO = "Sorciere-3"
+
+# Turns the table can wait on: every night segment, the day vote and the
+# hunter's revenge. Seconds each may last before its default action is played.
+DAY_TURN = SegmentType.DAY.value
+HUNTER_TURN = "hunter"
+TURN_TIMEOUTS = {
+    SegmentType.CUPID.value: 60,
+    SegmentType.LOVERS.value: 30,
+    SegmentType.SEER.value: 45,
+    SegmentType.WEREWOLF.value: 90,
+    SegmentType.WITCH_HEAL.value: 45,
+    SegmentType.WITCH_KILL.value: 45,
+    DAY_TURN: 180,
+    HUNTER_TURN: 45,
+}
+
+
+def role_room(room_id, role):
+    """
+    Name of the socket room holding the alive players of a role at a table.
+
+    Args:
+        room_id (str): The table's socket room.
+        role (PlayerRole): The role.
+
+    Returns:
+        str: The role room name.
+    """
+    return f"{room_id}/{role.value}"
+
+
 class SegmentManager:
     """
     Class to manage the progression of game segments.
@@ -35,114 +79,226 @@ class SegmentManager:
     Attributes:
         game (Game): The game instance being managed.
         socketio: The SocketIO instance for communication with clients.
+        room_id (str): The socket room that table-wide emits are sent to.
+        audio: The scheduler narration clips are queued on.
+        metrics: Optional Metrics that segment durations are recorded in.
+        awaiting (str): The turn the table waits on (see TURN_TIMEOUTS), if any.
     """
 
-    def __init__(self, game: Game, socketio):
+    def __init__(
+        self,
+        game: Game,
+        socketio,
+        room_id=None,
+        audio=None,
+        metrics=None,
+        deadlines=None,
+        turn_timeouts=None,
+    ):
         """
         Initialize the SegmentManager.
 
         Args:
             game (Game): The game instance.
             socketio: The SocketIO instance for communication with clients.
+            room_id (str): The socket room of this table. Table-wide emits
+                only reach clients in this room.
+            audio: Narration scheduler, shared between rooms. A private
+                AudioScheduler is created when omitted.
+            metrics: Optional Metrics instance. When enabled, the time from the
+                start of each segment until it closes is observed.
+            deadlines: Optional timer scheduler with `call_later(delay, cb)`
+                returning a cancellable handle. When set, every turn gets a
+                deadline and `on_timeout` is called when it passes.
+            turn_timeouts (dict): Seconds per turn, TURN_TIMEOUTS by default.
         """
+        self.room_id = room_id
+        self.audio = audio if audio is not None else AudioScheduler()
+        self.metrics = metrics if metrics is not None and metrics.enabled else None
+        self.segment_started = None
         self.running_hunter_segment = False
         self.first_night = True
         self.game = game
         self.socketio = socketio
         self.current_segment = -1
-        self.segment_order = [
-            SegmentType.CUPID,
-            SegmentType.LOVERS,
-            SegmentType.SEER,
-            SegmentType.WEREWOLF,
-            SegmentType.WITCH_HEAL,
-            SegmentType.WITCH_KILL,
-            SegmentType.SEER,
-            SegmentType.DAY,
-        ]
-        self.death_queue = []
+        self.night_plan = [(SegmentType.DAY, None)]
+        self.segment_runners = {
+            SegmentType.CUPID: self._run_cupid_segment,
+            SegmentType.LOVERS: self._run_lovers_segment,
+            SegmentType.SEER: self._run_seer_segment,
+            SegmentType.WEREWOLF: self._run_werewolf_segment,
+            SegmentType.WITCH_HEAL: self._run_witch_heal_segment,
+            SegmentType.WITCH_KILL: self._run_witch_kill_segment,
+        }
+        self.segment_conditions = {
+            SegmentType.CUPID: self._cupid_is_active,
+            SegmentType.LOVERS: self._cupid_is_active,
+            SegmentType.SEER: lambda: self._role_is_alive(PlayerRole.SEER),
+            SegmentType.WEREWOLF: lambda: self._role_is_alive(PlayerRole.WEREWOLF),
+            SegmentType.WITCH_HEAL: lambda: self.game.witch_heal_available
+            and self._role_is_alive(PlayerRole.WITCH),
+            SegmentType.WITCH_KILL: lambda: self.game.witch_kill_available
+            and self._role_is_alive(PlayerRole.WITCH),
+        }
+        self.deaths = DeathManager(game)
+        self.on_deaths_resolved = None
         self.run_cupid = True
-
-    def play_audio(self, filename):
+        # Called whenever the table starts waiting on players (see `resume`)
+        self.on_checkpoint = None
+        self.deadlines = deadlines
+        self.turn_timeouts = TURN_TIMEOUTS if turn_timeouts is None else turn_timeouts
+        self.awaiting = None
+        self.turn_id = 0
+        self.deadline = None
+        # Called with the turn when its deadline passes
+        self.on_timeout = None
+        # Called with the turn whenever the table starts waiting on one
+        self.on_turn = None
+        # Held by socket handlers and narration callbacks, which run on other
+        # threads, while they change the table
+        self.lock = threading.RLock()
+        self.log = room_log("segments", room_id, self.segment_id)
+        game.log = room_log("game", room_id, self.segment_id)
+
+    def play_audio(self, filename, on_done=None):
         """
-        Play an audio file.
+        Queue an audio file for this room and return immediately.
 
         Args:
             filename (str): The name of the audio file to play (without extension).
+            on_done: Optional callback run once the clip has finished playing,
+                with the room locked.
         """
-        try:
-            playsound(f"./assets/{filename}.mp3")
-        except Exception as e:
-            print(e)
+        if on_done is not None:
+            on_done = self._locked(on_done)
+        self.audio.play(self.room_id, filename, on_done)
+
+    def _locked(self, callback):
+        def run():
+            with self.lock:
+                callback()
 
-    def play_start_audio(self, segment):
+        return run
+
+    def play_start_audio(self, segment, on_done=None):
         """
         Play the start audio for a specific game segment.
 
         Args:
             segment (SegmentType): The segment type.
+            on_done: Optional callback run once the clip has finished playing.
         """
         if segment == SegmentType.CUPID:
-            self.play_audio("Cupidon/Cupidon-1")
+            self.play_audio("Cupidon/Cupidon-1", on_done)
         elif segment == SegmentType.SEER:
-            self.play_audio("Seer/Seer-1")
+            self.play_audio("Seer/Seer-1", on_done)
         elif segment == SegmentType.LOVERS:
-            self.play_audio("Lovers/Lover-1")
+            self.play_audio("Lovers/Lover-1", on_done)
         elif segment == SegmentType.WEREWOLF:
-            self.play_audio("Werewolves/Werewolves-1")
+            self.play_audio("Werewolves/Werewolves-1", on_done)
         elif segment == SegmentType.WITCH_HEAL:
-            self.play_audio("Sorciere-1")
+            self.play_audio("Sorciere-1", on_done)
         elif segment == SegmentType.WITCH_KILL:
-            self.play_audio("Sorciere-2")
+            self.play_audio("Sorciere-2", on_done)
 
     def start_night(self):
         """Start the night phase of the game."""
+        self.night_plan = self.compile_night_plan()
         self.current_segment = 0
-        print("Starting night")
+        self.log.info(
+            "Starting night: %s", [segment.value for segment, _ in self.night_plan]
+        )
         # self.play_audio("Intro")  # Uncomment to play the intro audio
         self.run_current_segment()
 
+    def compile_night_plan(self):
+        """
+        Build the list of segments that will actually run tonight.
+
+        A segment is kept only if its role holder is alive and, for the witch,
+        the matching potion is left. Cupid and the lovers only play on the
+        first night. The plan always ends with the day.
+
+        Returns:
+            list: (SegmentType, closing audio or None) pairs.
+        """
+        plan = [
+            (segment, end_audio)
+            for segment, end_audio in NIGHT_SEGMENTS
+            if self.segment_conditions[segment]()
+        ]
+        witch_turns = [
+            i
+            for i, (segment, _) in enumerate(plan)
+            if segment in (SegmentType.WITCH_HEAL, SegmentType.WITCH_KILL)
+        ]
+        if witch_turns:
+            plan[witch_turns[-1]] = (plan[witch_turns[-1]][0], WITCH_END_AUDIO)
+        plan.append((SegmentType.DAY, None))
+        return plan
+
+    def _cupid_is_active(self):
+        return (
+            self.first_night
+            and self.run_cupid
+            and (self.game.cupid is not None or self._role_is_alive(PlayerRole.CUPID))
+        )
+
+    def _role_is_alive(self, role):
+        return any(p.is_alive for p in self.game.get_players_by_role(role))
+
     def run_current_segment(self):
-        """Run the current segment of the game."""
-        segment = self.segment_order[self.current_segment]
-        if segment == SegmentType.CUPID:
-            if self.first_night and self.run_cupid:
-                self._run_cupid_segment()
-            else:
-                self.advance_segment()
-        elif segment == SegmentType.LOVERS:
-            if self.first_night:
-                self._run_lovers_segment()
-            else:
-                self.advance_segment()
-        elif segment == SegmentType.SEER:
-            self.advance_segment()
-        elif segment == SegmentType.WEREWOLF:
-            self.advance_segment()
-        elif segment == SegmentType.WITCH_HEAL:
-            print("Running witch heal")
-            self.advance_segment()
-        elif segment == SegmentType.WITCH_KILL:
-            self.advance_segment()
-        elif segment == SegmentType.DAY:
-            self.night_finished()
+        """
+        Run segments from the current one until one waits for a player.
+
+        Segments that have nobody to prompt tonight are closed and skipped in
+        the same loop, so the stack depth does not grow with skipped segments.
+        """
+        while True:
+            segment = self.current_segment_name()
+            if segment == SegmentType.DAY:
+                self.play_audio("Wake-up-everyone")
+                self.night_finished()
+                return
+            if self.metrics:
+                self.segment_started = time.perf_counter()
+            if self.segment_runners[segment]():
+                self._await_turn(segment.value)
+                return
+            self._close_current_segment()
 
     def advance_segment(self):
-        """Advance to the next segment in the game sequence."""
-        print("Current segment is ", self.current_segment)
-        if self.current_segment_name() == SegmentType.CUPID and self.first_night:
-            self.play_audio("Cupidon/Cupidon-2")
-        if self.current_segment == 1 and self.first_night:
-            self.play_audio("Lovers/Lover-3")
-        if self.current_segment == 2:
-            self.play_audio("Werewolves/Werewolves-2")
-        if self.current_segment == 4:
-            self.play_audio("Sorciere-3")
-        if self.current_segment == 5:
-            self.play_audio("Wake-up-everyone")
-        self.current_segment = (self.current_segment + 1) % len(self.segment_order)
+        """Close the current segment once its players are done and move on."""
+        self.log.debug("Closing segment %d", self.current_segment)
+        self.clear_turn()
+        if self.current_segment_name() == SegmentType.DAY:
+            self.start_night()
+            return
+        self._close_current_segment()
         self.run_current_segment()
 
+    def _close_current_segment(self):
+        segment, end_audio = self.night_plan[self.current_segment]
+        if self.metrics and self.segment_started is not None:
+            self._observe_segment(segment)
+        if end_audio:
+            self.play_audio(end_audio)
+        self.current_segment += 1
+
+    def _observe_segment(self, segment):
+        self.metrics.observe(
+            "segment_duration_seconds",
+            time.perf_counter() - self.segment_started,
+            segment=segment.value,
+        )
+        self.segment_started = None
+
+    def segment_id(self):
+        """The current segment's value, None before the first night."""
+        if self.current_segment < 0:
+            return None
+        return self.current_segment_name().value
+
     def current_segment_name(self):
         """
         Get the name of the current segment.
@@ -150,66 +306,83 @@ class SegmentManager:
         Returns:
             SegmentType: The type of the current segment.
         """
-        return self.segment_order[self.current_segment]
+        return self.night_plan[self.current_segment][0]
+
+    # Each segment runner prompts the players concerned and returns True if
+    # the game now waits for their answer, False if there is nobody to ask.
 
     def _run_cupid_segment(self):
         """Run the cupid segment of the game."""
-        print("Starting cupid segment")
-        self.play_start_audio(SegmentType.CUPID)
-        print("Cupid SID", self.game.cupid)
-        self.socketio.emit(
-            "cupidon_choice",
-            {"message": "Choose two players to fall in love"},
-            to=self.game.cupid,
+        cupid_sid = self.game.cupid
+        if cupid_sid is None:
+            cupid = self.game.get_player_by_role(PlayerRole.CUPID)
+            cupid_sid = cupid.sid if cupid else None
+        self.log.debug("Cupid is %s", cupid_sid)
+        if cupid_sid is None:
+            return False
+        self.play_start_audio(
+            SegmentType.CUPID,
+            lambda: self.socketio.emit(
+                "cupidon_choice",
+                {"message": "Choose two players to fall in love"},
+                to=cupid_sid,
+            ),
         )
+        return True
 
     def _run_werewolf_segment(self):
         """Run the werewolf segment of the game."""
-        self.play_start_audio(SegmentType.WEREWOLF)
-        werewolves = self.game.get_players_by_role(PlayerRole.WEREWOLF)
-        for werewolf in werewolves:
-            other_werewolves = [w for w in werewolves if w.sid != werewolf.sid]
-            self.socketio.emit(
+        werewolves = [
+            w for w in self.game.get_players_by_role(PlayerRole.WEREWOLF) if w.is_alive
+        ]
+        if not werewolves:
+            return False
+
+        # One payload for the whole pack, each client leaves itself out
+        payload = {
+            "message": "Choose a victim",
+            "werewolves": [w.name for w in werewolves],
+        }
+        self.play_start_audio(
+            SegmentType.WEREWOLF,
+            lambda: self.socketio.emit(
                 "werewolf_wake_up",
-                {
-                    "message": "Choose a victim",
-                    "other_werewolves": [w.name for w in other_werewolves],
-                },
-                to=werewolf.sid,
-            )
+                payload,
+                to=role_room(self.room_id, PlayerRole.WEREWOLF),
+            ),
+        )
+        return True
 
     def _run_witch_heal_segment(self):
         """Run the witch heal segment of the game."""
-        if not self.game.witch_heal_available:
-            return
-        self.play_start_audio(SegmentType.WITCH_HEAL)
         witch = self.game.get_player_by_role(PlayerRole.WITCH)
-        if witch and witch.is_alive and self.game.witch_heal_available:
-            last_victim = None
-            if self.game.pending_deaths:
-                last_victim = self.game.get_player(self.game.pending_deaths[-1])
-
-            if last_victim:
-                try:
-                    self.socketio.emit(
-                        "witch_heal",
-                        {
-                            "message": "Make your choice",
-                            "victim": last_victim.name if last_victim else None,
-                        },
-                        to=witch.sid,
-                    )
-                except Exception as e:
-                    print(e)
+        last_victim = self.game.get_last_pending_death()
+        if not (witch and witch.is_alive and self.game.witch_heal_available):
+            return False
+        if last_victim is None:
+            self.play_start_audio(SegmentType.WITCH_HEAL)
+            return False
+
+        def wake_up_witch():
+            try:
+                self.socketio.emit(
+                    "witch_heal",
+                    {"message": "Make your choice", "victim": last_victim.name},
+                    to=witch.sid,
+                )
+            except Exception as e:
+                self.log.warning("Error waking up the witch: %s", e)
+
+        self.play_start_audio(SegmentType.WITCH_HEAL, wake_up_witch)
+        return True
 
     def _run_witch_kill_segment(self):
         """Run the witch kill segment of the game."""
-        if not self.game.witch_kill_available:
-            return
-        self.play_start_audio(SegmentType.WITCH_KILL)
         witch = self.game.get_player_by_role(PlayerRole.WITCH)
-        print("Witch kill available")
-        if witch and witch.is_alive and self.game.witch_kill_available:
+        if not (witch and witch.is_alive and self.game.witch_kill_available):
+            return False
+
+        def wake_up_witch():
             try:
                 self.socketio.emit(
                     "witch_kill",
@@ -217,155 +390,290 @@ class SegmentManager:
                     to=witch.sid,
                 )
             except Exception as e:
-                print(e)
+                self.log.warning("Error waking up the witch: %s", e)
+
+        self.play_start_audio(SegmentType.WITCH_KILL, wake_up_witch)
+        return True
 
     def _run_seer_segment(self):
         """Run the seer segment of the game."""
-        self.play_start_audio(SegmentType.SEER)
         seer = self.game.get_player_by_role(PlayerRole.SEER)
-        print("Seer is", seer)
-        if seer:
-            self.socketio.emit(
+        if not (seer and seer.is_alive):
+            return False
+
+        self.play_start_audio(
+            SegmentType.SEER,
+            lambda: self.socketio.emit(
                 "seer_choice",
                 {"message": "Choose a player to investigate"},
                 to=seer.sid,
-            )
+            ),
+        )
+        return True
 
     def night_finished(self):
-        """Mark the night phase as finished and start the day vote."""
+        """
+        Mark the night phase as finished, resolve the night's deaths once the
+        summary has been narrated and then start the day vote.
+        """
         self.first_night = False
-        if not self.game.pending_deaths:
-            self.play_audio("Night-end/No-deaths")
+        for player_sid, trigger in self.game.pending_deaths.items():
+            self.deaths.queue_death(player_sid, trigger)
+        self.game.clear_pending_deaths()
+
+        def resolve_night_deaths():
+            self.resolve_deaths(self.finish_night_deaths)
+
+        if not self.deaths.queue:
+            self.play_audio("Night-end/No-deaths", resolve_night_deaths)
         else:
-            self.play_audio("Night-end/Deaths")
-        self.start_day_vote()
+            self.play_audio("Night-end/Deaths", resolve_night_deaths)
+
+    def finish_night_deaths(self):
+        """Continue to the day vote unless the night's deaths ended the game."""
+        if self.game.check_game_over():
+            self.announce_winners()
+        else:
+            self.start_day_vote()
 
     def start_day_vote(self):
         """Start the voting phase during the day."""
-        self.socketio.sleep(1)
-        print("Starting day vote")
-        self.socketio.emit("day_vote")
+        self.log.info("Starting day vote")
+        if self.metrics:
+            self.segment_started = time.perf_counter()
+        self.socketio.emit("day_vote", to=self.room_id)
+        self._await_turn(DAY_TURN)
 
     def alternative_count_votes(self):
         """Alternative method for processing votes and deaths."""
+        self.clear_turn()
+        if self.metrics and self.segment_started is not None:
+            self._observe_segment(SegmentType.DAY)
         self.play_audio("Day-vote/Vote-death")
-        self.death_queue = []
-        self.awaiting_hunter = False
         self.process_vote_deaths()
-        self.process_death_queue()
+        self.game.reset_player_votes()
+        self.resolve_deaths(self.finish_death_queue_processing)
 
     def process_vote_deaths(self):
         """Add voted players to the death queue."""
-        top_players = self.game.get_top_voted_players()
-        for player_sid in top_players:
-            player = self.game.get_player(player_sid)
-            if player:
-                self.queue_death(player, "Vote")
-                if player.lover_sid:
-                    lover = self.game.get_player(player.lover_sid)
-                    if lover:
-                        self.queue_death(lover, "Love")
+        for player_sid in self.game.get_top_voted_players():
+            self.deaths.queue_death(player_sid, DeathTrigger.VILLAGE_VOTE)
 
-    def queue_death(self, player, cause):
+    def resolve_deaths(self, on_resolved):
         """
-        Add a player to the death queue.
+        Resolve every queued death, then call `on_resolved`.
 
         Args:
-            player: Player object to be added to queue.
-            cause (str): String indicating cause of death ('Vote', 'Love', 'Hunter', etc.).
+            on_resolved: Called once the whole chain (lovers, hunter revenge,
+                their lovers...) has been resolved.
         """
-        if not any(p.sid == player.sid for p in self.death_queue):
-            player.death_cause = cause
-            self.death_queue.append(player)
+        self.on_deaths_resolved = on_resolved
+        self.process_death_queue()
 
     def process_death_queue(self):
-        """Process each death in the queue, checking for special powers."""
-        if not self.death_queue:
-            self.finish_death_queue_processing()
+        """
+        Resolve queued deaths until the queue is empty or the hunter has to
+        choose a target. Called again by the hunter_selection handler.
+        """
+        if not self.deaths.resolve(self._execute_death_sequence):
+            hunter = self.game.get_player(self.deaths.awaiting_hunter)
+            self.play_audio(
+                "Hunter/Hunter",
+                lambda: self.socketio.emit(
+                    "hunter_selection",
+                    {"message": "Choose a player to kill"},
+                    to=hunter.sid,
+                ),
+            )
+            self._await_turn(HUNTER_TURN)
             return
 
-        current_player = self.death_queue[0]
-        print("Processing player", current_player.name)
+        self.deaths.reset()
+        on_resolved, self.on_deaths_resolved = self.on_deaths_resolved, None
+        if on_resolved is not None:
+            on_resolved()
 
-        if current_player.role == PlayerRole.HUNTER and self.game.hunter_is_alive:
-            self.play_audio("Hunter/Hunter")
-            self.game.hunter_is_alive = False
-            self.socketio.emit(
-                "hunter_selection",
-                {"message": "Choose a player to kill"},
-                to=current_player.sid,
-            )
-            return
+    def add_hunter_kill_to_pending(self, target_sid):
+        """
+        Queue the hunter's revenge.
 
-        self._execute_death_sequence(current_player)
-        self.death_queue.pop(0)
+        Args:
+            target_sid: The socket ID of the player the hunter chose.
+        """
+        self.deaths.hunter_revenge(target_sid)
 
-        self.process_death_queue()
+    def hunter_selected(self, target_sid):
+        """
+        Resume death resolution once the hunter has chosen.
 
-    def _execute_death_sequence(self, player):
-        """Handle death execution in the correct announcement order."""
-        player.is_alive = False
-        if player.role == PlayerRole.WEREWOLF:
-            self.game.werewolves_alive -= 1
+        Args:
+            target_sid: The socket ID of the hunter's target, or None if the
+                hunter spares everyone.
+        """
+        self.clear_turn()
+        if target_sid:
+            self.add_hunter_kill_to_pending(target_sid)
         else:
-            self.game.villagers_alive -= 1
+            self.deaths.hunter_pass()
+        self.process_death_queue()
 
-        if player.death_cause == "Vote":
-            self.play_audio("Day-vote/Vote-death")
-        elif player.death_cause == "Love":
-            self.play_audio("Day-vote/Lover")
-        elif player.death_cause == "Hunter":
-            pass
+    def _execute_death_sequence(self, player, effect):
+        """Announce a death that the death manager has just resolved."""
 
-        try:
-            self.socketio.emit("alert_dead", to=player.sid)
-        except Exception as e:
-            print(f"Error alerting death for {player.name}: {e}")
+        def alert_dead():
+            try:
+                self.socketio.emit("alert_dead", to=player.sid)
+            except Exception as e:
+                self.log.warning("Error alerting death for %s: %s", player.name, e)
+
+        if effect.trigger == DeathTrigger.VILLAGE_VOTE:
+            self.play_audio("Day-vote/Vote-death", alert_dead)
+        elif effect.trigger == DeathTrigger.LOVER_DEATH:
+            self.play_audio("Day-vote/Lover", alert_dead)
+        else:
+            alert_dead()
 
         if player.role == PlayerRole.WEREWOLF or player.role == PlayerRole.VILLAGER:
             if player.lover_sid:
                 self.game.lovers_are_opposited_teams_and_alive = False
 
-        print(f"{player.name} has been killed due to {player.death_cause}")
+        self.log.info("%s has been killed due to %s", player.name, player.death_cause)
 
     def finish_death_queue_processing(self):
-        """Finish processing deaths and continue the game."""
-        print("Checking remaining deaths in queue...")
-        if self.death_queue:
-            print(f"Found {len(self.death_queue)} remaining deaths to process")
-            self.process_death_queue()
+        """Finish processing the day's deaths and continue the game."""
+        self.log.debug("All deaths processed")
+        if self.game.check_game_over():
+            self.announce_winners()
+        else:
+            self.advance_segment()
+
+    def announce_winners(self):
+        """Play the end-game audio for the winning side."""
+        case = self.game.winners
+        if case == "Villagers":
+            self.play_audio("End-game/Villagers-won")
+        elif case == "Werewolves":
+            self.play_audio("End-game/Werewolves-won")
+        self.socketio.emit("game_over", {"winners": case}, to=self.room_id)
+        self.clear_turn()
+        self._checkpoint()
+
+    def _checkpoint(self):
+        if self.on_checkpoint is not None:
+            self.on_checkpoint()
+
+    def _await_turn(self, turn):
+        """
+        Wait on `turn`'s players, with a deadline if a scheduler is set.
+
+        Args:
+            turn (str): A key of TURN_TIMEOUTS.
+        """
+        self.clear_turn()
+        self.awaiting = turn
+        self.turn_id += 1
+        timeout = self.turn_timeouts.get(turn)
+        if self.deadlines is not None and timeout:
+            turn_id = self.turn_id
+            self.deadline = self.deadlines.call_later(
+                timeout, lambda: self._turn_expired(turn, turn_id)
+            )
+        self._checkpoint()
+        if self.on_turn is not None:
+            self.on_turn(turn)
+
+    def clear_turn(self):
+        """Stop waiting on the current turn and cancel its deadline."""
+        self.awaiting = None
+        if self.deadline is not None:
+            self.deadline.cancel()
+            self.deadline = None
+
+    def _turn_expired(self, turn, turn_id):
+        if self.turn_id != turn_id or self.awaiting != turn:
             return
+        self.deadline = None
+        if self.on_timeout is not None:
+            self.on_timeout(turn)
+
+    def to_state(self):
+        """
+        Serializable position of the table in the game.
 
-        print("All deaths processed, continuing game...")
-        self.awaiting_hunter = False
+        Returns:
+            dict: State to hand back to `load_state`.
+        """
+        return {
+            "current_segment": self.current_segment,
+            "night_plan": [[s.value, audio] for s, audio in self.night_plan],
+            "first_night": self.first_night,
+            "run_cupid": self.run_cupid,
+            "running_hunter_segment": self.running_hunter_segment,
+            "awaiting": self.awaiting,
+            "deaths": self.deaths.to_state(),
+            "on_deaths_resolved": (
+                self.on_deaths_resolved.__name__ if self.on_deaths_resolved else None
+            ),
+        }
+
+    def load_state(self, state):
+        """
+        Restore a position saved by `to_state`. Nothing is played or sent
+        until `resume` is called.
 
-        is_game_over = self.game.check_game_over()
-        if is_game_over:
-            case = self.game.winners
-            if case == "Villagers":
-                self.play_audio("End-game/Villagers-won")
-            elif case == "Werewolves":
-                self.play_audio("End-game/Werewolves-won")
+        Args:
+            state (dict): The saved state.
+        """
+        self.current_segment = state["current_segment"]
+        self.night_plan = [
+            (SegmentType(segment), audio) for segment, audio in state["night_plan"]
+        ]
+        self.first_night = state["first_night"]
+        self.run_cupid = state["run_cupid"]
+        self.running_hunter_segment = state["running_hunter_segment"]
+        self.clear_turn()
+        self.awaiting = state.get("awaiting")
+        self.deaths.load_state(state["deaths"])
+        resolved = state["on_deaths_resolved"]
+        self.on_deaths_resolved = getattr(self, resolved) if resolved else None
+        self.segment_started = None
+
+    def resume(self):
+        """
+        Prompt the players again for whatever the table was waiting on, e.g.
+        after a restart. Narration for the current step is replayed.
+        """
+        if self.current_segment < 0:
+            return
+        if self.current_segment_name() != SegmentType.DAY:
+            self.run_current_segment()
+        elif self.game.winners:
+            self.announce_winners()
+        elif self.deaths.awaiting_hunter or self.deaths.queue:
+            # Night deaths are queued before the clip that starts resolving them
+            if self.on_deaths_resolved is None:
+                self.on_deaths_resolved = self.finish_night_deaths
+            self.process_death_queue()
         else:
-            self.advance_segment()
+            # Ballots cast before the restart are dropped and the vote reopened
+            self.game.reset_player_votes()
+            self.finish_night_deaths()
 
     def check_game_over(self):
         """Check if the game is over and handle end-game logic."""
         is_game_over = self.game.check_game_over()
         if not is_game_over:
-            print("Game is not over, next round")
+            self.log.debug("Game is not over, next round")
             self.start_night()
         else:
-            case = self.game.winners
-            if case == "Villagers":
-                self.play_audio("End-game/Villagers-won")
-            elif case == "Werewolves":
-                self.play_audio("End-game/Werewolves-won")
+            self.announce_winners()
 
     def _run_lovers_segment(self):
         """Run the lovers segment of the game."""
-        self.play_start_audio(SegmentType.LOVERS)
         lovers = self.game.get_lovers()
+        if len(lovers) != 2:
+            return False
+        self.play_start_audio(SegmentType.LOVERS)
         player1, player2 = lovers
 
         self.set_if_lovers_are_opposite_teams(player1, player2)
@@ -376,10 +684,12 @@ class SegmentManager:
         self.socketio.emit("alert_lovers", {"lover": player2.name}, to=player1.sid)
         self.socketio.emit("alert_lovers", {"lover": player1.name}, to=player2.sid)
 
-        self.play_audio("Lovers/Lover-2")
+        def lovers_can_close():
+            self.socketio.emit("lover_can_close", to=player1.sid)
+            self.socketio.emit("lover_can_close", to=player2.sid)
 
-        self.socketio.emit("lover_can_close", to=player1.sid)
-        self.socketio.emit("lover_can_close", to=player2.sid)
+        self.play_audio("Lovers/Lover-2", lovers_can_close)
+        return True
 
     def set_if_lovers_are_opposite_teams(self, player1, player2):
         """
@@ -401,8 +711,8 @@ class SegmentManager:
         Args:
             player_sid: The socket ID of the player.
         """
-        print("Alerting dead player", player_sid)
+        self.log.debug("Alerting dead player %s", player_sid)
         try:
             self.socketio.emit("alert_dead", to=player_sid)
         except Exception as e:
-            print(e)
+            self.log.warning("Error alerting death for %s: %s", player_sid, e)
@@ -1,18 +1,85 @@
+import os
+
 from flask import Flask
 from flask_socketio import SocketIO
 
-from core.game import Game
-from segments.segment_manager import SegmentManager
+from core.logs import setup_logging
+from segments.audio import SilentAudio, StreamingAudio
+from segments.clips import ClipLibrary
+from segments.segment_manager import TURN_TIMEOUTS
+from server.bots import BotDriver
 from server.events import GameEvents
+from server.metrics import Metrics
+from server.persistence import GameStore, restore_rooms
+from server.recording import RecordingStore
+from server.rooms import RoomRegistry
+from server.wire import WireSocketIO
+
 
+def create_app(
+    max_rooms=None,
+    metrics_enabled=None,
+    client_manager=None,
+    state_path=None,
+    turn_timeouts=None,
+    audio=None,
+):
+    log_handler = setup_logging()
+    if metrics_enabled is None:
+        metrics_enabled = os.environ.get("LOUP_GAROU_METRICS", "1") != "0"
+    if state_path is None:
+        state_path = os.environ.get("LOUP_GAROU_STATE_DB")
+    # Turn deadlines are opt-in: a table of family players should not have
+    # its night turns played for it unless the host asked for it
+    if turn_timeouts is None and os.environ.get("LOUP_GAROU_TURN_TIMEOUTS", "0") != "0":
+        turn_timeouts = TURN_TIMEOUTS
+    # Narration: "stream" to the room's clients (default), "speaker" for one
+    # table around the server, which plays the files under ./assets, or
+    # "silent" for headless workers. Clips are read up front only to stream.
+    audio_mode = None
+    if audio is None:
+        audio_mode = os.environ.get("LOUP_GAROU_AUDIO", "stream")
+    clips = ClipLibrary(preload=audio_mode == "stream")
+    if audio_mode == "stream":
+        audio = StreamingAudio(clips)
+    elif audio_mode == "silent":
+        audio = SilentAudio()
 
-def create_app():
     app = Flask(__name__)
-    socketio = SocketIO(app, cors_allowed_origins="*")
+    options = {} if client_manager is None else {"client_manager": client_manager}
+    socketio = SocketIO(app, cors_allowed_origins="*", **options)
 
-    game = Game()
-    segment_manager = SegmentManager(game, socketio)
-    events = GameEvents(game, segment_manager, app, socketio)
+    # Game code emits through the wire layer so msgpack clients get binary
+    emitter = WireSocketIO(socketio)
+    metrics = Metrics(enabled=metrics_enabled)
+    metrics.instrument_emitter(emitter)
+    store = GameStore(state_path) if state_path else None
+    record_dir = os.environ.get("LOUP_GAROU_RECORD_DIR")
+    if record_dir:
+        store = RecordingStore(record_dir, inner=store)
+    rooms = RoomRegistry(
+        emitter, max_rooms=max_rooms, audio=audio, metrics=metrics, store=store
+    )
+    rooms.register_gauges(metrics)
+    metrics.gauge(
+        "log_records_dropped",
+        "Log records dropped because the log queue was full",
+        lambda: log_handler.dropped,
+    )
+    events = GameEvents(
+        rooms,
+        app,
+        emitter,
+        metrics=metrics,
+        turn_timeouts=turn_timeouts,
+        clips=clips,
+    )
+    if isinstance(audio, StreamingAudio):
+        audio.bind(emitter.emit, events.call_later)
     events.register_handlers()
+    if store is not None:
+        restore_rooms(store, rooms, events)
+    events.bots = BotDriver(events)
+    events.bots.attach_all()
 
     return app, socketio
@@ -0,0 +1,269 @@
+"""
+asyncio flavour of the game server, built on python-socketio's AsyncServer.
+
+The game code stays synchronous: every transition is a short, non-blocking
+call (narration runs on the audio scheduler's threads), so it runs directly on
+the event loop. Only the network side is async. `AsyncEmitter` stands in for
+the Flask-SocketIO object the game code emits through: emits and room joins
+are queued while a handler runs and awaited, in order, right after it. Audio
+completion callbacks are hopped back onto the loop so the game is only ever
+touched from one thread; streamed narration is timed on the loop itself.
+
+Run with `python main.py --async`, or mount `create_async_app()[0]` in any
+ASGI server.
+"""
+
+import asyncio
+import json
+import os
+from collections import deque
+from functools import wraps
+from urllib.parse import parse_qs
+
+import socketio
+
+from core.logs import get_logger, setup_logging
+from segments.audio import AudioScheduler, SilentAudio, StreamingAudio
+from segments.clips import CLIP_ROUTE, ClipLibrary
+from segments.segment_manager import TURN_TIMEOUTS
+from server.bots import BotDriver
+from server.events import SERVER_EVENTS, GameEvents
+from server.metrics import Metrics
+from server.persistence import GameStore, restore_rooms
+from server.recording import RecordingStore
+from server.rooms import DEFAULT_ROOM, RoomRegistry
+from server.wire import WireSocketIO
+
+log = get_logger("events")
+
+
+class _RoomOps:
+    """`server.enter_room` / `server.leave_room`, queued on the emitter."""
+
+    def __init__(self, emitter):
+        self.emitter = emitter
+
+    def enter_room(self, sid, room, namespace=None):
+        self.emitter.pending.append(("enter_room", (sid, room), namespace))
+
+    def leave_room(self, sid, room, namespace=None):
+        self.emitter.pending.append(("leave_room", (sid, room), namespace))
+
+
+class AsyncEmitter:
+    """
+    Synchronous emit interface over an AsyncServer.
+
+    Attributes:
+        sio: The AsyncServer operations are forwarded to.
+        pending: Operations queued since the last `flush`.
+    """
+
+    def __init__(self, sio: socketio.AsyncServer):
+        self.sio = sio
+        self.server = _RoomOps(self)
+        self.pending = deque()
+
+    def emit(self, event, data=None, to=None, room=None, skip_sid=None, **kwargs):
+        self.pending.append(("emit", (event, data, skip_sid), to or room))
+
+    def sleep(self, seconds):
+        # Nothing in the game code sleeps anymore; kept for interface parity
+        pass
+
+    def call_later(self, delay, callback):
+        """Run `callback` on the event loop after `delay` seconds, then flush."""
+        asyncio.get_running_loop().call_later(delay, self.run_and_flush, callback)
+
+    def run_and_flush(self, callback):
+        try:
+            callback()
+        except Exception:
+            log.exception("Error in scheduled callback")
+        asyncio.get_running_loop().create_task(self.flush())
+
+    async def flush(self):
+        """Send every queued operation, in the order it was made."""
+        while self.pending:
+            op, args, target = self.pending.popleft()
+            try:
+                if op == "emit":
+                    event, data, skip_sid = args
+                    await self.sio.emit(event, data, to=target, skip_sid=skip_sid)
+                else:
+                    await getattr(self.sio, op)(*args, namespace=target or "/")
+            except Exception as e:
+                log.warning("Error in socket emit: %s", e)
+
+    def wrap(self, handler):
+        """Turn a `handler(sid, *args)` into an AsyncServer handler."""
+
+        @wraps(handler)
+        async def async_handler(sid, *args):
+            try:
+                return handler(sid, *args)
+            finally:
+                await self.flush()
+
+        return async_handler
+
+
+class LoopAudio:
+    """
+    Audio scheduler wrapper that runs completion callbacks on the event loop.
+
+    Clips still play on the scheduler's worker threads; `on_done` is handed
+    back to the loop and followed by a flush of whatever it emitted.
+    """
+
+    def __init__(self, audio, emitter: AsyncEmitter):
+        self.audio = audio
+        self.emitter = emitter
+
+    def play(self, room_id, filename, on_done=None):
+        if on_done is None:
+            self.audio.play(room_id, filename)
+            return
+        loop = asyncio.get_running_loop()
+        self.audio.play(
+            room_id,
+            filename,
+            lambda: loop.call_soon_threadsafe(self.emitter.run_and_flush, on_done),
+        )
+
+    def pending(self, room_id) -> int:
+        return self.audio.pending(room_id)
+
+    def clear(self, room_id):
+        self.audio.clear(room_id)
+
+
+class HttpRoutes:
+    """Minimal ASGI app serving the HTTP routes of the Flask server."""
+
+    def __init__(self, events: GameEvents):
+        self.events = events
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        query = parse_qs(scope.get("query_string", b"").decode())
+        room_id = query.get("room", [DEFAULT_ROOM])[0]
+        path = scope["path"]
+        content_type = "application/json"
+
+        if path.startswith(CLIP_ROUTE):
+            await self.send_clip(scope, send)
+            return
+        if path == "/audio":
+            body, status = self.events.clip_index(), 200
+        elif path == "/players":
+            body, status = self.events.players_response(room_id)
+        elif path == "/get_werewolves":
+            body, status = self.events.werewolves_response(room_id)
+        elif path == "/metrics" and self.events.metrics.enabled:
+            body, status = self.events.metrics.render(), 200
+            content_type = "text/plain; version=0.0.4"
+        elif path == "/metrics":
+            body, status = {"error": "Metrics are disabled"}, 404
+        else:
+            body, status = {"error": "Not found"}, 404
+
+        payload = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", content_type.encode())],
+            }
+        )
+        await send({"type": "http.response.body", "body": payload})
+
+    async def send_clip(self, scope, send):
+        range_header = dict(scope["headers"]).get(b"range")
+        status, headers, body = self.events.clip_response(
+            scope["path"], range_header.decode() if range_header else None
+        )
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (name.lower().encode(), value.encode())
+                    for name, value in headers.items()
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def create_async_app(
+    max_rooms=None,
+    metrics_enabled=None,
+    audio=None,
+    state_path=None,
+    turn_timeouts=None,
+):
+    """
+    Build the ASGI application.
+
+    Returns:
+        tuple: (asgi_app, sio) where `sio` is the AsyncServer.
+    """
+    log_handler = setup_logging()
+    if metrics_enabled is None:
+        metrics_enabled = os.environ.get("LOUP_GAROU_METRICS", "1") != "0"
+    if state_path is None:
+        state_path = os.environ.get("LOUP_GAROU_STATE_DB")
+    # Turn deadlines are opt-in: a table of family players should not have
+    # its night turns played for it unless the host asked for it
+    if turn_timeouts is None and os.environ.get("LOUP_GAROU_TURN_TIMEOUTS", "0") != "0":
+        turn_timeouts = TURN_TIMEOUTS
+    # Narration: "stream" to the room's clients (default), "speaker" for one
+    # table around the server, which plays the files under ./assets, or
+    # "silent" for headless workers. Clips are read up front only to stream.
+    audio_mode = None
+    if audio is None:
+        audio_mode = os.environ.get("LOUP_GAROU_AUDIO", "stream")
+    clips = ClipLibrary(preload=audio_mode == "stream")
+    if audio_mode == "stream":
+        audio = StreamingAudio(clips)
+    elif audio_mode == "silent":
+        audio = SilentAudio()
+    sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins="*")
+    emitter = AsyncEmitter(sio)
+    wire = WireSocketIO(emitter)
+    metrics = Metrics(enabled=metrics_enabled)
+    metrics.instrument_emitter(wire)
+    if not isinstance(audio, StreamingAudio):
+        audio = LoopAudio(audio if audio is not None else AudioScheduler(), emitter)
+    store = GameStore(state_path) if state_path else None
+    record_dir = os.environ.get("LOUP_GAROU_RECORD_DIR")
+    if record_dir:
+        store = RecordingStore(record_dir, inner=store)
+    rooms = RoomRegistry(
+        wire, max_rooms=max_rooms, audio=audio, metrics=metrics, store=store
+    )
+    rooms.register_gauges(metrics)
+    metrics.gauge(
+        "log_records_dropped",
+        "Log records dropped because the log queue was full",
+        lambda: log_handler.dropped,
+    )
+    events = GameEvents(
+        rooms, None, wire, metrics=metrics, turn_timeouts=turn_timeouts, clips=clips
+    )
+    if isinstance(audio, StreamingAudio):
+        # Clips are timed on the loop, their callbacks need no hop
+        audio.bind(wire.emit, emitter.call_later)
+    events.define_handlers()
+    for event, handler in events.handlers.items():
+        if event in SERVER_EVENTS:
+            continue
+        sio.on(event, emitter.wrap(events.dispatcher(event, handler)))
+    if store is not None:
+        restore_rooms(store, rooms, events)
+    events.bots = BotDriver(events)
+    events.bots.attach_all()
+    app = socketio.ASGIApp(sio, other_asgi_app=HttpRoutes(events))
+    return app, sio
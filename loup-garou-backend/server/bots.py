@@ -0,0 +1,218 @@
+"""
+Bot players that fill empty seats and generate load.
+
+Bots are seated with `GameEvents.seat_bots` (or the `add_bots` socket event)
+and play through the same handlers as connected players: every decision is
+dispatched as the event a client would send, so it is checked, journaled and
+replayed like theirs. Decisions come from the policies in
+simulation/policies.py, one policy instance per room and policy name.
+
+The driver does not poll. A room calls it whenever it starts waiting on a
+turn; the room is queued and, after `think_time`, one batch answers the turns
+of every queued room. Each room's bots decide together (e.g. all day ballots
+at once), so thousands of bots over many rooms are driven from one process
+with one timer.
+"""
+
+import random
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.logs import get_logger
+from core.roles import PlayerRole
+from segments.segment_manager import DAY_TURN, HUNTER_TURN, SegmentType
+from simulation.policies import POLICIES
+
+BOT_THINK_TIME = 0.5  # seconds
+
+log = get_logger("bots")
+
+
+class BotDriver:
+    """
+    Answer the turns of the bots seated at every room.
+
+    Args:
+        events: The GameEvents whose handlers the bots' answers go through.
+        think_time: Seconds between a turn starting and the bots answering.
+        seed: Seed of the bots' decisions. Their answers are journaled, so
+            replays do not depend on it.
+    """
+
+    def __init__(self, events, think_time: float = BOT_THINK_TIME, seed=None):
+        self.events = events
+        self.rooms = events.rooms
+        self.think_time = think_time
+        self.rng = random.Random(seed)
+        self.policies: Dict[Tuple[str, str], object] = {}
+        self.due: Dict[str, Tuple[str, int]] = {}  # room -> turn, turn_id
+        self.scheduled = False
+        self._lock = threading.Lock()
+        self.actions = 0
+        self._dispatch: Dict[str, Callable] = {}
+        self.turns = {
+            SegmentType.CUPID.value: self._cupid,
+            SegmentType.LOVERS.value: self._lovers,
+            SegmentType.SEER.value: self._seer,
+            SegmentType.WEREWOLF.value: self._werewolves,
+            SegmentType.WITCH_HEAL.value: self._witch_heal,
+            SegmentType.WITCH_KILL.value: self._witch_kill,
+            HUNTER_TURN: self._hunter,
+            DAY_TURN: self._day_vote,
+        }
+
+    def attach(self, room):
+        """Start answering `room`'s turns for its bots."""
+        room.segments.on_turn = lambda turn: self.turn_started(room.room_id, turn)
+        if room.segments.awaiting is not None:
+            self.turn_started(room.room_id, room.segments.awaiting)
+
+    def attach_all(self):
+        """Attach every room with bots, e.g. after rooms were restored."""
+        for room in list(self.rooms.rooms.values()):
+            if room.bots:
+                self.attach(room)
+
+    def turn_started(self, room_id: str, turn: str):
+        room = self.rooms.get(room_id)
+        if room is None:
+            return
+        with self._lock:
+            self.due[room_id] = (turn, room.segments.turn_id)
+            if self.scheduled:
+                return
+            self.scheduled = True
+        self.events.call_later(self.think_time, self.play_due)
+
+    def play_due(self):
+        """Answer every turn queued since the last batch."""
+        with self._lock:
+            due, self.due = self.due, {}
+            self.scheduled = False
+        for room_id, (turn, turn_id) in due.items():
+            room = self.rooms.get(room_id)
+            if room is None or room.awaiting_rejoin:
+                continue
+            segments = room.segments
+            if segments.awaiting != turn or segments.turn_id != turn_id:
+                continue
+            try:
+                self.turns[turn](room)
+            except Exception:
+                log.exception("Error playing bots in room %s", room_id)
+
+    def policy(self, room, sid: str):
+        key = (room.room_id, room.bots[sid])
+        policy = self.policies.get(key)
+        if policy is None:
+            seed = self.rng.getrandbits(64)
+            policy = self.policies[key] = POLICIES[key[1]](random.Random(seed))
+        return policy
+
+    def forget(self, room_id: str):
+        for key in [key for key in self.policies if key[0] == room_id]:
+            del self.policies[key]
+        with self._lock:
+            self.due.pop(room_id, None)
+
+    def send(self, event: str, sid: str, *args):
+        """Dispatch `event` from bot `sid` like a client's."""
+        dispatch = self._dispatch.get(event)
+        if dispatch is None:
+            dispatch = self._dispatch[event] = self.events.dispatcher(
+                event, self.events.handlers[event]
+            )
+        self.actions += 1
+        dispatch(sid, *args)
+
+    def _bot(self, room, sid: Optional[str]) -> bool:
+        return sid is not None and sid in room.bots
+
+    def _alive_bots(self, room) -> List:
+        players = [room.game.get_player(sid) for sid in room.bots]
+        return [p for p in players if p is not None and p.is_alive]
+
+    def _cupid(self, room):
+        # Same seat the cupid segment prompts
+        cupid = room.game.get_player(room.game.cupid) if room.game.cupid else None
+        cupid = cupid or room.game.get_player_by_role(PlayerRole.CUPID)
+        if cupid is None or not self._bot(room, cupid.sid):
+            return
+        first, second = self.policy(room, cupid.sid).choose_lovers(room.game, cupid)
+        self.send(
+            "cupidon_selection_complete",
+            cupid.sid,
+            [{"sid": first.sid}, {"sid": second.sid}],
+        )
+
+    def _lovers(self, room):
+        for lover in room.game.get_lovers():
+            if self._bot(room, lover.sid):
+                self.send("lover_alert_closed", lover.sid)
+
+    def _seer(self, room):
+        seer = room.game.get_player_by_role(PlayerRole.SEER)
+        if seer is None or not self._bot(room, seer.sid):
+            return
+        policy = self.policy(room, seer.sid)
+        target = policy.seer_target(room.game, seer)
+        if target is not None:
+            policy.seer_saw(seer, target)
+            self.send("seer_check", seer.sid, {"sid": target.sid})
+
+    def _werewolves(self, room):
+        # The pack answers once, and only when every wolf left is a bot
+        pack = [
+            w
+            for w in room.game.get_players_by_role(PlayerRole.WEREWOLF)
+            if w.is_alive
+        ]
+        if not pack or not all(self._bot(room, w.sid) for w in pack):
+            return
+        target = self.policy(room, pack[0].sid).werewolf_target(room.game)
+        if target is not None:
+            self.send("werewolf_kill", pack[0].sid, target.sid)
+
+    def _witch_heal(self, room):
+        witch = room.game.get_player_by_role(PlayerRole.WITCH)
+        if witch is None or not self._bot(room, witch.sid):
+            return
+        victim = room.game.get_last_pending_death()
+        if victim is not None and self.policy(room, witch.sid).witch_heals(
+            room.game, victim
+        ):
+            self.send("witch_heal_victim", witch.sid)
+        else:
+            self.send("witch_no_heal", witch.sid)
+
+    def _witch_kill(self, room):
+        witch = room.game.get_player_by_role(PlayerRole.WITCH)
+        if witch is None or not self._bot(room, witch.sid):
+            return
+        target = self.policy(room, witch.sid).witch_target(room.game, witch)
+        if target is not None:
+            self.send("witch_kill_victim", witch.sid, {"sid": target.sid})
+        else:
+            self.send("witch_no_kill", witch.sid)
+
+    def _hunter(self, room):
+        hunter_sid = room.segments.deaths.awaiting_hunter
+        if not self._bot(room, hunter_sid):
+            return
+        hunter = room.game.get_player(hunter_sid)
+        target = self.policy(room, hunter_sid).hunter_target(room.game, hunter)
+        choice = {"sid": target.sid} if target is not None else None
+        self.send("hunter_selection", hunter_sid, choice)
+
+    def _day_vote(self, room):
+        voters = self._alive_bots(room)
+        by_policy: Dict[str, List] = {}
+        for voter in voters:
+            by_policy.setdefault(room.bots[voter.sid], []).append(voter)
+        for voters in by_policy.values():
+            policy = self.policy(room, voters[0].sid)
+            for voter, target in policy.day_votes(room.game, voters):
+                if room.segments.awaiting != DAY_TURN:
+                    # The last ballot needed closed the vote
+                    return
+                self.send("vote_kill", voter.sid, {"sid": target.sid})
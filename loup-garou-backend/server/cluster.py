@@ -0,0 +1,256 @@
+"""
+Multi-process deployment: N workers, each owning a subset of rooms.
+
+    router (asyncio TCP proxy)  --room affinity-->  worker 0..N-1 (create_app)
+                                                        |
+                                       local message bus (Unix socket hub)
+
+The router peeks at the first HTTP request of every TCP connection, reads the
+`room` query parameter (clients connect with `?room=<id>`; it defaults to
+DEFAULT_ROOM) and pipes the connection, websocket upgrade included, to the
+worker that owns that room. A room therefore lives in exactly one process and
+its emits stay local. Emits addressed to no room, or to a sid or room this
+worker does not host (lobby lists, admin fan-out), go over the bus to every
+other worker.
+
+Run with `python main.py --workers N`.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import pickle
+import socket
+import socketserver
+import struct
+import tempfile
+import threading
+import zlib
+from typing import List
+from urllib.parse import parse_qs, urlsplit
+
+from socketio.manager import Manager
+from socketio.pubsub_manager import PubSubManager
+
+from server.rooms import DEFAULT_ROOM
+
+_FRAME = struct.Struct("!I")
+
+
+def room_worker(room_id: str, workers: int) -> int:
+    """Index of the worker that owns `room_id`, stable across processes."""
+    return zlib.crc32(room_id.encode()) % workers
+
+
+def _send_frame(sock, payload: bytes):
+    sock.sendall(_FRAME.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise ConnectionError("Message bus closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv_frame(sock) -> bytes:
+    (size,) = _FRAME.unpack(_recv_exact(sock, _FRAME.size))
+    return _recv_exact(sock, size)
+
+
+class MessageBus(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Hub that relays every frame it receives to every other connected worker.
+
+    Frames are length-prefixed pickles of python-socketio pub/sub messages.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self.peers = set()
+        self.peers_lock = threading.Lock()
+        super().__init__(path, _BusPeer)
+
+    def publish(self, frame: bytes, sender):
+        with self.peers_lock:
+            peers = [peer for peer in self.peers if peer is not sender]
+        for peer in peers:
+            try:
+                peer.send(frame)
+            except OSError:
+                pass
+
+    def start(self) -> "MessageBus":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class _BusPeer(socketserver.BaseRequestHandler):
+    def setup(self):
+        self.send_lock = threading.Lock()
+        with self.server.peers_lock:
+            self.server.peers.add(self)
+
+    def send(self, frame: bytes):
+        with self.send_lock:
+            _send_frame(self.request, frame)
+
+    def handle(self):
+        try:
+            while True:
+                self.server.publish(_recv_frame(self.request), self)
+        except (ConnectionError, OSError):
+            pass
+
+    def finish(self):
+        with self.server.peers_lock:
+            self.server.peers.discard(self)
+
+
+class LocalBusManager(PubSubManager):
+    """
+    python-socketio client manager backed by a `MessageBus`.
+
+    Unlike the stock pub/sub managers, emits to a room or sid hosted by this
+    worker are delivered locally and never published, so per-room traffic
+    costs nothing on the bus and throughput scales with the worker count.
+    """
+
+    name = "localbus"
+
+    def __init__(self, path: str, channel="socketio", write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.path = path
+        self.sock = None
+        self.send_lock = threading.Lock()
+
+    def _connect(self):
+        if self.sock is None:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(self.path)
+        return self.sock
+
+    def emit(self, event, data, namespace=None, room=None, skip_sid=None,
+             callback=None, to=None, **kwargs):
+        room = to or room
+        if room is not None and room in self.rooms.get(namespace or "/", {}):
+            return Manager.emit(
+                self, event, data, namespace=namespace, room=room,
+                skip_sid=skip_sid, callback=callback,
+            )
+        return super().emit(
+            event, data, namespace=namespace, room=room, skip_sid=skip_sid,
+            callback=callback, **kwargs
+        )
+
+    def _publish(self, data):
+        with self.send_lock:
+            _send_frame(self._connect(), pickle.dumps(data))
+
+    def _listen(self):
+        # A dedicated connection, so listening never contends with publishing
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.path)
+        while True:
+            yield pickle.loads(_recv_frame(sock))
+
+
+class RoomRouter:
+    """
+    TCP proxy pinning every connection to the worker that owns its room.
+
+    Attributes:
+        worker_ports: Port of worker i at index i, all on `worker_host`.
+    """
+
+    def __init__(self, worker_ports: List[int], worker_host="127.0.0.1"):
+        self.worker_ports = worker_ports
+        self.worker_host = worker_host
+
+    def worker_for(self, request_head: bytes) -> int:
+        try:
+            target = request_head.split(b"\r\n", 1)[0].split(b" ")[1].decode()
+            query = parse_qs(urlsplit(target).query)
+            room_id = query.get("room", [DEFAULT_ROOM])[0]
+        except (IndexError, UnicodeDecodeError):
+            room_id = DEFAULT_ROOM
+        return room_worker(room_id, len(self.worker_ports))
+
+    async def handle(self, reader, writer):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            writer.close()
+            return
+        port = self.worker_ports[self.worker_for(head)]
+        try:
+            worker_reader, worker_writer = await asyncio.open_connection(
+                self.worker_host, port
+            )
+        except OSError:
+            writer.close()
+            return
+        worker_writer.write(head)
+        await asyncio.gather(
+            self._pipe(reader, worker_writer), self._pipe(worker_reader, writer)
+        )
+
+    @staticmethod
+    async def _pipe(reader, writer):
+        try:
+            while True:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    break
+                writer.write(chunk)
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def serve_worker(port: int, bus_path: str, host="127.0.0.1", **app_options):
+    """Run one worker: a regular `create_app` server attached to the bus."""
+    from server.app import create_app
+
+    app, socketio = create_app(client_manager=LocalBusManager(bus_path), **app_options)
+    socketio.run(app, host=host, port=port, allow_unsafe_werkzeug=True)
+
+
+def run_cluster(workers: int, host="0.0.0.0", port=5001, base_port=5101, **app_options):
+    """Start the bus, `workers` worker processes and the router; block forever."""
+    bus_path = os.path.join(tempfile.mkdtemp(prefix="loup-garou-"), "bus.sock")
+    bus = MessageBus(bus_path).start()
+    ports = [base_port + i for i in range(workers)]
+    processes = [
+        multiprocessing.Process(
+            target=serve_worker, args=(p, bus_path), kwargs=app_options, daemon=True
+        )
+        for p in ports
+    ]
+    for process in processes:
+        process.start()
+    try:
+        asyncio.run(RoomRouter(ports).serve(host, port))
+    finally:
+        for process in processes:
+            process.terminate()
+        bus.close()
@@ -0,0 +1,141 @@
+"""
+Coalescing and rate limiting for high-frequency client updates.
+
+Werewolves broadcast their current pick every time they tap a player. Only
+the latest pick of each wolf matters to the others, so updates are collected
+for a short window and then sent once per wolf. Each sender is also held to a
+token bucket. An update beyond it is held back, replacing any older held one,
+and sent once the sender has a token again, so a wolf's latest pick always
+reaches the pack.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Tuple
+
+SELECTION_WINDOW = 0.05  # seconds
+SELECTION_RATE = 20.0  # updates per second, per sender
+SELECTION_BURST = 10
+
+
+class SelectionCoalescer:
+    """
+    Merge the updates of one room and send the latest one per sender.
+
+    Args:
+        send: Called with each update's payload when a window closes.
+        schedule: `schedule(delay, callback)` runs callback after delay
+            seconds, e.g. on a background task or the event loop.
+        window: Seconds updates are collected for before being sent.
+        rate: Sustained updates per second allowed per sender.
+        burst: Updates a sender can send back to back before being limited.
+        metrics: Optional Metrics counting updates by outcome.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[dict], None],
+        schedule: Callable[[float, Callable[[], None]], None],
+        window: float = SELECTION_WINDOW,
+        rate: float = SELECTION_RATE,
+        burst: int = SELECTION_BURST,
+        metrics=None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.send = send
+        self.schedule = schedule
+        self.window = window
+        self.rate = rate
+        self.burst = burst
+        self.metrics = metrics
+        self.clock = clock
+        self.pending: Dict[str, dict] = {}
+        self.held: Dict[str, dict] = {}  # latest rate-limited update per sender
+        self.buckets: Dict[str, Tuple[float, float]] = {}  # sid -> tokens, time
+        self.scheduled = False
+        self.retry_scheduled = False
+        self._lock = threading.Lock()
+
+    def submit(self, sid: str, data) -> bool:
+        """
+        Queue `sid`'s update. Returns False if it was rate limited, in which
+        case it is held and sent once `sid` has a token again.
+        """
+        with self._lock:
+            limited = not self._take_token(sid)
+            if limited:
+                self._count("limited")
+                self.held[sid] = data
+                retry = self._retry_delay()
+            else:
+                self.held.pop(sid, None)
+                if sid in self.pending:
+                    self._count("merged")
+                self.pending[sid] = data
+                if self.scheduled:
+                    return True
+                self.scheduled = True
+        if limited:
+            if retry is not None:
+                self.schedule(retry, self._retry)
+            return False
+        if self.window > 0:
+            self.schedule(self.window, self.flush)
+        else:
+            self.flush()
+        return True
+
+    def flush(self):
+        """
+        Send the latest update of every sender seen since the last flush,
+        including held updates whose sender has a token again.
+        """
+        with self._lock:
+            batch, self.pending = self.pending, {}
+            self.scheduled = False
+            for sid in list(self.held):
+                if self._take_token(sid):
+                    batch[sid] = self.held.pop(sid)
+            retry = self._retry_delay()
+        for data in batch.values():
+            self.send(data)
+        self._count("sent", len(batch))
+        if retry is not None:
+            self.schedule(retry, self._retry)
+
+    def _retry(self):
+        with self._lock:
+            self.retry_scheduled = False
+        self.flush()
+
+    def _retry_delay(self):
+        """Seconds until the first held sender has a token, None if no retry is due."""
+        if not self.held or self.retry_scheduled:
+            return None
+        self.retry_scheduled = True
+        now = self.clock()
+        waits = []
+        for sid in self.held:
+            tokens, last = self.buckets[sid]
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            waits.append(max(0.0, (1 - tokens) / self.rate))
+        return max(min(waits), 1e-3)
+
+    def forget(self, sid: str):
+        with self._lock:
+            self.buckets.pop(sid, None)
+            self.held.pop(sid, None)
+
+    def _take_token(self, sid: str) -> bool:
+        now = self.clock()
+        tokens, last = self.buckets.get(sid, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        if tokens < 1:
+            self.buckets[sid] = (tokens, now)
+            return False
+        self.buckets[sid] = (tokens - 1, now)
+        return True
+
+    def _count(self, outcome: str, amount: int = 1):
+        if self.metrics is not None and amount:
+            self.metrics.inc("selection_updates_total", amount, outcome=outcome)
@@ -0,0 +1,72 @@
+"""
+Duplicate and late event detection with client sequence numbers.
+
+A client may append `{"seq": n}` as the last argument of any event, counting
+up from 1 over its whole session. A reconnecting client gets a new sid: it
+sends `rejoin` with its player sid first, then resends what it could not
+deliver, so the same answer can arrive twice. The server keeps, per room and
+per seat (the player sid, whichever connection acts as it), the highest
+sequence number seen and a bitmask of the `SEQUENCE_WINDOW` numbers below it.
+Seats keep their window across disconnects. An event is dropped in O(1) when its
+number was already seen or is older than the window. Events without a
+sequence number are always handled.
+"""
+
+import threading
+from typing import Dict, Optional, Tuple
+
+SEQUENCE_WINDOW = 64
+
+
+def split_seq(args: tuple) -> Tuple[tuple, Optional[int]]:
+    """Take the `{"seq": n}` envelope off an event's arguments, if it has one."""
+    if args:
+        last = args[-1]
+        if isinstance(last, dict) and len(last) == 1 and "seq" in last:
+            seq = last["seq"]
+            if isinstance(seq, int) and not isinstance(seq, bool):
+                return args[:-1], seq
+    return args, None
+
+
+class SequenceWindow:
+    """
+    Sliding windows over the sequence numbers of one room's seats.
+
+    Args:
+        size: How many numbers below the highest one are remembered. Older
+            numbers are treated as late and dropped.
+    """
+
+    def __init__(self, size: int = SEQUENCE_WINDOW):
+        self.size = size
+        self.mask = (1 << size) - 1
+        # player sid -> (highest seq, bit i set if highest - i was seen)
+        self.senders: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def accept(self, sid: str, seq: int) -> bool:
+        """Record `seq` from `sid`. Returns False if it is a duplicate or late."""
+        if seq < 1:
+            return False
+        with self._lock:
+            highest, seen = self.senders.get(sid, (0, 0))
+            if seq > highest:
+                shift = seq - highest
+                seen = ((seen << shift) | 1) & self.mask if shift < self.size else 1
+                self.senders[sid] = (seq, seen)
+                return True
+            offset = highest - seq
+            if offset >= self.size or (seen >> offset) & 1:
+                return False
+            self.senders[sid] = (highest, seen | (1 << offset))
+            return True
+
+    def forget(self, sid: str):
+        self.senders.pop(sid, None)
+
+    def to_state(self) -> dict:
+        return {sid: list(window) for sid, window in self.senders.items()}
+
+    def load_state(self, state: dict):
+        self.senders = {sid: (highest, seen) for sid, (highest, seen) in state.items()}
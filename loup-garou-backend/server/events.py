@@ -1,37 +1,440 @@
-from colorama import Fore, Style, init
-from flask import jsonify, request
-from flask_socketio import SocketIO
+from contextlib import nullcontext
+from functools import wraps
+from typing import Optional
 
-from core.game import Game
+from core.death_types import DeathTrigger
 from core.roles import PlayerRole
-from segments.segment_manager import SegmentManager
-
-init()
+from segments.segment_manager import DAY_TURN, HUNTER_TURN, SegmentType
+from server.coalesce import SELECTION_WINDOW, SelectionCoalescer
+from server.dedup import split_seq
+from server.metrics import Metrics
+from server.persistence import UNJOURNALED_EVENTS
+from server.rooms import DEFAULT_ROOM, Room, RoomRegistry, bot_sid
+from server.timers import TimerWheel
+from server.wire import decode_args
+from simulation.policies import POLICIES
+
+# Dispatched by the server itself, never accepted from clients
+SERVER_EVENTS = {"turn_timeout"}
+# Events binding a new sid to the payload's room: event -> required field
+JOIN_EVENTS = {"add_player": "name", "add_mock_players": "controllerSid"}
 
 
 class GameEvents:
-    def __init__(self, game: Game, segment_manager: SegmentManager, app, socketio):
-        self.game = game
-        self.segments = segment_manager
+    """
+    Socket handlers and HTTP routes of the game server.
+
+    Handlers take the sender's sid as their first argument so the same
+    handlers serve both the Flask-SocketIO server (`register_handlers`) and
+    the asyncio server in server/async_app.py (`define_handlers` plus its own
+    registration). `socketio` only needs `emit` and `server.enter_room` /
+    `server.leave_room`.
+
+    With `turn_timeouts` (see TURN_TIMEOUTS), every turn a room waits on gets a
+    deadline on a shared TimerWheel. When it passes, a `turn_timeout` event is
+    dispatched (and journaled) as the room's timer sid and the turn's default
+    action is played.
+    """
+
+    def __init__(
+        self,
+        rooms: RoomRegistry,
+        app,
+        socketio,
+        metrics=None,
+        selection_window: float = SELECTION_WINDOW,
+        turn_timeouts=None,
+        clips=None,
+    ):
+        self.rooms = rooms
         self.app = app
-        self.lover_alerts_closed = 0
-        self.kill_votes_count = 0
-        self.alive_players_count = 0
         self.socketio = socketio
-        self.mock_controllers = {}
+        self.metrics = metrics if metrics is not None else Metrics(enabled=False)
+        self.metrics.describe(
+            "selection_updates_total",
+            "counter",
+            "Werewolf selection updates by outcome (sent, merged, limited)",
+        )
+        self.selection_window = selection_window
+        # ClipLibrary served at /audio/, see segments/clips.py
+        self.clips = clips
+        self.handlers = {}
+        self.metrics.describe(
+            "turn_timeouts_total", "counter", "Turns that ran out of time, by turn"
+        )
+        self.metrics.describe(
+            "duplicate_events_total",
+            "counter",
+            "Client events dropped as already seen or too late, by event",
+        )
+        if turn_timeouts:
+            rooms.deadlines = TimerWheel(self.call_later)
+            rooms.turn_timeouts = turn_timeouts
+        # BotDriver playing the seated bots, see server/bots.py
+        self.bots = None
+
+    def on(self, event: str):
+        """Record a socket handler, timing it when metrics are enabled."""
+
+        def decorator(handler):
+            self.handlers[event] = self.metrics.timed(
+                "socketio_event_duration_seconds", handler, event=event
+            )
+            return handler
+
+        return decorator
+
+    def enter_room(self, sid: str, room_id: str):
+        self.socketio.server.enter_room(sid, room_id, namespace="/")
+
+    def leave_room(self, sid: str, room_id: str):
+        self.socketio.server.leave_room(sid, room_id, namespace="/")
+
+    def call_later(self, delay: float, callback):
+        """Run `callback` after `delay` seconds without blocking the caller."""
+        call_later = getattr(self.socketio, "call_later", None)
+        if call_later is not None:
+            call_later(delay, callback)
+            return
+
+        def run():
+            self.socketio.sleep(delay)
+            callback()
+
+        self.socketio.start_background_task(run)
+
+    def selection_coalescer(self, room: Room) -> SelectionCoalescer:
+        if room.selection_updates is None:
+            werewolf_room = room.role_room(PlayerRole.WEREWOLF)
+            room.selection_updates = SelectionCoalescer(
+                lambda data: self.socketio.emit(
+                    "new_selection_count", data, to=werewolf_room
+                ),
+                self.call_later,
+                window=self.selection_window,
+                metrics=self.metrics,
+            )
+        return room.selection_updates
 
     def register_handlers(self):
+        """Register every socket handler and HTTP route on Flask-SocketIO."""
+        self.define_handlers()
+        self.register_routes()
+        for event, handler in self.handlers.items():
+            if event in SERVER_EVENTS:
+                continue
+            dispatch = self.dispatcher(event, handler)
+            self.socketio.on(event)(self._with_request_sid(dispatch))
+
+    @staticmethod
+    def _with_request_sid(handler):
+        # Flask is imported by the Flask-SocketIO registration only, so the
+        # asyncio server starts without it
+        from flask import request
+
+        @wraps(handler)
+        def flask_handler(*args):
+            return handler(request.sid, *args)
+
+        return flask_handler
+
+    def dispatcher(self, event: str, handler):
+        """
+        Wrap a handler for a transport: map a rejoined connection to the seat
+        it took over, decode msgpack payloads, drop events whose sequence
+        number was already seen (see server/dedup.py) and journal the event
+        when persistence is enabled. The handler runs with the room locked.
+        """
+        rooms = self.rooms
+        journaled = rooms.store is not None and event not in UNJOURNALED_EVENTS
+
+        @wraps(handler)
+        def dispatch(sid, *args):
+            if event == "disconnect":
+                forget = getattr(self.socketio, "forget", None)
+                if forget is not None:
+                    forget(sid)
+                if sid in rooms.player_connections:
+                    # The seat's old connection closing after the player
+                    # rejoined on a new one, which keeps the seat
+                    return None
+            sid = rooms.sid_aliases.get(sid, sid)
+            try:
+                args = decode_args(args)
+            except Exception as e:
+                self.socketio.emit(
+                    "error", {"message": f"Malformed payload: {e}"}, to=sid
+                )
+                return None
+            handled, seq = split_seq(args)
+            room = self.target_room(sid, event, handled)
+            with room.lock if room is not None else nullcontext():
+                if seq is not None and not self.accept_seq(sid, event, seq, room):
+                    return None
+                if not journaled:
+                    return handler(sid, *handled)
+                # The sequence number is journaled too, replay rebuilds the window
+                with rooms.journaling(sid, event, args):
+                    return handler(sid, *handled)
+
+        return dispatch
+
+    def target_room(self, sid: str, event: str, args: tuple) -> Optional[Room]:
+        """The room an event acts on, so it can be locked before it is handled."""
+        data = args[0] if args and isinstance(args[0], dict) else None
+        if data is not None and data.get(JOIN_EVENTS.get(event)):
+            try:
+                return self.rooms.get_or_create(data.get("room", DEFAULT_ROOM))
+            except ValueError:
+                return None  # The handler reports it
+        if data is not None and event == "rejoin":
+            return self.rooms.room_for_sid(data.get("sid"))
+        return self.rooms.room_for_sid(sid)
+
+    def accept_seq(
+        self, sid: str, event: str, seq: int, room: Optional[Room] = None
+    ) -> bool:
+        """
+        False if seat `sid` already sent `seq`, or too long ago to tell. `sid`
+        is the player sid, resolved from the connection's alias. `room` is the
+        room the event acts on, for joins whose sid is not bound to it yet.
+        """
+        if room is None:
+            room = self.rooms.room_for_sid(sid)
+        if room is None or room.sequences.accept(sid, seq):
+            return True
+        self.metrics.inc("duplicate_events_total", event=event)
+        return False
+
+    def register_routes(self):
+        from flask import Response, jsonify, request
+
+        @self.app.route("/players", methods=["GET"])
+        def get_players():
+            return self.players_response(request.args.get("room", DEFAULT_ROOM))
+
+        @self.app.route("/metrics", methods=["GET"])
+        def get_metrics():
+            if not self.metrics.enabled:
+                return jsonify({"error": "Metrics are disabled"}), 404
+            return Response(
+                self.metrics.render(), mimetype="text/plain; version=0.0.4"
+            )
+
+        @self.app.route("/get_werewolves", methods=["GET"])
+        def get_werewolves():
+            return self.werewolves_response(request.args.get("room", DEFAULT_ROOM))
 
-        @self.socketio.on("add_mock_players")
-        def handle_add_mock_players(data):
+        @self.app.route("/audio", methods=["GET"])
+        def get_clip_index():
+            return jsonify(self.clip_index())
+
+        @self.app.route("/audio/<path:name>", methods=["GET"])
+        def get_clip(name):
+            status, headers, body = self.clip_response(
+                request.path, request.headers.get("Range")
+            )
+            return Response(body, status=status, headers=headers)
+
+    def clip_index(self):
+        return self.clips.index() if self.clips is not None else []
+
+    def clip_response(self, path: str, range_header=None):
+        if self.clips is None:
+            return 404, {"Content-Type": "text/plain"}, b"Not found"
+        return self.clips.response(path, range_header)
+
+    def players_response(self, room_id: str):
+        try:
+            room = self.rooms.get(room_id)
+            version, players = room.game.players_snapshot() if room else (0, [])
+            return {"version": version, "players": players}, 200
+        except Exception as e:
+            return {"error": str(e)}, 500
+
+    def werewolves_response(self, room_id: str):
+        try:
+            room = self.rooms.get(room_id)
+            werewolves = (
+                room.game.get_players_by_role(PlayerRole.WEREWOLF) if room else []
+            )
+            return {"werewolves": [w.to_dict() for w in werewolves]}, 200
+        except Exception as e:
+            return {"error": str(e)}, 500
+
+    def room_for(self, sid: str) -> Room:
+        room = self.rooms.room_for_sid(sid)
+        if room is None:
+            raise ValueError("Player is not in a room")
+        return room
+
+    def turn_room(self, sid: str, turn: str):
+        """The sender's room if it waits on `turn`, else None (answer is late)."""
+        room = self.room_for(sid)
+        if room.segments.awaiting != turn:
+            self.socketio.emit("error", {"message": "This turn is over"}, to=sid)
+            return None
+        return room
+
+    def seat_bots(self, room: Room, count: int, policy: str, start: bool = True):
+        """
+        Seat `count` bot players. With `start`, the roles are dealt and the
+        night starts once the table is full.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown bot policy: {policy}")
+        if room.segments.current_segment >= 0:
+            raise ValueError("The game has already started")
+        for _ in range(count):
+            sid = bot_sid(room.room_id, len(room.bots))
+            room.bots[sid] = policy
+            self.rooms.bind_sid(sid, room.room_id, connected=False)
+            room.game.add_player(f"Bot {len(room.bots)}", sid)
+        if self.bots is not None:
+            self.bots.attach(room)
+        if start and len(room.game.players) >= 6:
+            self.start_game(room)
+
+    def start_game(self, room: Room, roles=None):
+        """Deal the roles (`roles` in seating order if given) and start the night."""
+        if roles is None:
+            room.game.assign_roles()
+        else:
+            for player, role in zip(list(room.game.players.values()), roles):
+                room.game.set_player_role(player, role)
+        self.alert_player_for_roles(room)
+        room.segments.start_night()
+
+    def play_default_turn(self, room: Room, turn: str):
+        """
+        Close a turn nobody answered: the wolves pick a random victim, the day
+        vote counts only the ballots cast, the hunter spares everyone, and
+        cupid, the seer and the witch skip their action.
+        """
+        game = room.game
+        if turn == DAY_TURN:
+            self.reset_counters(room)
+            room.segments.alternative_count_votes()
+            return
+        if turn == HUNTER_TURN:
+            room.segments.hunter_selected(None)
+            return
+        if turn == SegmentType.WEREWOLF.value:
+            victims = [
+                p for p in game.alive_players.values() if p.role != PlayerRole.WEREWOLF
+            ]
+            if victims:
+                game.add_pending_death(
+                    game.rng.choice(victims), DeathTrigger.WEREWOLF_KILL
+                )
+        elif turn == SegmentType.LOVERS.value:
+            room.lover_alerts_closed.clear()
+        room.segments.advance_segment()
+
+    def define_handlers(self):
+
+        @self.on("turn_timeout")
+        def handle_turn_timeout(sid, turn):
+            room = self.room_for(sid)
+            if room.segments.awaiting != turn:
+                return
+            self.metrics.inc("turn_timeouts_total", turn=turn)
+            self.socketio.emit("turn_timeout", {"turn": turn}, to=room.room_id)
+            self.play_default_turn(room, turn)
+
+        @self.on("add_bots")
+        def handle_add_bots(sid, data):
+            try:
+                room = self.room_for(sid)
+                self.seat_bots(
+                    room, int(data.get("count", 1)), data.get("policy", "random")
+                )
+            except Exception as e:
+                self.socketio.emit("error", {"message": str(e)}, to=sid)
+
+        @self.on("connect")
+        def handle_connect(sid, *args):
+            # Flask-SocketIO passes (auth,), the asyncio server (environ, auth)
+            negotiate = getattr(self.socketio, "negotiate", None)
+            if negotiate is not None:
+                negotiate(sid, args[-1] if args else None)
+
+        @self.on("disconnect")
+        def handle_disconnect(sid, reason=None):
+            room = self.rooms.room_for_sid(sid)
+            player = room.game.get_player(sid) if room is not None else None
+            # A dealt player keeps their seat so they can rejoin mid-game
+            seated = player is not None and player.role is not None
+            room = self.rooms.unbind_sid(sid, keep_seat=seated)
+            if room is not None:
+                self.leave_room(sid, room.room_id)
+                if room.selection_updates is not None:
+                    room.selection_updates.forget(sid)
+                if not room.sids:
+                    self.rooms.evict(room.room_id)
+                    if self.bots is not None:
+                        self.bots.forget(room.room_id)
+                    return
+                if player is not None and not seated:
+                    room.game.remove_player(sid)
+                    room.sequences.forget(sid)
+
+        @self.on("rejoin")
+        def handle_rejoin(sid, data):
+            try:
+                player_sid = data["sid"]
+                room = self.rooms.rebind_sid(sid, player_sid)
+                self.enter_room(sid, room.room_id)
+                self.enter_room(sid, player_sid)
+                player = room.game.get_player(player_sid)
+                if player is not None:
+                    room.join_role_room(player)
+                    self.socketio.emit("player_data", player.to_dict(), to=sid)
+                if player_sid in room.awaiting_rejoin:
+                    room.awaiting_rejoin.discard(player_sid)
+                    if not room.awaiting_rejoin:
+                        room.resume()
+            except Exception as e:
+                self.socketio.emit("error", {"message": str(e)}, to=sid)
+
+        @self.on("request_player_list")
+        def handle_request_player_list(sid, data=None):
+            try:
+                room = self.room_for(sid)
+                since = (data or {}).get("version")
+                changes = None
+                if since is not None:
+                    changes = room.game.player_list.since(since)
+                if changes is None:
+                    version, players = room.game.players_snapshot()
+                    self.socketio.emit(
+                        "player_list_snapshot",
+                        {"version": version, "players": players},
+                        to=sid,
+                    )
+                    return
+                for version, event, payload in changes:
+                    self.socketio.emit(
+                        event, {"version": version, "player": payload}, to=sid
+                    )
+            except Exception as e:
+                self.socketio.emit("error", {"message": str(e)}, to=sid)
+
+        @self.on("add_mock_players")
+        def handle_add_mock_players(sid, data):
             try:
                 mock_players = data.get("players", [])
                 controller_sid = data.get("controllerSid")
                 if not controller_sid:
                     raise ValueError("Controller SID required")
-                self.mock_controllers[controller_sid] = [p["sid"] for p in mock_players]
+                room = self.rooms.bind_sid(
+                    controller_sid, data.get("room", DEFAULT_ROOM)
+                )
+                self.enter_room(sid, room.room_id)
+                room.mock_controllers[controller_sid] = [p["sid"] for p in mock_players]
                 for player_data in mock_players:
-                    player = self.game.add_player(
+                    self.rooms.bind_sid(player_data["sid"], room.room_id, connected=False)
+                    player = room.game.add_player(
                         name=player_data["name"], sid=player_data["sid"]
                     )
                     self.socketio.emit(
@@ -39,251 +442,250 @@ class GameEvents:
                         {"playerId": player.sid, "data": player.to_dict()},
                         to=controller_sid,
                     )
-                self.socketio.emit(
-                    "update_players_list",
-                    [p.to_dict() for p in self.game.players.values()],
-                )
-                if len(self.game.players) >= 6:
-                    self.game.assign_roles()
-                    self.alert_player_for_roles()
-                    self.segments.start_night()
+                if len(room.game.players) >= 6:
+                    room.game.assign_roles()
+                    self.alert_player_for_roles(room)
+                    room.segments.start_night()
             except Exception as e:
-                self.socketio.emit("error", {"message": str(e)}, broadcast=True)
+                self.socketio.emit("error", {"message": str(e)}, to=sid)
 
-        @self.socketio.on("mock_player_action")
-        def handle_mock_player_action(data):
+        @self.on("mock_player_action")
+        def handle_mock_player_action(sid, data):
             try:
                 player_id = data.get("playerId")
                 action = data.get("action")
                 choice = data.get("choice")
                 controller_sid = data.get("controllerSid")
 
-                if not controller_sid in self.mock_controllers:
+                room = self.room_for(controller_sid)
+                if not controller_sid in room.mock_controllers:
                     raise ValueError("Invalid controller")
-                if not player_id in self.mock_controllers[controller_sid]:
+                if not player_id in room.mock_controllers[controller_sid]:
                     raise ValueError("Invalid mock player")
 
+                game = room.game
                 if action == "vote":
-                    self.game.set_player_vote(choice)
+                    game.set_player_vote(choice, voter_sid=player_id)
                 elif action == "werewolf_kill":
-                    target = self.game.get_player(choice)
-                    if target and target.lover_sid:
-                        lover = self.game.get_player(target.lover_sid)
-                        if lover:
-                            self.game.add_pending_death(lover)
+                    target = game.get_player(choice)
                     if target is not None:
-                        self.game.add_pending_death(target)
+                        game.add_pending_death(target, DeathTrigger.WEREWOLF_KILL)
                 elif action == "witch_heal":
-                    last_victim = self.game.get_player(self.game.pending_deaths[-1])
-                    if last_victim and last_victim.lover_sid:
-                        last_victim_lover = self.game.get_player(last_victim.lover_sid)
-                        if last_victim_lover:
-                            self.game.remove_pending_death(last_victim_lover)
+                    last_victim = game.get_last_pending_death()
                     if last_victim:
-                        self.game.remove_pending_death(last_victim)
-                        self.game.witch_heal_available = False
+                        game.remove_pending_death(last_victim)
+                        game.witch_heal_available = False
                 elif action == "witch_kill":
-                    target = self.game.get_player(choice)
+                    target = game.get_player(choice)
                     if target:
-                        if target.lover_sid:
-                            lover = self.game.get_player(target.lover_sid)
-                            if lover:
-                                self.game.add_pending_death(lover)
-                        self.game.add_pending_death(target)
-                        self.game.witch_kill_available = False
+                        game.add_pending_death(target, DeathTrigger.WITCH_KILL)
+                        game.witch_kill_available = False
 
                 # Advance game state if needed
-                self.segments.advance_segment()
+                room.segments.advance_segment()
 
             except Exception as e:
                 self.socketio.emit("error", {"message": str(e)}, to=controller_sid)
 
-        @self.app.route("/players", methods=["GET"])
-        def get_players():
-            try:
-                return (
-                    jsonify(
-                        {"players": [p.to_dict() for p in self.game.players.values()]}
-                    ),
-                    200,
-                )
-            except Exception as e:
-                return jsonify({"error": str(e)}), 500
-
-        @self.app.route("/get_werewolves", methods=["GET"])
-        def get_werewolves():
-            try:
-                werewolves = self.game.get_players_by_role(PlayerRole.WEREWOLF)
-                return jsonify({"werewolves": [w.to_dict() for w in werewolves]}), 200
-            except Exception as e:
-                return jsonify({"error": str(e)}), 500
-
-        @self.socketio.on("add_player")
-        def handle_add_player(data):
+        @self.on("add_player")
+        def handle_add_player(sid, data):
             try:
                 if "name" not in data:
                     raise ValueError("Player name required")
 
-                player = self.game.add_player(data["name"], request.sid)
+                room = self.rooms.bind_sid(sid, data.get("room", DEFAULT_ROOM))
+                self.enter_room(sid, room.room_id)
+                player = room.game.add_player(data["name"], sid)
 
-                # if len(self.game.players) < 5:
-                #     self.game.add_mock_players(5 - len(self.game.players))
+                # if len(room.game.players) < 5:
+                #     room.game.add_mock_players(5 - len(room.game.players))
 
                 try:
-                    self.socketio.emit("player_data", player.to_dict(), to=request.sid)
+                    self.socketio.emit("player_data", player.to_dict(), to=sid)
                 except Exception as e:
-                    print("Error in socket emit:", str(e))
-                try:
-                    self.socketio.emit(
-                        "update_players_list",
-                        [p.to_dict() for p in self.game.players.values()],
-                        room=None,
-                    )
-                except Exception as e:
-                    print("Error in socket emit:", str(e))
+                    room.log.warning("Error in socket emit: %s", e)
 
-                if len(self.game.players) >= 6:
-                    self.game.assign_roles()
-                    self.alert_player_for_roles()
-                    self.segments.start_night()
+                if len(room.game.players) >= 6:
+                    room.game.assign_roles()
+                    self.alert_player_for_roles(room)
+                    room.segments.start_night()
 
             except Exception as e:
-                self.socketio.emit("error", {"message": str(e)}, to=request.sid)
+                self.socketio.emit("error", {"message": str(e)}, to=sid)
 
-        @self.socketio.on("cupidon_selection_complete")
-        def handle_cupidon_selection(data):
+        @self.on("cupidon_selection_complete")
+        def handle_cupidon_selection(sid, data):
             try:
+                room = self.turn_room(sid, SegmentType.CUPID.value)
+                if room is None:
+                    return
                 sids = [player["sid"] for player in data]
-                player1 = self.game.get_player(sids[0])
-                player2 = self.game.get_player(sids[1])
+                player1 = room.game.get_player(sids[0])
+                player2 = room.game.get_player(sids[1])
 
                 if not player1 or not player2:
                     raise ValueError("Invalid player selection")
 
-                self.game.set_lovers(player1, player2)
-                # self.game.temporary_function()
-                self.segments.advance_segment()
+                room.game.set_lovers(player1, player2)
+                # room.game.temporary_function()
+                room.segments.advance_segment()
 
             except Exception as e:
-                self.socketio.emit("error", {"message": str(e)}, to=request.sid)
-
-        @self.socketio.on("lover_alert_closed")
-        def handle_lover_alert_closed():
-            self.lover_alerts_closed += 1
-            if self.lover_alerts_closed == 2:
-                self.segments.advance_segment()
-
-        @self.socketio.on("update_werewolf_selection_count")
-        def handle_werewolf_selection(data):
+                self.socketio.emit("error", {"message": str(e)}, to=sid)
+
+        @self.on("lover_alert_closed")
+        def handle_lover_alert_closed(sid):
+            room = self.turn_room(sid, SegmentType.LOVERS.value)
+            if room is None:
+                return
+            room.lover_alerts_closed.add(sid)
+            if len(room.lover_alerts_closed) == 2:
+                room.lover_alerts_closed.clear()
+                room.segments.advance_segment()
+
+        @self.on("update_werewolf_selection_count")
+        def handle_werewolf_selection(sid, data):
             try:
-                werewolves = self.game.get_players_by_role(PlayerRole.WEREWOLF)
-                for werewolf in werewolves:
-                    self.socketio.emit("new_selection_count", data, to=werewolf.sid)
+                room = self.room_for(sid)
+                self.selection_coalescer(room).submit(sid, data)
             except Exception as e:
-                self.socketio.emit("error", {"message": str(e)}, to=request.sid)
+                self.socketio.emit("error", {"message": str(e)}, to=sid)
 
-        @self.socketio.on("werewolf_kill")
-        def handle_werewolf_kill(data):
+        @self.on("werewolf_kill")
+        def handle_werewolf_kill(sid, data):
             try:
-                target = self.game.get_player(data)
+                room = self.turn_room(sid, SegmentType.WEREWOLF.value)
+                if room is None:
+                    return
+                target = room.game.get_player(data)
                 if not target:
                     raise ValueError("Invalid target player")
 
-                if target.lover_sid:
-                    lover = self.game.get_player(target.lover_sid)
-                    if lover:
-                        self.game.add_pending_death(lover)
-                self.game.add_pending_death(target)
+                room.game.add_pending_death(target, DeathTrigger.WEREWOLF_KILL)
 
-                self.segments.advance_segment()
+                room.segments.advance_segment()
 
             except Exception as e:
-                self.socketio.emit("error", {"message": str(e)}, to=request.sid)
-
-        @self.socketio.on("seer_check")
-        def handle_seerd_check(data):
-            target_player = self.game.get_player(data["sid"])
-            if not target_player:
-                raise ValueError("Invalid target player")
-            self.socketio.emit(
-                "role_reveal", {"role": target_player.role.value}, to=request.sid
-            )
-
-        @self.socketio.on("hunter_selection")
-        def handle_hunter_selection(data):
-            target_sid = data["sid"]
-            self.segments.add_hunter_kill_to_pending(target_sid)
-            self.segments.finish_death_queue_processing()
+                self.socketio.emit("error", {"message": str(e)}, to=sid)
 
-        @self.socketio.on("witch_heal_victim")
-        def handle_witch_heal_victim():
+        @self.on("seer_check")
+        def handle_seerd_check(sid, data):
             try:
-                last_victim = self.game.get_player(self.game.pending_deaths[-1])
-                if last_victim.lover_sid:
-                    self.game.remove_pending_death(last_victim.lover_sid)
-                self.game.remove_pending_death(last_victim)
-
-                self.game.witch_heal_available = False
+                room = self.turn_room(sid, SegmentType.SEER.value)
+                if room is None:
+                    return
+                target_sid = data["sid"] if isinstance(data, dict) else data
+                target_player = room.game.get_player(target_sid)
+                if not target_player or target_player.role is None:
+                    raise ValueError("Invalid target player")
+                self.socketio.emit(
+                    "role_reveal", {"role": target_player.role.value}, to=sid
+                )
+                room.segments.advance_segment()
             except Exception as e:
-                self.socketio.emit("error", {"message": str(e)}, to=request.sid)
-            self.segments.advance_segment()
-
-        @self.socketio.on("witch_kill_victim")
-        def handle_witch_kill_victim(data):
+                self.socketio.emit("error", {"message": str(e)}, to=sid)
+
+        @self.on("hunter_selection")
+        def handle_hunter_selection(sid, data=None):
+            room = self.turn_room(sid, HUNTER_TURN)
+            if room is None:
+                return
+            target_sid = data["sid"] if data else None
+            room.segments.hunter_selected(target_sid)
+
+        @self.on("witch_heal_victim")
+        def handle_witch_heal_victim(sid):
+            room = self.turn_room(sid, SegmentType.WITCH_HEAL.value)
+            if room is None:
+                return
+            try:
+                last_victim = room.game.get_last_pending_death()
+                if last_victim is None:
+                    raise ValueError("No victim to heal")
+                room.game.remove_pending_death(last_victim)
 
+                room.game.witch_heal_available = False
+            except Exception as e:
+                self.socketio.emit("error", {"message": str(e)}, to=sid)
+            room.segments.advance_segment()
+
+        @self.on("witch_kill_victim")
+        def handle_witch_kill_victim(sid, data):
+            room = self.turn_room(sid, SegmentType.WITCH_KILL.value)
+            if room is None:
+                return
             try:
                 target_sid = data["sid"]
-                target = self.game.get_player(target_sid)
+                target = room.game.get_player(target_sid)
+                if target is None:
+                    raise ValueError("Invalid target player")
 
-                if target.lover_sid:
-                    lover = self.game.get_player(target.lover_sid)
-                    if lover:
-                        self.game.add_pending_death(lover)
-                self.game.add_pending_death(target)
+                room.game.add_pending_death(target, DeathTrigger.WITCH_KILL)
 
-                self.game.witch_kill_available = False
+                room.game.witch_kill_available = False
             except Exception as e:
-                print("Can't kill witch victim", e)
-
-            self.segments.advance_segment()
-
-        @self.socketio.on("witch_no_heal")
-        def handle_witch_no_heal():
-            self.segments.advance_segment()
-
-        @self.socketio.on("witch_no_kill")
-        def handle_witch_no_kill():
-            self.segments.advance_segment()
-
-        @self.socketio.on("vote_kill")
-        def handle_vote_kill(data):
-            if self.alive_players_count == 0:
-                self.set_alive_players_count()
-            self.kill_votes_count += 1
+                room.log.warning("Can't kill witch victim: %s", e)
+
+            room.segments.advance_segment()
+
+        @self.on("witch_no_heal")
+        def handle_witch_no_heal(sid):
+            room = self.turn_room(sid, SegmentType.WITCH_HEAL.value)
+            if room is not None:
+                room.segments.advance_segment()
+
+        @self.on("witch_no_kill")
+        def handle_witch_no_kill(sid):
+            room = self.turn_room(sid, SegmentType.WITCH_KILL.value)
+            if room is not None:
+                room.segments.advance_segment()
+
+        @self.on("vote_kill")
+        def handle_vote_kill(sid, data):
+            room = self.turn_room(sid, DAY_TURN)
+            if room is None:
+                return
+            if room.alive_players_count == 0:
+                self.set_alive_players_count(room)
+            # A second ballot from the same voter replaces the first one
+            room.kill_voters.add(sid)
             player_sid = data.get("sid")
-            self.game.set_player_vote(player_sid)
+            # A ballot without a target abstains
+            if player_sid:
+                room.game.set_player_vote(player_sid, voter_sid=sid)
+
+            room.log.debug(
+                "Kill votes: %d of %d",
+                len(room.kill_voters),
+                room.alive_players_count,
+            )
 
-            print("Kill votes count: ", self.kill_votes_count)
-            print("Alive players count: ", self.alive_players_count)
+            if len(room.kill_voters) >= room.alive_players_count:
+                self.reset_counters(room)
+                room.segments.alternative_count_votes()
 
-            if self.kill_votes_count == self.alive_players_count:
-                self.reset_counters()
-                self.segments.alternative_count_votes()
+        self.rooms.on_turn_timeout = self.dispatcher(
+            "turn_timeout", self.handlers["turn_timeout"]
+        )
 
-    def reset_counters(self):
-        self.kill_votes_count = 0
-        self.alive_players_count = 0
+    def reset_counters(self, room: Room):
+        room.kill_voters.clear()
+        room.alive_players_count = 0
 
-    def set_alive_players_count(self):
-        self.alive_players_count = (
-            self.game.werewolves_alive + self.game.villagers_alive
+    def set_alive_players_count(self, room: Room):
+        room.alive_players_count = (
+            room.game.werewolves_alive + room.game.villagers_alive
         )
 
-    def alert_player_for_roles(self):
-        for player in self.game.players.values():
+    def alert_player_for_roles(self, room: Room):
+        """Put everyone in their role's socket room, then one emit per role."""
+        room.join_role_rooms()
+        for role, players in room.game.players_by_role.items():
+            if not players:
+                continue
             try:
                 self.socketio.emit(
-                    "role_assigned", {"role": player.role.value}, room=player.sid
+                    "role_assigned", {"role": role.value}, to=room.role_room(role)
                 )
             except Exception as e:
-                print("Error in socket emit:", str(e))
+                room.log.warning("Error in socket emit: %s", e)
@@ -0,0 +1,166 @@
+"""
+In-process metrics exposed in the Prometheus text format.
+
+Hot paths only touch a dict entry and a bisect under a lock. Gauges are
+callbacks evaluated when /metrics is scraped, so room and queue sizes cost
+nothing between scrapes. A disabled Metrics hands back handlers unwrapped.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Seconds, tuned for socket handlers (sub-millisecond) up to player turns
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Metrics:
+    """
+    Counters, latency histograms and scrape-time gauges.
+
+    Args:
+        enabled: When False every method returns immediately and `timed`
+            returns the handler itself.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = defaultdict(dict)
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = defaultdict(dict)
+        self._gauges: Dict[str, Callable[[], Iterable[Tuple[dict, float]]]] = {}
+
+    def describe(self, name: str, kind: str, help_text: str):
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms[name]
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def gauge(self, name: str, help_text: str, collect):
+        """
+        Register a gauge computed at scrape time.
+
+        Args:
+            collect: Returns a number, or an iterable of (labels dict, value).
+        """
+        self.describe(name, "gauge", help_text)
+        self._gauges[name] = collect
+
+    def timed(self, name: str, handler, **labels):
+        """Wrap `handler` so each call's duration is observed in `name`."""
+        if not self.enabled:
+            return handler
+
+        @wraps(handler)
+        def timed_handler(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return handler(*args, **kwargs)
+            finally:
+                self.observe(name, time.perf_counter() - start, **labels)
+
+        return timed_handler
+
+    def instrument_emitter(self, socketio):
+        """Count every emit made through `socketio`, by event name."""
+        if not self.enabled:
+            return
+        self.describe("socketio_emits_total", "counter", "Socket.IO emits by event")
+        emit = socketio.emit
+
+        @wraps(emit)
+        def counted_emit(event, *args, **kwargs):
+            self.inc("socketio_emits_total", event=event)
+            return emit(event, *args, **kwargs)
+
+        socketio.emit = counted_emit
+
+    def render(self) -> str:
+        """Current values in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            counters = {n: dict(s) for n, s in self._counters.items()}
+            histograms = {
+                n: {k: (list(h.counts), h.sum, h.count, h.buckets) for k, h in s.items()}
+                for n, s in self._histograms.items()
+            }
+
+        for name, series in counters.items():
+            self._header(lines, name, "counter")
+            for labels, value in series.items():
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        for name, series in histograms.items():
+            self._header(lines, name, "histogram")
+            for labels, (counts, total, count, buckets) in series.items():
+                cumulative = 0
+                for bound, bucket_count in zip(buckets, counts):
+                    cumulative += bucket_count
+                    le = _format_labels(labels, f'le="{bound}"')
+                    lines.append(f"{name}_bucket{le} {cumulative}")
+                le = _format_labels(labels, 'le="+Inf"')
+                lines.append(f"{name}_bucket{le} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        for name, collect in self._gauges.items():
+            self._header(lines, name, "gauge")
+            value = collect()
+            if isinstance(value, (int, float)):
+                lines.append(f"{name} {value}")
+                continue
+            for labels, sample in value:
+                key = tuple(sorted(labels.items()))
+                lines.append(f"{name}{_format_labels(key)} {sample}")
+
+        return "\n".join(lines) + "\n"
+
+    def _header(self, lines: List[str], name: str, default_kind: str):
+        kind, help_text = self._help.get(name, (default_kind, name))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
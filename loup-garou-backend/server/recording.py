@@ -0,0 +1,74 @@
+"""
+Record every game's input stream so it can be replayed offline.
+
+`RecordingStore` plugs into RoomRegistry where the GameStore does (and
+forwards to one when both are enabled). Each room gets a JSON lines file in
+the recording directory:
+
+    {"seq": 0, "room": "...", "state": {...}}           initial state and seed
+    {"seq": 1, "event": "add_player", "sid": "...", "args": [...]}
+    {"seq": 7, "room": "...", "state": {...}}           state at a checkpoint
+    {"end": true}                                       room evicted
+
+simulation/replay.py re-runs these files and checks every recorded state.
+"""
+
+import json
+import os
+import re
+from typing import IO, Dict, Optional
+
+
+class RecordingStore:
+    """
+    Write one recording per room.
+
+    Attributes:
+        directory: Where recordings are written.
+        inner: Optional store (e.g. GameStore) every call is forwarded to.
+    """
+
+    def __init__(self, directory: str, inner=None, snapshot_every: int = 100):
+        self.directory = directory
+        self.inner = inner
+        self.snapshot_every = inner.snapshot_every if inner else snapshot_every
+        self.files: Dict[str, IO[str]] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _file(self, room_id: str, state: Optional[dict] = None) -> Optional[IO[str]]:
+        recording = self.files.get(room_id)
+        if recording is None and state is not None:
+            name = re.sub(r"[^A-Za-z0-9_.-]", "_", room_id)
+            path = os.path.join(self.directory, f"{name}-{state['game']['seed']}.jsonl")
+            recording = self.files[room_id] = open(path, "a")
+        return recording
+
+    def append(self, room_id: str, seq: int, event: str, sid: str, args: tuple):
+        if self.inner is not None:
+            self.inner.append(room_id, seq, event, sid, args)
+        recording = self._file(room_id)
+        if recording is not None:
+            line = {"seq": seq, "event": event, "sid": sid, "args": list(args)}
+            recording.write(json.dumps(line) + "\n")
+
+    def snapshot(self, room_id: str, seq: int, state: dict):
+        if self.inner is not None:
+            self.inner.snapshot(room_id, seq, state)
+        line = {"seq": seq, "room": room_id, "state": state}
+        self._file(room_id, state).write(json.dumps(line) + "\n")
+
+    def forget(self, room_id: str):
+        if self.inner is not None:
+            self.inner.forget(room_id)
+        recording = self.files.pop(room_id, None)
+        if recording is not None:
+            recording.write(json.dumps({"end": True}) + "\n")
+            recording.close()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        for recording in self.files.values():
+            recording.flush()
+        return self.inner.flush(timeout) if self.inner is not None else True
+
+    def load(self):
+        return self.inner.load() if self.inner is not None else {}
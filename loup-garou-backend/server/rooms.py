@@ -0,0 +1,378 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Set
+
+from core.game import Game
+from core.logs import room_log
+from core.player_list import PLAYER_UPDATED
+from core.roles import PlayerRole
+from segments.audio import AudioScheduler
+from segments.segment_manager import SegmentManager, role_room
+from server.dedup import SequenceWindow
+
+DEFAULT_ROOM = "default"
+
+
+def timer_sid(room_id: str) -> str:
+    """Pseudo sid turn timeouts are dispatched and journaled as."""
+    return f"timer:{room_id}"
+
+
+def bot_sid(room_id: str, index: int) -> str:
+    return f"bot:{room_id}:{index}"
+
+
+class Room:
+    """
+    One isolated table: its own Game, SegmentManager and event counters.
+
+    Alive players with a role are also in that role's socket room (see
+    `role_room`), so role-wide messages are a single emit. They join when roles
+    are dealt and leave when they die.
+    """
+
+    def __init__(
+        self,
+        room_id: str,
+        socketio,
+        audio=None,
+        metrics=None,
+        seed=None,
+        connections=None,
+        deadlines=None,
+        turn_timeouts=None,
+    ):
+        self.room_id = room_id
+        self.socketio = socketio
+        # player sid -> connection sid, for players who rejoined after a restart
+        self.connections: Dict[str, str] = {} if connections is None else connections
+        self.game = Game(seed)
+        self.game.player_list.on_change = self.broadcast_player_change
+        self.segments = SegmentManager(
+            self.game,
+            socketio,
+            room_id=room_id,
+            audio=audio,
+            metrics=metrics,
+            deadlines=deadlines,
+            turn_timeouts=turn_timeouts,
+        )
+        self.log = room_log("events", room_id, self.segments.segment_id)
+        # Taken around every event handled for this room, see GameEvents
+        self.lock = self.segments.lock
+        self.sids: Set[str] = set()
+        self.mock_controllers: Dict[str, List[str]] = {}
+        # Bot players seated here: sid -> policy name (see server/bots.py)
+        self.bots: Dict[str, str] = {}
+        # Sids of the lovers who closed their alert, of the day's voters
+        self.lover_alerts_closed: Set[str] = set()
+        self.kill_voters: Set[str] = set()
+        self.alive_players_count = 0
+        # Client sequence numbers seen, to drop retried events
+        self.sequences = SequenceWindow()
+        # Created on the first werewolf selection update, see GameEvents
+        self.selection_updates = None
+        # Persistence: last journaled event, last snapshot, players to wait for
+        self.journal_seq = 0
+        self.snapshot_seq = 0
+        self.awaiting_rejoin: Set[str] = set()
+
+    def to_state(self) -> dict:
+        return {
+            "game": self.game.to_state(),
+            "segments": self.segments.to_state(),
+            "sids": sorted(self.sids),
+            "mock_controllers": {
+                controller: list(sids)
+                for controller, sids in self.mock_controllers.items()
+            },
+            "bots": dict(self.bots),
+            "lover_alerts_closed": sorted(self.lover_alerts_closed),
+            "kill_voters": sorted(self.kill_voters),
+            "alive_players_count": self.alive_players_count,
+            "sequences": self.sequences.to_state(),
+        }
+
+    def load_state(self, state: dict):
+        self.game.load_state(state["game"])
+        self.segments.load_state(state["segments"])
+        self.sids = set(state["sids"])
+        self.mock_controllers = state["mock_controllers"]
+        self.bots = dict(state.get("bots", {}))
+        self.lover_alerts_closed = set(state["lover_alerts_closed"])
+        self.kill_voters = set(state["kill_voters"])
+        self.alive_players_count = state["alive_players_count"]
+        self.sequences.load_state(state.get("sequences", {}))
+
+    def resume(self):
+        """Reopen the current step once every player is back after a restart."""
+        self.lover_alerts_closed.clear()
+        self.kill_voters.clear()
+        self.alive_players_count = 0
+        self.segments.resume()
+
+    def role_room(self, role: PlayerRole) -> str:
+        return role_room(self.room_id, role)
+
+    def connection_for(self, player_sid: str) -> Optional[str]:
+        """The connection a player is reached on, None for mock players."""
+        if player_sid not in self.sids:
+            return None
+        return self.connections.get(player_sid, player_sid)
+
+    def join_role_room(self, player):
+        connection = self.connection_for(player.sid)
+        if connection is not None and player.role is not None and player.is_alive:
+            self.socketio.server.enter_room(
+                connection, self.role_room(player.role), namespace="/"
+            )
+
+    def join_role_rooms(self):
+        for player in self.game.players.values():
+            self.join_role_room(player)
+
+    def broadcast_player_change(self, version: int, event: str, payload: dict):
+        """Send one player list delta to everyone in the room."""
+        try:
+            self.socketio.emit(
+                event, {"version": version, "player": payload}, to=self.room_id
+            )
+            if event == PLAYER_UPDATED and not payload["is_alive"] and payload["role"]:
+                connection = self.connection_for(payload["sid"])
+                if connection is not None:
+                    self.socketio.server.leave_room(
+                        connection,
+                        self.role_room(PlayerRole(payload["role"])),
+                        namespace="/",
+                    )
+        except Exception as e:
+            self.log.warning("Error in socket emit: %s", e)
+
+
+class RoomRegistry:
+    """
+    Creates, looks up and evicts rooms.
+
+    Every connected sid (and every mock player sid) is bound to exactly one
+    room so that socket handlers can route an event with a single dict lookup.
+    All rooms share one audio scheduler, which keeps a clip queue per room.
+    """
+
+    def __init__(
+        self,
+        socketio,
+        max_rooms: Optional[int] = None,
+        audio=None,
+        metrics=None,
+        store=None,
+    ):
+        self.socketio = socketio
+        self.max_rooms = max_rooms
+        self.audio = audio if audio is not None else AudioScheduler()
+        self.metrics = metrics
+        self.store = store
+        self.rooms: Dict[str, Room] = {}
+        self.sid_rooms: Dict[str, str] = {}
+        # Connections that took over a player's seat after a restart
+        self.sid_aliases: Dict[str, str] = {}  # new sid -> player sid
+        self.player_connections: Dict[str, str] = {}  # player sid -> new sid
+        self._dispatch = threading.local()
+        self._create_lock = threading.Lock()
+        # Turn deadlines, set up by GameEvents when timeouts are enabled
+        self.deadlines = None
+        self.turn_timeouts = None
+        self.on_turn_timeout = None  # on_turn_timeout(timer_sid, turn)
+
+    def get(self, room_id: str) -> Optional[Room]:
+        return self.rooms.get(room_id)
+
+    def get_or_create(
+        self, room_id: str, seed: Optional[int] = None, snapshot: bool = True
+    ) -> Room:
+        """
+        The room named `room_id`, created if needed. With a store, a new room
+        is snapshotted right away unless `snapshot` is False, for callers that
+        load a saved state into it first (see `restore_rooms`).
+        """
+        room = self.rooms.get(room_id)
+        if room is not None:
+            return room
+        # Handlers run on several threads in the Flask server, and the first
+        # players of a room join at once
+        with self._create_lock:
+            room = self.rooms.get(room_id)
+            if room is None:
+                if self.max_rooms is not None and len(self.rooms) >= self.max_rooms:
+                    raise ValueError("Too many rooms")
+                room = Room(
+                    room_id,
+                    self.socketio,
+                    audio=self.audio,
+                    metrics=self.metrics,
+                    seed=seed,
+                    connections=self.player_connections,
+                    deadlines=self.deadlines,
+                    turn_timeouts=self.turn_timeouts,
+                )
+                self.rooms[room_id] = room
+                # The room's timer acts like a mock player bound to it
+                sid = timer_sid(room_id)
+                self.sid_rooms[sid] = room_id
+                room.segments.on_timeout = lambda turn: self._turn_timed_out(sid, turn)
+                if self.store is not None:
+                    room.segments.on_checkpoint = lambda: self.checkpoint(room)
+                    if snapshot:
+                        # The initial state carries the game's seed for replays
+                        self.snapshot(room)
+        return room
+
+    def bind_sid(self, sid: str, room_id: str, connected: bool = True) -> Room:
+        """
+        Route events from `sid` to `room_id`.
+
+        Mock players are bound with connected=False: they are reachable through
+        the room but do not keep it alive once every real client has left.
+        """
+        room = self.get_or_create(room_id)
+        previous = self.sid_rooms.get(sid)
+        if previous is not None and previous != room_id:
+            self.unbind_sid(sid)
+        self.sid_rooms[sid] = room_id
+        if connected:
+            room.sids.add(sid)
+        return room
+
+    def rebind_sid(self, sid: str, player_sid: str) -> Room:
+        """
+        Let connection `sid` act as `player_sid`, whose seat survived a
+        disconnect or a restart.
+        """
+        room = self.room_for_sid(player_sid)
+        if room is None:
+            raise ValueError("Unknown player")
+        previous = self.player_connections.pop(player_sid, None)
+        if previous is not None:
+            self.sid_aliases.pop(previous, None)
+        self.sid_aliases[sid] = player_sid
+        self.player_connections[player_sid] = sid
+        room.sids.add(player_sid)
+        return room
+
+    def unbind_sid(self, sid: str, keep_seat: bool = False) -> Optional[Room]:
+        """
+        Disconnect `sid` from its room. With `keep_seat` only the connection
+        is dropped: the player stays bound to the room and can `rejoin`.
+        """
+        connection = self.player_connections.pop(sid, None)
+        if connection is not None:
+            self.sid_aliases.pop(connection, None)
+        if keep_seat:
+            room_id = self.sid_rooms.get(sid)
+        else:
+            room_id = self.sid_rooms.pop(sid, None)
+        if room_id is None:
+            return None
+        room = self.rooms.get(room_id)
+        if room is not None:
+            room.sids.discard(sid)
+        return room
+
+    def room_for_sid(self, sid: str) -> Optional[Room]:
+        room_id = self.sid_rooms.get(sid)
+        if room_id is None:
+            return None
+        return self.rooms.get(room_id)
+
+    def evict(self, room_id: str):
+        room = self.rooms.pop(room_id, None)
+        if room is None:
+            return
+        self.audio.clear(room_id)
+        room.segments.clear_turn()
+        self.sid_rooms.pop(timer_sid(room_id), None)
+        if self.store is not None:
+            self.store.forget(room_id)
+        for sid in room.sids:
+            self.sid_rooms.pop(sid, None)
+        # Seats kept for players who disconnected
+        for sid in room.game.players:
+            if self.sid_rooms.get(sid) == room_id:
+                del self.sid_rooms[sid]
+        for mock_sids in room.mock_controllers.values():
+            for sid in mock_sids:
+                self.sid_rooms.pop(sid, None)
+        for sid in room.bots:
+            self.sid_rooms.pop(sid, None)
+
+    def __len__(self):
+        return len(self.rooms)
+
+    def _turn_timed_out(self, sid: str, turn: str):
+        if self.on_turn_timeout is not None:
+            self.on_turn_timeout(sid, turn)
+
+    @contextmanager
+    def journaling(self, sid: str, event: str, args: tuple):
+        """
+        Journal an incoming event once its handler has run.
+
+        Snapshots requested by the handler are held back until the event is
+        journaled, so a snapshot always covers every event before its seq.
+        """
+        before = self.room_for_sid(sid)
+        self._dispatch.due = set()
+        try:
+            yield
+        finally:
+            due, self._dispatch.due = self._dispatch.due, None
+            room = self.room_for_sid(sid) or before
+            if room is not None and room.room_id in self.rooms:
+                room.journal_seq += 1
+                self.store.append(room.room_id, room.journal_seq, event, sid, args)
+                if room.journal_seq - room.snapshot_seq >= self.store.snapshot_every:
+                    due.add(room)
+            for due_room in due:
+                if due_room.room_id in self.rooms:
+                    self.snapshot(due_room)
+
+    def checkpoint(self, room: Room):
+        """Snapshot `room` now, or after the event being handled is journaled."""
+        due = getattr(self._dispatch, "due", None)
+        if due is not None:
+            due.add(room)
+        else:
+            self.snapshot(room)
+
+    def snapshot(self, room: Room):
+        room.snapshot_seq = room.journal_seq
+        self.store.snapshot(room.room_id, room.journal_seq, room.to_state())
+
+    def register_gauges(self, metrics):
+        """Expose room, player and queue sizes, summed over rooms, as gauges."""
+        rooms = self.rooms
+        metrics.gauge("rooms_active", "Rooms currently hosted", lambda: len(rooms))
+        metrics.gauge(
+            "players_active",
+            "Players in all rooms",
+            lambda: sum(len(r.game.players) for r in list(rooms.values())),
+        )
+        metrics.gauge(
+            "players_alive",
+            "Alive players in all rooms",
+            lambda: sum(len(r.game.alive_players) for r in list(rooms.values())),
+        )
+        metrics.gauge(
+            "death_queue_depth",
+            "Deaths queued for resolution in all rooms",
+            lambda: sum(len(r.segments.deaths.queue) for r in list(rooms.values())),
+        )
+        metrics.gauge(
+            "pending_deaths",
+            "Night victims waiting for the end of the night in all rooms",
+            lambda: sum(len(r.game.pending_deaths) for r in list(rooms.values())),
+        )
+        metrics.gauge(
+            "audio_queue_depth",
+            "Narration clips waiting to be played in all rooms",
+            lambda: sum(self.audio.pending(room_id) for room_id in list(rooms)),
+        )
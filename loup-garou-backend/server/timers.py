@@ -0,0 +1,162 @@
+"""
+Hierarchical timer wheel for turn deadlines.
+
+Every room arms a deadline whenever it waits on a player, so a server holds
+one timer per active table, and they are re-armed on every turn. A wheel makes
+arming and cancelling O(1) and advancing O(1) per tick: level 0 has one slot
+per tick, and each level above has slots `slots` times as wide. When the lower
+level wraps, the timers in the next slot of the level above are cascaded down.
+
+The wheel does not own a thread. It asks `schedule(delay, callback)` (e.g.
+`GameEvents.call_later`, which runs on the event loop in asyncio mode) for its
+next tick, and only while it holds timers.
+"""
+
+import math
+import threading
+import time
+from typing import Callable, List, Optional
+
+from core.logs import get_logger
+
+TICK = 0.1  # seconds
+SLOTS = 64
+LEVELS = 4  # 64 ** 4 ticks of 0.1s: about 19 days
+
+log = get_logger("timers")
+
+
+class Timer:
+    """Handle returned by `TimerWheel.call_later`."""
+
+    __slots__ = ("expires", "callback", "cancelled", "wheel")
+
+    def __init__(self, expires: int, callback: Callable[[], None], wheel):
+        self.expires = expires
+        self.callback = callback
+        self.cancelled = False
+        self.wheel = wheel
+
+    def cancel(self):
+        self.wheel.cancel(self)
+
+
+class TimerWheel:
+    """
+    Schedule many callbacks at tick resolution.
+
+    Args:
+        schedule: `schedule(delay, callback)` runs callback after delay
+            seconds; used to drive the ticks.
+        tick: Seconds per tick. Deadlines are rounded up to a whole tick.
+        slots: Slots per level.
+        levels: Number of levels. Longer delays are capped to their span.
+    """
+
+    def __init__(
+        self,
+        schedule: Callable[[float, Callable[[], None]], None],
+        tick: float = TICK,
+        slots: int = SLOTS,
+        levels: int = LEVELS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.schedule = schedule
+        self.tick = tick
+        self.slots = slots
+        self.clock = clock
+        self.origin = clock()
+        self.current = 0  # last tick processed
+        self.wheels: List[List[List[Timer]]] = [
+            [[] for _ in range(slots)] for _ in range(levels)
+        ]
+        self.span = slots**levels - 1
+        self.active = 0  # armed and not cancelled
+        self.ticking = False
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.active
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> Timer:
+        """Run `callback` once `delay` seconds have passed. Returns a Timer."""
+        with self._lock:
+            now = self._now()
+            if not self.active:
+                # Nothing is armed, skip the idle ticks instead of walking them
+                self._reset(now)
+            ticks = max(1, math.ceil(delay / self.tick))
+            timer = Timer(now + min(ticks, self.span), callback, self)
+            self._insert(timer)
+            self.active += 1
+            start = not self.ticking
+            self.ticking = True
+        if start:
+            self.schedule(self.tick, self._on_tick)
+        return timer
+
+    def advance(self, now: Optional[int] = None) -> int:
+        """Fire every timer due up to tick `now`. Returns how many fired."""
+        due = []
+        with self._lock:
+            target = self._now() if now is None else now
+            while self.current < target:
+                self.current += 1
+                self._cascade()
+                slot = self.wheels[0][self.current % self.slots]
+                for timer in slot:
+                    if not timer.cancelled:
+                        timer.cancelled = True
+                        self.active -= 1
+                        due.append(timer)
+                slot.clear()
+        for timer in due:
+            try:
+                timer.callback()
+            except Exception:
+                log.exception("Error in timer callback")
+        return len(due)
+
+    def _on_tick(self):
+        self.advance()
+        with self._lock:
+            self.ticking = self.active > 0
+            if not self.ticking:
+                return
+        self.schedule(self.tick, self._on_tick)
+
+    def _now(self) -> int:
+        return int((self.clock() - self.origin) / self.tick)
+
+    def _reset(self, now: int):
+        for level in self.wheels:
+            for slot in level:
+                slot.clear()
+        self.current = now
+
+    def _insert(self, timer: Timer):
+        delta = timer.expires - self.current
+        for level, wheel in enumerate(self.wheels):
+            if delta < self.slots ** (level + 1):
+                index = (timer.expires // self.slots**level) % self.slots
+                wheel[index].append(timer)
+                return
+
+    def _cascade(self):
+        # Higher levels first, so their timers can cascade further down now
+        for level in range(len(self.wheels) - 1, 0, -1):
+            width = self.slots**level
+            if self.current % width:
+                continue
+            slot = self.wheels[level][(self.current // width) % self.slots]
+            timers = list(slot)
+            slot.clear()
+            for timer in timers:
+                if not timer.cancelled:
+                    self._insert(timer)
+
+    def cancel(self, timer: Timer):
+        with self._lock:
+            if not timer.cancelled:
+                timer.cancelled = True
+                self.active -= 1
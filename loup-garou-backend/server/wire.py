@@ -0,0 +1,174 @@
+"""
+Opt-in compact wire format for socket payloads.
+
+A client that connects with `auth={"wire": "msgpack"}` receives every payload
+as msgpack bytes (sent as a Socket.IO binary attachment) in which the field
+names of the shared schema below are replaced by small integers. It may send
+its own payloads the same way. Every other client keeps receiving JSON.
+
+`WireSocketIO` wraps the Socket.IO object the game code emits through. For
+each room a msgpack client joins, it also joins a mirror room (`<room>~mp`),
+so an emit to a mixed room is one JSON emit skipping the msgpack members plus
+one binary emit to the mirror room.
+"""
+
+from typing import Dict, Optional, Set
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack is optional
+    msgpack = None
+
+WIRE_JSON = "json"
+WIRE_MSGPACK = "msgpack"
+MIRROR_SUFFIX = "~mp"
+
+# Shared schema: field name -> id. Append only, ids are part of the protocol.
+FIELDS = [
+    "name",
+    "sid",
+    "role",
+    "is_alive",
+    "version",
+    "player",
+    "players",
+    "message",
+    "playerId",
+    "data",
+    "lover",
+    "victim",
+    "werewolves",
+    "vote",
+    "room",
+    "controllerSid",
+    "action",
+    "choice",
+    "turn",
+    "count",
+    "policy",
+    "winners",
+    "url",
+    "duration",
+    "seq",
+]
+FIELD_IDS: Dict[str, int] = {field: i for i, field in enumerate(FIELDS)}
+
+
+def compact(value):
+    """Replace schema field names with their ids, recursively."""
+    if isinstance(value, dict):
+        return {FIELD_IDS.get(k, k): compact(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [compact(v) for v in value]
+    return value
+
+
+def expand(value):
+    """Inverse of `compact`. Integer keys outside the schema are kept as is."""
+    if isinstance(value, dict):
+        return {
+            FIELDS[k] if isinstance(k, int) and 0 <= k < len(FIELDS) else k: expand(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [expand(v) for v in value]
+    return value
+
+
+def encode(data) -> bytes:
+    return msgpack.packb(compact(data), use_bin_type=True)
+
+
+def decode(payload: bytes):
+    return expand(msgpack.unpackb(payload, raw=False, strict_map_key=False))
+
+
+def decode_args(args: tuple) -> tuple:
+    """Decode the msgpack payloads a client sent, leave JSON ones as is."""
+    if msgpack is None or not any(isinstance(arg, bytes) for arg in args):
+        return args
+    return tuple(decode(arg) if isinstance(arg, bytes) else arg for arg in args)
+
+
+class _WireRooms:
+    """`server.enter_room` / `server.leave_room` that keep mirror rooms in sync."""
+
+    def __init__(self, wire):
+        self.wire = wire
+
+    def enter_room(self, sid, room, namespace=None):
+        self.wire.inner.server.enter_room(sid, room, namespace=namespace)
+        if sid in self.wire.binary_sids:
+            self.wire.members.setdefault(room, set()).add(sid)
+            self.wire.inner.server.enter_room(
+                sid, room + MIRROR_SUFFIX, namespace=namespace
+            )
+
+    def leave_room(self, sid, room, namespace=None):
+        self.wire.inner.server.leave_room(sid, room, namespace=namespace)
+        members = self.wire.members.get(room)
+        if members is not None and sid in members:
+            members.discard(sid)
+            if not members:
+                del self.wire.members[room]
+            self.wire.inner.server.leave_room(
+                sid, room + MIRROR_SUFFIX, namespace=namespace
+            )
+
+
+class WireSocketIO:
+    """
+    Emitter that encodes payloads per client according to its wire format.
+
+    Anything other than `emit` and `server` is forwarded to the wrapped object,
+    so it can stand in for Flask-SocketIO or the asyncio emitter.
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.server = _WireRooms(self)
+        self.binary_sids: Set[str] = set()
+        self.members: Dict[str, Set[str]] = {}  # room -> msgpack sids in it
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def negotiate(self, sid: str, auth: Optional[dict]) -> str:
+        """Pick the wire format for a new connection from its auth payload."""
+        wanted = (auth or {}).get("wire") if isinstance(auth, dict) else None
+        if wanted == WIRE_MSGPACK and msgpack is not None:
+            self.binary_sids.add(sid)
+            # A sid is its own room
+            self.members[sid] = {sid}
+            return WIRE_MSGPACK
+        return WIRE_JSON
+
+    def forget(self, sid: str):
+        if sid not in self.binary_sids:
+            return
+        self.binary_sids.discard(sid)
+        for room in [room for room, sids in self.members.items() if sid in sids]:
+            self.members[room].discard(sid)
+            if not self.members[room]:
+                del self.members[room]
+
+    def emit(self, event, data=None, to=None, room=None, **kwargs):
+        target = to or room
+        if not self.binary_sids:
+            return self.inner.emit(event, data, to=target, **kwargs)
+        if target is None:
+            binary = self.binary_sids
+        else:
+            binary = self.members.get(target, ())
+        if not binary:
+            return self.inner.emit(event, data, to=target, **kwargs)
+        if target is None or target not in self.binary_sids:
+            self.inner.emit(event, data, to=target, skip_sid=list(binary), **kwargs)
+        payload = encode(data) if data is not None else None
+        if target is None:
+            for sid in list(binary):
+                self.inner.emit(event, payload, to=sid, **kwargs)
+        elif target in self.binary_sids:
+            self.inner.emit(event, payload, to=target, **kwargs)
+        else:
+            self.inner.emit(event, payload, to=target + MIRROR_SUFFIX, **kwargs)
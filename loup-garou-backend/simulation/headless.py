@@ -0,0 +1,200 @@
+"""
+Headless game simulator.
+
+Plays complete games through the real Game and SegmentManager with a stub
+emitter instead of Flask-SocketIO and a silent audio sink. Every emit the
+SegmentManager sends is queued and answered by a decision policy, the same
+way a client would answer it, so game flow is exercised exactly as in
+production minus the transport.
+"""
+
+import random
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple
+
+from core.death_types import DeathTrigger
+from core.game import Game
+from core.roles import PlayerRole
+from segments.audio import SilentAudio
+from segments.segment_manager import SegmentManager
+from simulation.policies import RandomPolicy
+
+HEADLESS_ROOM = "headless"
+
+Emit = Tuple[str, Optional[dict], Optional[str]]
+
+
+class StubEmitter:
+    """Stands in for the SocketIO instance: records emits instead of sending."""
+
+    def __init__(self):
+        self.outbox: Deque[Emit] = deque()
+        self.emit_count = 0
+
+    def emit(self, event, data=None, to=None, **kwargs):
+        self.emit_count += 1
+        self.outbox.append((event, data, to))
+
+    def sleep(self, seconds):
+        pass
+
+
+def default_roles(player_count: int) -> List[PlayerRole]:
+    """A standard role mix: one werewolf per four players plus the specials."""
+    werewolves = max(1, player_count // 4)
+    specials = [PlayerRole.SEER, PlayerRole.WITCH, PlayerRole.CUPID, PlayerRole.HUNTER]
+    specials = specials[: max(0, player_count - werewolves)]
+    villagers = player_count - werewolves - len(specials)
+    return [PlayerRole.WEREWOLF] * werewolves + specials + [PlayerRole.VILLAGER] * villagers
+
+
+@dataclass
+class GameResult:
+    winners: Optional[str]
+    days: int
+    emits: int
+    actions: int
+    phase_seconds: Dict[str, float] = field(default_factory=dict)
+    phase_calls: Dict[str, int] = field(default_factory=dict)
+
+
+class HeadlessGame:
+    """
+    One game driven to completion without sockets.
+
+    Args:
+        roles: Roles to deal, one per player.
+        policy: Object answering each prompt, see RandomPolicy.
+        max_days: Safety limit, a game still running after this many days is
+            stopped and reported without winners.
+    """
+
+    def __init__(self, roles: List[PlayerRole], policy, max_days: int = 100):
+        self.policy = policy
+        self.max_days = max_days
+        self.emitter = StubEmitter()
+        self.game = Game()
+        self.segments = SegmentManager(
+            self.game, self.emitter, room_id=HEADLESS_ROOM, audio=SilentAudio()
+        )
+        for i, role in enumerate(roles):
+            player = self.game.add_player(f"Bot {i}", f"bot_{i}")
+            self.game.set_player_role(player, role)
+
+        self.days = 0
+        self.actions = 0
+        self.lover_alerts_closed = set()
+        self.phase_seconds: Dict[str, float] = defaultdict(float)
+        self.phase_calls: Dict[str, int] = defaultdict(int)
+        self.handlers = {
+            "cupidon_choice": self.on_cupidon_choice,
+            "lover_can_close": self.on_lover_can_close,
+            "werewolf_wake_up": self.on_werewolf_wake_up,
+            "witch_heal": self.on_witch_heal,
+            "witch_kill": self.on_witch_kill,
+            "seer_choice": self.on_seer_choice,
+            "hunter_selection": self.on_hunter_selection,
+            "day_vote": self.on_day_vote,
+        }
+
+    def play(self) -> GameResult:
+        self._timed("start_night", self.segments.start_night)
+        outbox = self.emitter.outbox
+        while outbox and self.game.winners is None and self.days < self.max_days:
+            event, data, to = outbox.popleft()
+            handler = self.handlers.get(event)
+            if handler is not None:
+                self._timed(event, handler, data, to)
+        return GameResult(
+            winners=self.game.winners,
+            days=self.days,
+            emits=self.emitter.emit_count,
+            actions=self.actions,
+            phase_seconds=dict(self.phase_seconds),
+            phase_calls=dict(self.phase_calls),
+        )
+
+    def _timed(self, phase, handler, *args):
+        start = time.perf_counter()
+        handler(*args)
+        self.phase_seconds[phase] += time.perf_counter() - start
+        self.phase_calls[phase] += 1
+
+    def on_cupidon_choice(self, data, to):
+        cupid = self.game.get_player(to)
+        first, second = self.policy.choose_lovers(self.game, cupid)
+        self.actions += 1
+        self.game.set_lovers(first, second)
+        self.segments.advance_segment()
+
+    def on_lover_can_close(self, data, to):
+        self.actions += 1
+        self.lover_alerts_closed.add(to)
+        if len(self.lover_alerts_closed) == 2:
+            self.lover_alerts_closed.clear()
+            self.segments.advance_segment()
+
+    def on_werewolf_wake_up(self, data, to):
+        # The pack is woken up with one emit and answers once
+        target = self.policy.werewolf_target(self.game)
+        self.actions += 1
+        if target is not None:
+            self.game.add_pending_death(target, DeathTrigger.WEREWOLF_KILL)
+        self.segments.advance_segment()
+
+    def on_witch_heal(self, data, to):
+        victim = self.game.get_last_pending_death()
+        self.actions += 1
+        if victim is not None and self.policy.witch_heals(self.game, victim):
+            self.game.remove_pending_death(victim)
+            self.game.witch_heal_available = False
+        self.segments.advance_segment()
+
+    def on_witch_kill(self, data, to):
+        witch = self.game.get_player(to)
+        target = self.policy.witch_target(self.game, witch)
+        self.actions += 1
+        if target is not None:
+            self.game.add_pending_death(target, DeathTrigger.WITCH_KILL)
+            self.game.witch_kill_available = False
+        self.segments.advance_segment()
+
+    def on_seer_choice(self, data, to):
+        seer = self.game.get_player(to)
+        self.policy.seer_target(self.game, seer)
+        self.actions += 1
+        self.segments.advance_segment()
+
+    def on_hunter_selection(self, data, to):
+        hunter = self.game.get_player(to)
+        target = self.policy.hunter_target(self.game, hunter)
+        self.actions += 1
+        self.segments.hunter_selected(target.sid if target else None)
+
+    def on_day_vote(self, data, to):
+        self.days += 1
+        for voter in list(self.game.alive_players.values()):
+            target = self.policy.day_vote(self.game, voter)
+            self.actions += 1
+            self.game.set_player_vote(target.sid, voter_sid=voter.sid)
+        self.segments.alternative_count_votes()
+
+
+def simulate(
+    games: int,
+    player_count: int,
+    seed: Optional[int] = None,
+    roles: Optional[List[PlayerRole]] = None,
+    max_days: int = 100,
+) -> List[GameResult]:
+    """Play `games` complete games with random decisions."""
+    rng = random.Random(seed)
+    roles = roles or default_roles(player_count)
+    results = []
+    for _ in range(games):
+        dealt = list(roles)
+        rng.shuffle(dealt)
+        results.append(HeadlessGame(dealt, RandomPolicy(rng), max_days).play())
+    return results
@@ -0,0 +1,266 @@
+"""
+Vectorized Monte Carlo role-balance simulator (requires numpy, see
+requirements-dev.txt).
+
+Plays many games at once as (games, players) arrays of roles and alive state
+and steps every phase as array operations: werewolf kill, witch potions,
+lover links, hunter revenge and the day vote. All decisions are uniformly
+random, like simulation.policies.RandomPolicy, and the end of game follows
+Game.check_game_over. Used to compare win rates of role compositions.
+
+    python -m simulation.monte_carlo --players 6 8 10 12 --games 100000
+"""
+
+import argparse
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from core.roles import ROLE_DESCRIPTIONS, PlayerRole
+from simulation.headless import default_roles
+
+ROLES = list(PlayerRole)
+ROLE_CODES = {role: code for code, role in enumerate(ROLES)}
+WEREWOLF = ROLE_CODES[PlayerRole.WEREWOLF]
+VILLAGER = ROLE_CODES[PlayerRole.VILLAGER]
+WITCH = ROLE_CODES[PlayerRole.WITCH]
+HUNTER = ROLE_CODES[PlayerRole.HUNTER]
+CUPID = ROLE_CODES[PlayerRole.CUPID]
+WEREWOLF_TEAM = ROLE_DESCRIPTIONS[PlayerRole.WEREWOLF].team
+IS_WEREWOLF_TEAM = np.array(
+    [ROLE_DESCRIPTIONS[role].team == WEREWOLF_TEAM for role in ROLES]
+)
+
+ONGOING, VILLAGERS_WON, WEREWOLVES_WON, DRAW = 0, 1, 2, 3
+
+
+def describe(roles: Sequence[PlayerRole]) -> str:
+    """Human readable composition, e.g. '2 Werewolf, Seer, 3 Villager'."""
+    counts = Counter(roles)
+    parts = []
+    for role in ROLES:
+        if counts[role]:
+            name = ROLE_DESCRIPTIONS[role].name
+            parts.append(name if counts[role] == 1 else f"{counts[role]} {name}")
+    return ", ".join(parts)
+
+
+def _random_pick(rng, eligible: np.ndarray) -> np.ndarray:
+    """
+    Pick one eligible column per row uniformly at random.
+
+    Returns the column index per row, or -1 for rows with nothing eligible.
+    """
+    keys = np.where(eligible, rng.random(eligible.shape), -1.0)
+    picks = keys.argmax(axis=1)
+    picks[~eligible.any(axis=1)] = -1
+    return picks
+
+
+class BatchSimulation:
+    """
+    A batch of games with the same role composition.
+
+    Args:
+        roles: Roles to deal, one per player. Each game gets its own shuffle.
+        games: Number of games simulated together.
+        rng: numpy Generator.
+        heal_probability: Chance the witch saves the werewolves' victim.
+        kill_probability: Chance the witch uses her kill potion on a night.
+    """
+
+    def __init__(
+        self,
+        roles: Sequence[PlayerRole],
+        games: int,
+        rng: np.random.Generator,
+        heal_probability: float = 0.5,
+        kill_probability: float = 0.5,
+    ):
+        self.rng = rng
+        self.games = games
+        self.players = len(roles)
+        self.heal_probability = heal_probability
+        self.kill_probability = kill_probability
+        self.rows = np.arange(games)
+
+        codes = np.array([ROLE_CODES[role] for role in roles], dtype=np.int8)
+        self.roles = rng.permuted(np.tile(codes, (games, 1)), axis=1)
+        self.werewolf = IS_WEREWOLF_TEAM[self.roles]
+        self.alive = np.ones((games, self.players), dtype=bool)
+        self.status = np.full(games, ONGOING, dtype=np.int8)
+        self.days = np.zeros(games, dtype=np.int32)
+
+        self.witch_heal = (self.roles == WITCH).any(axis=1)
+        self.witch_kill = self.witch_heal.copy()
+        self.hunter_is_alive = (self.roles == HUNTER).any(axis=1)
+        # Game.lovers_are_opposited_teams_and_alive starts True
+        self.lovers_flag = np.ones(games, dtype=bool)
+
+        # Cupid links two random players on the first night
+        self.lover_of = np.full((games, self.players), -1, dtype=np.int64)
+        with_cupid = np.flatnonzero((self.roles == CUPID).any(axis=1))
+        if len(with_cupid) and self.players >= 2:
+            pairs = np.argsort(rng.random((len(with_cupid), self.players)), axis=1)
+            first, second = pairs[:, 0], pairs[:, 1]
+            self.lover_of[with_cupid, first] = second
+            self.lover_of[with_cupid, second] = first
+
+    def run(self, max_days: int = 100):
+        """Play every game to the end, or until `max_days` days have passed."""
+        for _ in range(max_days):
+            active = self.status == ONGOING
+            if not active.any():
+                break
+            self.night(active)
+            self.check_game_over()
+            active = self.status == ONGOING
+            if not active.any():
+                break
+            self.day(active)
+            self.check_game_over()
+        self.status[self.status == ONGOING] = DRAW
+
+    def night(self, active: np.ndarray):
+        rows = self.rows
+        deaths = np.zeros_like(self.alive)
+
+        wolves_alive = (self.alive & self.werewolf).any(axis=1)
+        victims = _random_pick(self.rng, self.alive & ~self.werewolf)
+        bitten = active & wolves_alive & (victims >= 0)
+
+        witch_alive = (self.alive & (self.roles == WITCH)).any(axis=1)
+        heals = (
+            bitten
+            & witch_alive
+            & self.witch_heal
+            & (self.rng.random(self.games) < self.heal_probability)
+        )
+        self.witch_heal &= ~heals
+        killed = bitten & ~heals
+        deaths[rows[killed], victims[killed]] = True
+
+        witch_targets = _random_pick(self.rng, self.alive & (self.roles != WITCH))
+        poisons = (
+            active
+            & witch_alive
+            & self.witch_kill
+            & (witch_targets >= 0)
+            & (self.rng.random(self.games) < self.kill_probability)
+        )
+        self.witch_kill &= ~poisons
+        deaths[rows[poisons], witch_targets[poisons]] = True
+
+        self.resolve(deaths)
+
+    def day(self, active: np.ndarray):
+        self.days += active
+        alive = self.alive & active[:, None]
+
+        # Every alive player votes for another alive player
+        games, players = np.nonzero(alive)
+        candidates = np.broadcast_to(alive[games], (len(games), self.players)).copy()
+        candidates[np.arange(len(games)), players] = False
+        votes = _random_pick(self.rng, candidates)
+        voted = votes >= 0
+        tally = np.zeros((self.games, self.players), dtype=np.int32)
+        np.add.at(tally, (games[voted], votes[voted]), 1)
+
+        # Every player tied for the most votes is eliminated
+        top = tally.max(axis=1)
+        deaths = (tally == top[:, None]) & (top[:, None] > 0)
+        self.resolve(deaths)
+
+    def resolve(self, deaths: np.ndarray):
+        """Kill `deaths` and follow lover and hunter chains until they settle."""
+        deaths &= self.alive
+        while deaths.any():
+            self.alive &= ~deaths
+            lovers_died = deaths & (self.lover_of >= 0)
+            plain = (self.roles == WEREWOLF) | (self.roles == VILLAGER)
+            self.lovers_flag &= ~(lovers_died & plain).any(axis=1)
+
+            chained = np.zeros_like(deaths)
+            games, players = np.nonzero(lovers_died)
+            chained[games, self.lover_of[games, players]] = True
+
+            hunters = (deaths & (self.roles == HUNTER)).any(axis=1) & self.hunter_is_alive
+            self.hunter_is_alive &= ~hunters
+            targets = _random_pick(self.rng, self.alive)
+            shoots = hunters & (targets >= 0)
+            chained[self.rows[shoots], targets[shoots]] = True
+
+            deaths = chained & self.alive
+
+    def check_game_over(self):
+        ongoing = self.status == ONGOING
+        werewolves_alive = (self.alive & self.werewolf).sum(axis=1)
+        villagers_alive = (self.alive & ~self.werewolf).sum(axis=1)
+        village_count = villagers_alive - self.lovers_flag
+        villagers_won = ongoing & (werewolves_alive == 0)
+        werewolves_won = ongoing & ~villagers_won & (werewolves_alive >= village_count)
+        self.status[villagers_won] = VILLAGERS_WON
+        self.status[werewolves_won] = WEREWOLVES_WON
+
+
+def win_rates(
+    roles: Sequence[PlayerRole],
+    games: int,
+    seed: Optional[int] = None,
+    batch_size: int = 50000,
+    max_days: int = 100,
+) -> Dict[str, float]:
+    """Simulate `games` games of one composition and return outcome rates."""
+    rng = np.random.default_rng(seed)
+    outcomes = np.zeros(4, dtype=np.int64)
+    days = 0
+    remaining = games
+    while remaining > 0:
+        batch = BatchSimulation(roles, min(batch_size, remaining), rng)
+        batch.run(max_days)
+        outcomes += np.bincount(batch.status, minlength=4)
+        days += int(batch.days.sum())
+        remaining -= batch.games
+    return {
+        "villagers": outcomes[VILLAGERS_WON] / games,
+        "werewolves": outcomes[WEREWOLVES_WON] / games,
+        "unfinished": outcomes[DRAW] / games,
+        "avg_days": days / games,
+    }
+
+
+def compositions(player_count: int) -> List[List[PlayerRole]]:
+    """The default mix for a table size, then the same mix with 1..N/3 wolves."""
+    base = default_roles(player_count)
+    specials = [r for r in base if r not in (PlayerRole.WEREWOLF, PlayerRole.VILLAGER)]
+    result = []
+    for werewolves in range(1, max(1, player_count // 3) + 1):
+        kept = specials[: max(0, player_count - werewolves)]
+        villagers = player_count - werewolves - len(kept)
+        result.append(
+            [PlayerRole.WEREWOLF] * werewolves + kept + [PlayerRole.VILLAGER] * villagers
+        )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--players", type=int, nargs="+", default=[6, 8, 10, 12])
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'players':>7}  {'villagers':>9}  {'werewolves':>10}  {'days':>5}  composition")
+    for player_count in args.players:
+        for roles in compositions(player_count):
+            rates = win_rates(roles, args.games, seed=args.seed)
+            print(
+                f"{player_count:>7}  {rates['villagers']:>9.1%}  "
+                f"{rates['werewolves']:>10.1%}  {rates['avg_days']:>5.2f}  "
+                f"{describe(roles)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
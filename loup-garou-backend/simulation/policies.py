@@ -0,0 +1,193 @@
+"""
+Decision policies for simulated players.
+
+A policy answers every prompt a player can get. The headless simulator asks
+one for every decision of a game; the bot driver (server/bots.py) asks one
+for the decisions of every bot seated at a live table.
+
+- RandomPolicy: uniform random choice among the legal ones.
+- HeuristicPolicy: role-blind but follows the table: votes with the current
+  leader, the witch saves the first victim and keeps her poison for the end.
+- RoleAwarePolicy: plays its own role: the pack never votes against its own,
+  the seer checks players she has not seen yet, and the village votes out the
+  wolves she found.
+"""
+
+import random
+from typing import Dict, List, Optional, Tuple
+
+from core.game import Game
+from core.player import Player
+from core.roles import PlayerRole
+
+
+class RandomPolicy:
+    """Every decision is a uniform random choice among the legal ones."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    def choose_lovers(self, game: Game, cupid: Player) -> Tuple[Player, Player]:
+        first, second = self.rng.sample(list(game.players.values()), 2)
+        return first, second
+
+    def werewolf_target(self, game: Game) -> Optional[Player]:
+        targets = [
+            p for p in game.alive_players.values() if p.role != PlayerRole.WEREWOLF
+        ]
+        return self.rng.choice(targets) if targets else None
+
+    def witch_heals(self, game: Game, victim: Player) -> bool:
+        return self.rng.random() < 0.5
+
+    def witch_target(self, game: Game, witch: Player) -> Optional[Player]:
+        if self.rng.random() < 0.5:
+            return None
+        targets = [p for p in game.alive_players.values() if p.sid != witch.sid]
+        return self.rng.choice(targets) if targets else None
+
+    def seer_target(self, game: Game, seer: Player) -> Optional[Player]:
+        targets = [p for p in game.alive_players.values() if p.sid != seer.sid]
+        return self.rng.choice(targets) if targets else None
+
+    def seer_saw(self, seer: Player, target: Player):
+        """Called with the result of a seer check."""
+
+    def hunter_target(self, game: Game, hunter: Player) -> Optional[Player]:
+        targets = list(game.alive_players.values())
+        return self.rng.choice(targets) if targets else None
+
+    def day_vote(self, game: Game, voter: Player) -> Player:
+        targets = [p for p in game.alive_players.values() if p.sid != voter.sid]
+        return self.rng.choice(targets or [voter])
+
+    def day_votes(
+        self, game: Game, voters: List[Player]
+    ) -> List[Tuple[Player, Player]]:
+        """Ballots of several voters at once, as (voter, target) pairs."""
+        return [(voter, self.day_vote(game, voter)) for voter in voters]
+
+
+class HeuristicPolicy(RandomPolicy):
+    """Role-blind play that follows what the table is doing."""
+
+    def witch_heals(self, game: Game, victim: Player) -> bool:
+        return True
+
+    def witch_target(self, game: Game, witch: Player) -> Optional[Player]:
+        # Keep the poison until the table is small enough for it to matter
+        if len(game.alive_players) > 4:
+            return None
+        return super().witch_target(game, witch)
+
+    def hunter_target(self, game: Game, hunter: Player) -> Optional[Player]:
+        leaders = self._leaders(game, hunter)
+        if leaders:
+            return self.rng.choice(leaders)
+        return super().hunter_target(game, hunter)
+
+    def day_vote(self, game: Game, voter: Player) -> Player:
+        leaders = self._leaders(game, voter)
+        if leaders:
+            return self.rng.choice(leaders)
+        return super().day_vote(game, voter)
+
+    def day_votes(
+        self, game: Game, voters: List[Player]
+    ) -> List[Tuple[Player, Player]]:
+        # Everyone picks a target before anyone votes, then bandwagons on the
+        # plurality of those picks
+        pick = super().day_vote
+        picks = [(voter, pick(game, voter)) for voter in voters]
+        tally: Dict[str, int] = {}
+        for _, target in picks:
+            tally[target.sid] = tally.get(target.sid, 0) + 1
+        for target_sid in game.get_top_voted_players():
+            tally[target_sid] = tally.get(target_sid, 0) + 1
+        if not tally:
+            return picks
+        top = max(tally.values())
+        leaders = [game.get_player(sid) for sid, n in tally.items() if n == top]
+        ballots = []
+        for voter, own_pick in picks:
+            choices = [p for p in leaders if p.sid != voter.sid]
+            ballots.append((voter, self.rng.choice(choices) if choices else own_pick))
+        return ballots
+
+    @staticmethod
+    def _leaders(game: Game, voter: Player) -> List[Player]:
+        return [
+            game.get_player(sid)
+            for sid in game.get_top_voted_players()
+            if sid != voter.sid and game.get_player(sid).is_alive
+        ]
+
+
+class RoleAwarePolicy(HeuristicPolicy):
+    """
+    Plays its own role. Wolves know each other, the village only knows what
+    the seer has seen; nobody reads roles they could not know.
+    """
+
+    def __init__(self, rng: random.Random):
+        super().__init__(rng)
+        self.seen: Dict[str, PlayerRole] = {}  # seen by the seer: sid -> role
+
+    def witch_heals(self, game: Game, victim: Player) -> bool:
+        return self.seen.get(victim.sid) != PlayerRole.WEREWOLF
+
+    def witch_target(self, game: Game, witch: Player) -> Optional[Player]:
+        wolves = self._known_wolves(game)
+        return self.rng.choice(wolves) if wolves else None
+
+    def seer_target(self, game: Game, seer: Player) -> Optional[Player]:
+        unseen = [
+            p
+            for p in game.alive_players.values()
+            if p.sid != seer.sid and p.sid not in self.seen
+        ]
+        if unseen:
+            return self.rng.choice(unseen)
+        return super().seer_target(game, seer)
+
+    def seer_saw(self, seer: Player, target: Player):
+        self.seen[target.sid] = target.role
+
+    def hunter_target(self, game: Game, hunter: Player) -> Optional[Player]:
+        wolves = self._known_wolves(game)
+        if wolves:
+            return self.rng.choice(wolves)
+        return super().hunter_target(game, hunter)
+
+    def day_vote(self, game: Game, voter: Player) -> Player:
+        if voter.role == PlayerRole.WEREWOLF:
+            # Follow the table unless it is going after the pack
+            leaders = [
+                p for p in self._leaders(game, voter) if p.role != PlayerRole.WEREWOLF
+            ]
+            if leaders:
+                return self.rng.choice(leaders)
+            return self.werewolf_target(game) or voter
+        wolves = self._known_wolves(game)
+        if wolves:
+            return self.rng.choice(wolves)
+        return super().day_vote(game, voter)
+
+    def day_votes(
+        self, game: Game, voters: List[Player]
+    ) -> List[Tuple[Player, Player]]:
+        return [(voter, self.day_vote(game, voter)) for voter in voters]
+
+    def _known_wolves(self, game: Game) -> List[Player]:
+        return [
+            game.get_player(sid)
+            for sid, role in self.seen.items()
+            if role == PlayerRole.WEREWOLF and game.get_player(sid).is_alive
+        ]
+
+
+POLICIES = {
+    "random": RandomPolicy,
+    "heuristic": HeuristicPolicy,
+    "role_aware": RoleAwarePolicy,
+}
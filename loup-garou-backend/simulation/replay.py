@@ -0,0 +1,161 @@
+"""
+Deterministic replay of recorded games.
+
+A recording (see server/recording.py) holds a room's initial state, including
+its RNG, and every event its players sent. Replaying feeds the events to the
+real GameEvents handlers, Game and SegmentManager with a null emitter and
+instant narration, so a game that took an hour replays in milliseconds. After
+each event whose state was recorded, the replayed room is compared with it.
+
+Replay a single game or a whole directory as a regression suite:
+
+    python -m simulation.replay recordings/
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from segments.audio import SilentAudio
+from server.dedup import split_seq
+from server.events import GameEvents
+from server.persistence import NullEmitter
+from server.rooms import RoomRegistry
+
+
+@dataclass
+class Recording:
+    path: str
+    room_id: str
+    initial_state: dict
+    events: List[Tuple[int, str, str, list]] = field(default_factory=list)
+    # seq -> last state recorded after the event with that seq
+    states: Dict[int, dict] = field(default_factory=dict)
+    ended: bool = False
+
+
+@dataclass
+class ReplayResult:
+    path: str
+    events: int
+    seconds: float
+    mismatches: List[Tuple[int, List[str]]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches
+
+
+def load_recording(path: str) -> Recording:
+    recording = None
+    with open(path) as lines:
+        for line in lines:
+            entry = json.loads(line)
+            if entry.get("end"):
+                recording.ended = True
+            elif "state" in entry and recording is None:
+                recording = Recording(path, entry["room"], entry["state"])
+            elif "state" in entry:
+                recording.states[entry["seq"]] = entry["state"]
+            else:
+                recording.events.append(
+                    (entry["seq"], entry["event"], entry["sid"], entry["args"])
+                )
+    if recording is None:
+        raise ValueError(f"{path} has no initial state")
+    return recording
+
+
+def diff_states(expected, actual, path="", limit=10) -> List[str]:
+    """Paths where two states differ, at most `limit` of them."""
+    if type(expected) is not type(actual):
+        return [path or "/"]
+    if isinstance(expected, dict):
+        diffs = []
+        for key in sorted(set(expected) | set(actual), key=str):
+            if key not in expected or key not in actual:
+                diffs.append(f"{path}/{key}")
+            else:
+                diffs += diff_states(expected[key], actual[key], f"{path}/{key}", limit)
+            if len(diffs) >= limit:
+                break
+        return diffs[:limit]
+    if isinstance(expected, list):
+        if len(expected) != len(actual):
+            return [path or "/"]
+        diffs = []
+        for i, (a, b) in enumerate(zip(expected, actual)):
+            diffs += diff_states(a, b, f"{path}/{i}", limit)
+            if len(diffs) >= limit:
+                break
+        return diffs[:limit]
+    return [] if expected == actual else [path or "/"]
+
+
+def replay(recording: Recording) -> ReplayResult:
+    """Re-run a recording and compare the room with every recorded state."""
+    emitter = NullEmitter()
+    rooms = RoomRegistry(emitter, audio=SilentAudio())
+    events = GameEvents(rooms, None, emitter)
+    events.define_handlers()
+    room = rooms.get_or_create(recording.room_id)
+    room.load_state(recording.initial_state)
+
+    result = ReplayResult(recording.path, len(recording.events), 0.0)
+    start = time.perf_counter()
+    for seq, event, sid, args in recording.events:
+        args, client_seq = split_seq(tuple(args))
+        if client_seq is not None:
+            events.accept_seq(sid, event, client_seq, room)
+        try:
+            events.handlers[event](sid, *args)
+        except Exception as e:
+            result.mismatches.append((seq, [f"{event} raised {e!r}"]))
+        expected = recording.states.get(seq)
+        if expected is not None:
+            diffs = diff_states(expected, room.to_state())
+            if diffs:
+                result.mismatches.append((seq, diffs))
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def replay_directory(directory: str) -> List[ReplayResult]:
+    return [
+        replay(load_recording(path))
+        for path in sorted(glob.glob(os.path.join(directory, "*.jsonl")))
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("paths", nargs="+", help="Recordings or directories")
+    args = parser.parse_args(argv)
+
+    results = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            results += replay_directory(path)
+        else:
+            results.append(replay(load_recording(path)))
+
+    for result in results:
+        status = "ok" if result.ok else "MISMATCH"
+        print(
+            f"{status:>8} {result.events:>6} events {result.seconds * 1e3:>8.2f} ms"
+            f"  {result.path}"
+        )
+        for seq, diffs in result.mismatches[:3]:
+            print(f"{'':>10} after seq {seq}: {', '.join(diffs)}")
+    failed = sum(not r.ok for r in results)
+    print(f"{len(results) - failed}/{len(results)} recordings replayed identically")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+import pytest
+
+from segments.audio import SilentAudio
+from server.events import GameEvents
+from server.persistence import NullEmitter
+from server.rooms import RoomRegistry
+
+
+class RecordingEmitter(NullEmitter):
+    """Emitter that keeps every emit as (event, data, to)."""
+
+    def __init__(self):
+        super().__init__()
+        self.emitted = []
+
+    def emit(self, event, data=None, to=None, **kwargs):
+        self.emitted.append((event, data, to))
+
+    def events_to(self, sid):
+        return [(event, data) for event, data, to in self.emitted if to == sid]
+
+
+class Server:
+    """The game handlers without a transport, fed through their dispatcher."""
+
+    def __init__(self, store=None):
+        self.emitter = RecordingEmitter()
+        self.rooms = RoomRegistry(self.emitter, audio=SilentAudio(), store=store)
+        self.events = GameEvents(self.rooms, None, self.emitter)
+        self.events.define_handlers()
+
+    def send(self, event, sid, *args):
+        handler = self.events.handlers[event]
+        return self.events.dispatcher(event, handler)(sid, *args)
+
+
+@pytest.fixture
+def make_server():
+    return Server
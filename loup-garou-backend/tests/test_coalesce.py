@@ -0,0 +1,85 @@
+from server.coalesce import SelectionCoalescer
+
+
+class FakeLoop:
+    """Clock and `schedule` for the coalescer; callbacks run on `run`."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.timers = []  # (due, callback)
+
+    def clock(self):
+        return self.now
+
+    def schedule(self, delay, callback):
+        self.timers.append((self.now + delay, callback))
+
+    def run(self, seconds):
+        end = self.now + seconds
+        while True:
+            due = [t for t in self.timers if t[0] <= end]
+            if not due:
+                break
+            timer = min(due, key=lambda t: t[0])
+            self.timers.remove(timer)
+            self.now = max(self.now, timer[0])
+            timer[1]()
+        self.now = end
+
+
+def make_coalescer(**options):
+    loop = FakeLoop()
+    sent = []
+    coalescer = SelectionCoalescer(
+        sent.append, loop.schedule, clock=loop.clock, **options
+    )
+    return coalescer, loop, sent
+
+
+def test_latest_update_per_sender_is_sent_once_per_window():
+    coalescer, loop, sent = make_coalescer(window=0.05)
+    coalescer.submit("wolf1", {"pick": 1})
+    coalescer.submit("wolf1", {"pick": 2})
+    coalescer.submit("wolf2", {"pick": 7})
+    assert sent == []
+    loop.run(0.05)
+    assert sent == [{"pick": 2}, {"pick": 7}]
+
+
+def test_without_a_window_updates_are_sent_right_away():
+    coalescer, _, sent = make_coalescer(window=0)
+    coalescer.submit("wolf1", {"pick": 1})
+    assert sent == [{"pick": 1}]
+
+
+def test_rate_limited_updates_are_held_and_the_latest_is_delivered():
+    coalescer, loop, sent = make_coalescer(window=0, rate=10.0, burst=2)
+    results = [coalescer.submit("wolf1", {"pick": i}) for i in range(5)]
+    assert results == [True, True, False, False, False]
+    assert sent == [{"pick": 0}, {"pick": 1}]
+    loop.run(1.0)
+    assert sent[-1] == {"pick": 4}
+    assert len(sent) == 3
+    assert not coalescer.held
+
+
+def test_a_new_update_replaces_the_held_one():
+    coalescer, loop, sent = make_coalescer(window=0.05, rate=10.0, burst=1)
+    coalescer.submit("wolf1", {"pick": 1})
+    coalescer.submit("wolf1", {"pick": 2})
+    loop.run(0.05)
+    # The window closed before wolf1 earned a token back
+    assert sent == [{"pick": 1}]
+    loop.run(0.02)
+    coalescer.submit("wolf1", {"pick": 3})
+    loop.run(1.0)
+    assert sent == [{"pick": 1}, {"pick": 3}]
+
+
+def test_forget_drops_held_updates():
+    coalescer, loop, sent = make_coalescer(window=0, rate=10.0, burst=1)
+    coalescer.submit("wolf1", {"pick": 1})
+    coalescer.submit("wolf1", {"pick": 2})
+    coalescer.forget("wolf1")
+    loop.run(1.0)
+    assert sent == [{"pick": 1}]
@@ -0,0 +1,83 @@
+from core.death_manager import DeathManager
+from core.death_types import DeathTrigger
+from core.game import Game
+from core.roles import PlayerRole
+
+
+def make_game(*roles):
+    """A game with one player per role, named and seated as p0, p1, ..."""
+    game = Game(seed=1)
+    for i, role in enumerate(roles):
+        game.set_player_role(game.add_player(f"p{i}", f"p{i}"), role)
+    return game
+
+
+def test_killing_a_lover_kills_their_partner():
+    game = make_game(PlayerRole.VILLAGER, PlayerRole.SEER, PlayerRole.VILLAGER)
+    game.set_lovers(game.get_player("p0"), game.get_player("p1"))
+    deaths = DeathManager(game)
+    deaths.queue_death("p0", DeathTrigger.WEREWOLF_KILL)
+    assert deaths.resolve()
+    assert [(e.player_sid, e.trigger) for e in deaths.resolved] == [
+        ("p0", DeathTrigger.WEREWOLF_KILL),
+        ("p1", DeathTrigger.LOVER_DEATH),
+    ]
+    assert set(game.alive_players) == {"p2"}
+    assert game.get_player("p1").death_cause == DeathTrigger.LOVER_DEATH.value
+
+
+def test_a_player_is_only_queued_once():
+    game = make_game(PlayerRole.VILLAGER, PlayerRole.VILLAGER)
+    deaths = DeathManager(game)
+    assert deaths.queue_death("p0", DeathTrigger.WEREWOLF_KILL)
+    assert not deaths.queue_death("p0", DeathTrigger.WITCH_KILL)
+    assert deaths.resolve()
+    assert not deaths.queue_death("p0", DeathTrigger.VILLAGE_VOTE)
+    assert len(deaths.resolved) == 1
+
+
+def test_the_hunter_pauses_resolution_until_revenge():
+    game = make_game(PlayerRole.HUNTER, PlayerRole.VILLAGER, PlayerRole.VILLAGER)
+    deaths = DeathManager(game)
+    deaths.queue_death("p0", DeathTrigger.VILLAGE_VOTE)
+    deaths.queue_death("p1", DeathTrigger.WITCH_KILL)
+    assert not deaths.resolve()
+    assert deaths.awaiting_hunter == "p0"
+    assert "p1" in game.alive_players
+    # Still paused until the hunter has chosen
+    assert not deaths.resolve()
+
+    deaths.hunter_revenge("p2")
+    assert deaths.resolve()
+    assert [e.player_sid for e in deaths.resolved] == ["p0", "p1", "p2"]
+    assert deaths.resolved[-1].trigger == DeathTrigger.HUNTER_REVENGE
+    assert not game.alive_players
+
+
+def test_hunter_lover_chain():
+    game = make_game(PlayerRole.VILLAGER, PlayerRole.HUNTER, PlayerRole.VILLAGER)
+    game.set_lovers(game.get_player("p0"), game.get_player("p1"))
+    deaths = DeathManager(game)
+    deaths.queue_death("p0", DeathTrigger.WEREWOLF_KILL)
+    assert not deaths.resolve()
+    assert deaths.awaiting_hunter == "p1"
+    deaths.hunter_pass()
+    assert deaths.resolve()
+    assert [e.player_sid for e in deaths.resolved] == ["p0", "p1"]
+    assert set(game.alive_players) == {"p2"}
+
+
+def test_state_round_trip_while_waiting_on_the_hunter():
+    game = make_game(PlayerRole.HUNTER, PlayerRole.VILLAGER, PlayerRole.VILLAGER)
+    deaths = DeathManager(game)
+    deaths.queue_death("p0", DeathTrigger.WEREWOLF_KILL)
+    deaths.queue_death("p1", DeathTrigger.WITCH_KILL)
+    deaths.resolve()
+
+    restored = DeathManager(game)
+    restored.load_state(deaths.to_state())
+    assert restored.awaiting_hunter == "p0"
+    restored.hunter_revenge("p1")
+    assert restored.resolve()
+    assert [e.player_sid for e in restored.resolved] == ["p1"]
+    assert restored.resolved[0].trigger == DeathTrigger.WITCH_KILL
@@ -0,0 +1,73 @@
+from server.dedup import SequenceWindow, split_seq
+
+
+def test_split_seq():
+    assert split_seq(({"name": "a"}, {"seq": 3})) == (({"name": "a"},), 3)
+    assert split_seq(({"name": "a"},)) == (({"name": "a"},), None)
+    assert split_seq(({"seq": True},)) == (({"seq": True},), None)
+
+
+def test_duplicates_and_late_numbers_are_dropped():
+    window = SequenceWindow(size=8)
+    assert window.accept("a", 1)
+    assert window.accept("a", 3)
+    assert not window.accept("a", 3)
+    # Out of order but inside the window
+    assert window.accept("a", 2)
+    assert not window.accept("a", 2)
+    assert window.accept("a", 20)
+    # More than `size` below the highest number
+    assert not window.accept("a", 12)
+    assert window.accept("a", 13)
+    assert not window.accept("a", 0)
+
+
+def test_senders_have_their_own_window():
+    window = SequenceWindow()
+    assert window.accept("a", 1)
+    assert window.accept("b", 1)
+    window.forget("a")
+    assert window.accept("a", 1)
+    assert not window.accept("b", 1)
+
+
+def test_state_round_trip():
+    window = SequenceWindow()
+    window.accept("a", 5)
+    window.accept("a", 3)
+    restored = SequenceWindow()
+    restored.load_state(window.to_state())
+    assert not restored.accept("a", 5)
+    assert not restored.accept("a", 3)
+    assert restored.accept("a", 4)
+
+
+def test_window_survives_a_reconnect(make_server):
+    server = make_server()
+    for i in range(6):
+        server.send("add_player", f"c{i}", {"name": f"p{i}"}, {"seq": 1})
+
+    def snapshots():
+        sent = server.emitter.events_to("c0")
+        return sum(1 for event, _ in sent if event == "player_list_snapshot")
+
+    server.send("request_player_list", "c0", {"seq": 2})
+    assert snapshots() == 1
+
+    # The seat is kept across the disconnect and taken back on a new sid
+    server.send("disconnect", "c0")
+    server.send("rejoin", "n0", {"sid": "c0"})
+    server.send("request_player_list", "n0", {"seq": 2})
+    assert snapshots() == 1
+    server.send("request_player_list", "n0", {"seq": 3})
+    assert snapshots() == 2
+
+
+def test_resent_joins_are_dropped(make_server):
+    server = make_server()
+    server.send("add_player", "c0", {"name": "p0"}, {"seq": 1})
+    room = server.rooms.get("default")
+    version = room.game.player_list.version
+    server.send("add_player", "c0", {"name": "p0"}, {"seq": 1})
+    assert room.game.player_list.version == version
+    assert len(room.game.players) == 1
@@ -0,0 +1,45 @@
+from core.roles import PlayerRole
+from server.persistence import GameStore, restore_rooms
+
+
+def test_journal_restore_round_trip(make_server, tmp_path):
+    path = str(tmp_path / "state.db")
+    store = GameStore(path)
+    server = make_server(store)
+    for i in range(6):
+        server.send("add_player", f"c{i}", {"name": f"p{i}"}, {"seq": 1})
+    room = server.rooms.get("default")
+    cupid = room.game.get_player_by_role(PlayerRole.CUPID)
+    server.send(
+        "cupidon_selection_complete", cupid.sid, [{"sid": "c0"}, {"sid": "c1"}]
+    )
+    # Journaled after the lovers' snapshot, so it is replayed on restore
+    server.send("lover_alert_closed", "c0", {"seq": 2})
+    assert store.flush(5)
+    snapshot, entries = store.load()["default"]
+    assert [event for _, event, _, _ in entries] == ["lover_alert_closed"]
+
+    # A new process on the same database
+    store = GameStore(path)
+    restarted = make_server(store)
+    assert restore_rooms(store, restarted.rooms, restarted.events) == 1
+    restored = restarted.rooms.get("default")
+    assert restored.game.to_state() == room.game.to_state()
+    assert [p.sid for p in restored.game.get_lovers()] == ["c0", "c1"]
+    assert restored.lover_alerts_closed == {"c0"}
+    assert restored.segments.awaiting == "lovers"
+    assert restored.awaiting_rejoin == {f"c{i}" for i in range(6)}
+
+    for i in range(6):
+        restarted.send("rejoin", f"n{i}", {"sid": f"c{i}"})
+    assert not restored.awaiting_rejoin
+    # Both lovers are shown their alert again
+    for sid in ("c0", "c1"):
+        assert ("lover_can_close", None) in restarted.emitter.events_to(sid)
+    assert not restored.lover_alerts_closed
+    # Resent from before the crash: already handled
+    restarted.send("lover_alert_closed", "n0", {"seq": 2})
+    assert not restored.lover_alerts_closed
+    restarted.send("lover_alert_closed", "n0", {"seq": 3})
+    restarted.send("lover_alert_closed", "n1", {"seq": 2})
+    assert restored.segments.awaiting == "seer"
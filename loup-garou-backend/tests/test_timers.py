@@ -0,0 +1,92 @@
+from server.timers import TimerWheel
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.scheduled = []  # (delay, callback) handed to `schedule`
+
+    def __call__(self):
+        return self.now
+
+    def schedule(self, delay, callback):
+        self.scheduled.append((delay, callback))
+
+
+def make_wheel(**options):
+    clock = FakeClock()
+    return TimerWheel(clock.schedule, tick=0.1, clock=clock, **options), clock
+
+
+def test_deadline_is_rounded_up_to_a_tick():
+    wheel, _ = make_wheel()
+    fired = []
+    wheel.call_later(0.35, lambda: fired.append(True))
+    assert wheel.advance(3) == 0
+    assert wheel.advance(4) == 1
+    assert fired == [True]
+    assert len(wheel) == 0
+
+
+def test_timers_cascade_down_to_fire_on_their_tick():
+    # 4 slots per level: 5 ticks is on level 1, 17, 40 and 63 on level 2
+    wheel, _ = make_wheel(slots=4, levels=3)
+    fired = {}
+    for ticks in (1, 5, 17, 40, 63):
+        wheel.call_later(
+            ticks * 0.1, lambda t=ticks: fired.setdefault(t, wheel.current)
+        )
+    for tick in range(1, 64):
+        wheel.advance(tick)
+    assert fired == {1: 1, 5: 5, 17: 17, 40: 40, 63: 63}
+
+
+def test_delays_beyond_the_span_are_capped():
+    wheel, _ = make_wheel(slots=4, levels=2)
+    fired = []
+    wheel.call_later(100.0, lambda: fired.append(True))
+    assert wheel.advance(14) == 0
+    assert wheel.advance(15) == 1
+
+
+def test_cancelled_timers_do_not_fire():
+    wheel, _ = make_wheel(slots=4, levels=3)
+    fired = []
+    kept = wheel.call_later(2.0, lambda: fired.append("kept"))
+    cancelled = wheel.call_later(2.0, lambda: fired.append("cancelled"))
+    cancelled.cancel()
+    cancelled.cancel()
+    assert len(wheel) == 1
+    wheel.advance(20)
+    assert fired == ["kept"]
+    assert kept.cancelled and len(wheel) == 0
+
+
+def test_a_failing_callback_does_not_stop_the_others():
+    wheel, _ = make_wheel()
+    fired = []
+    wheel.call_later(0.1, lambda: 1 / 0)
+    wheel.call_later(0.1, lambda: fired.append(True))
+    assert wheel.advance(1) == 2
+    assert fired == [True]
+
+
+def test_ticks_are_only_scheduled_while_timers_are_armed():
+    wheel, clock = make_wheel()
+    wheel.call_later(0.2, lambda: None)
+    wheel.call_later(0.3, lambda: None)
+    assert len(clock.scheduled) == 1
+    while clock.scheduled:
+        delay, on_tick = clock.scheduled.pop(0)
+        clock.now += delay
+        on_tick()
+    assert len(wheel) == 0
+    assert not wheel.ticking
+    # Arming again after idling restarts the ticks from the current time
+    clock.now += 5.0
+    fired = []
+    wheel.call_later(0.1, lambda: fired.append(True))
+    assert len(clock.scheduled) == 1
+    clock.now += 0.1
+    clock.scheduled.pop()[1]()
+    assert fired == [True]
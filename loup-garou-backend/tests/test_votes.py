@@ -0,0 +1,66 @@
+from core.votes import VoteTally
+
+
+def test_leaders_follow_the_count():
+    tally = VoteTally()
+    tally.vote("a", "v1")
+    tally.vote("b", "v2")
+    tally.vote("b", "v3")
+    assert tally.leaders() == ["b"]
+    assert tally.counts == {"a": 1, "b": 2}
+
+
+def test_voting_again_moves_the_ballot():
+    tally = VoteTally()
+    tally.vote("a", "v1")
+    tally.vote("b", "v2")
+    tally.vote("b", "v1")
+    assert tally.counts == {"b": 2}
+    assert tally.leaders() == ["b"]
+
+
+def test_same_vote_twice_counts_once():
+    tally = VoteTally()
+    tally.vote("a", "v1")
+    tally.vote("a", "v1")
+    assert tally.counts == {"a": 1}
+
+
+def test_retracting_the_only_leader_vote_lowers_the_max():
+    tally = VoteTally()
+    tally.vote("a", "v1")
+    tally.vote("a", "v2")
+    tally.vote("b", "v3")
+    tally.retract("v1")
+    assert sorted(tally.leaders()) == ["a", "b"]
+    tally.retract("v2")
+    assert tally.leaders() == ["b"]
+    tally.retract("v3")
+    assert tally.leaders() == []
+    assert len(tally) == 0
+
+
+def test_retracting_without_a_ballot_is_a_no_op():
+    tally = VoteTally()
+    tally.vote("a", "v1")
+    tally.retract("v2")
+    assert tally.counts == {"a": 1}
+
+
+def test_anonymous_votes_always_add():
+    tally = VoteTally()
+    tally.vote("a")
+    tally.vote("a")
+    assert tally.counts == {"a": 2}
+
+
+def test_state_round_trip():
+    tally = VoteTally()
+    tally.vote("a", "v1")
+    tally.vote("b", "v2")
+    tally.vote("b", "v3")
+    restored = VoteTally()
+    restored.load_state(tally.to_state())
+    assert restored.leaders() == ["b"]
+    restored.retract("v2")
+    assert sorted(restored.leaders()) == ["a", "b"]
@@ -0,0 +1,57 @@
+import pytest
+
+from server.wire import FIELD_IDS, FIELDS, compact, decode_args, expand
+
+
+def test_compact_expand_round_trip():
+    payload = {
+        "players": [
+            {"name": "Alice", "sid": "a1", "role": "seer", "is_alive": True},
+            {"name": "Bob", "sid": "b2", "role": None, "is_alive": False},
+        ],
+        "version": 3,
+        "not_in_schema": {"message": "hi"},
+    }
+    packed = compact(payload)
+    assert packed[FIELD_IDS["players"]][0][FIELD_IDS["name"]] == "Alice"
+    assert "not_in_schema" in packed
+    assert expand(packed) == payload
+
+
+def test_tuples_come_back_as_lists():
+    assert expand(compact({"werewolves": ("a", "b")})) == {"werewolves": ["a", "b"]}
+
+
+def test_expand_keeps_integer_keys_outside_the_schema():
+    assert expand({len(FIELDS): 1, -1: 2, 0: "x"}) == {
+        len(FIELDS): 1,
+        -1: 2,
+        FIELDS[0]: "x",
+    }
+
+
+def test_decode_args_leaves_json_payloads_alone():
+    args = ({"name": "Alice"}, {"seq": 1})
+    assert decode_args(args) is args
+
+
+def test_decode_args_round_trip():
+    msgpack = pytest.importorskip("msgpack")
+    payload = {"vote": "b2", "room": "default", 999: True}
+    packed = msgpack.packb(compact(payload), use_bin_type=True)
+    assert decode_args((packed, {"seq": 4})) == (payload, {"seq": 4})
+
+
+def test_decode_args_rejects_garbage():
+    pytest.importorskip("msgpack")
+    with pytest.raises(Exception):
+        decode_args((b"\xc1",))
+
+
+def test_malformed_payloads_are_reported_to_the_sender(make_server):
+    pytest.importorskip("msgpack")
+    server = make_server()
+    server.send("vote_kill", "x", b"\xc1")
+    [(event, data)] = server.emitter.events_to("x")
+    assert event == "error"
+    assert data["message"].startswith("Malformed payload")
@@ -197,7 +197,6 @@ const GameInterface: React.FC = () => {
             onClose={() => {
               setIsInLove(false);
               socket.emit("lover_alert_closed");
-              socket.emit("lover_alert_closed"); // TODO: Remove this line this is for testing purposes since we only have one player
             }}
             loverName={loverName}
           />
@@ -76,7 +76,7 @@ const MockGameManager = () => {
     // Werewolf phase
     socket.on(
       "werewolf_wake_up",
-      (data: { message: string; other_werewolves: string[] }) => {
+      (data: { message: string; werewolves: string[] }) => {
         const werewolves = mockPlayers.filter((p) => p.role === "werewolf");
         werewolves.forEach((werewolf) => {
           setPendingActions((prev) => ({
@@ -14,7 +14,7 @@ export default function HomeScreen() {
 
   const handleJoinGame = () => {
     socket.emit("add_player", { name });
-    socket.on("player_data", (playerData) => {
+    socket.once("player_data", (playerData) => {
       router.push({
         pathname: "/(tabs)/waiting-room",
         params: { player: JSON.stringify(playerData) },
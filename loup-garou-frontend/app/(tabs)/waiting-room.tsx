@@ -133,9 +133,16 @@ const WaitingRoom = () => {
   }, [updatePlayers]);
 
   useEffect(() => {
-    socket.on("update_players_list", () => {
-      setUpdatePlayers(true);
-    });
+    const refreshPlayers = () => setUpdatePlayers(true);
+    socket.on("player_joined", refreshPlayers);
+    socket.on("player_left", refreshPlayers);
+    socket.on("player_updated", refreshPlayers);
+
+    return () => {
+      socket.off("player_joined", refreshPlayers);
+      socket.off("player_left", refreshPlayers);
+      socket.off("player_updated", refreshPlayers);
+    };
   }, []);
 
   const assignRole = (data: { role: string }) => {
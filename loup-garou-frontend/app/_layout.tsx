@@ -10,6 +10,8 @@ import { StatusBar } from "expo-status-bar";
 import { useEffect } from "react";
 
 import { useColorScheme } from "@/hooks/useColorScheme";
+// Plays the room's narration on whichever screen is showing
+import "@/utils/narration";
 
 // Prevent the splash screen from auto-hiding before asset loading is complete.
 SplashScreen.preventAutoHideAsync();
@@ -0,0 +1,25 @@
+import { Audio } from "expo-av";
+import { backendUrl } from "@/utils/config";
+import { socket } from "@/utils/sockets";
+
+// The server narrates each room through its players' phones: a `narration`
+// event names a clip it serves from memory at `url`, and the next one only
+// comes once `duration` seconds have passed (see segments/audio.py in the
+// backend).
+Audio.setAudioModeAsync({ playsInSilentModeIOS: true }).catch(() => {});
+
+socket.on("narration", async ({ url }) => {
+  try {
+    const { sound } = await Audio.Sound.createAsync(
+      { uri: `${backendUrl}${url}` },
+      { shouldPlay: true }
+    );
+    sound.setOnPlaybackStatusUpdate((status) => {
+      if (status.isLoaded && status.didJustFinish) {
+        sound.unloadAsync();
+      }
+    });
+  } catch (error) {
+    console.log("Narration playback error:", error);
+  }
+});
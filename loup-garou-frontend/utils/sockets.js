@@ -6,8 +6,42 @@ export const socket = io(backendUrl, {
   transports: ["websocket"],
 });
 
+// Every event carries a sequence number so the server can drop the ones the
+// client resends after a reconnect (see server/dedup.py in the backend).
+// Events sent while disconnected wait until the new connection has taken
+// back the player's seat with `rejoin`.
+let seq = 0;
+let playerSid = null; // the sid the server seated this player under
+const pending = [];
+const emit = socket.emit.bind(socket);
+socket.emit = (event, ...args) => {
+  const message = [event, ...args, { seq: ++seq }];
+  if (socket.connected) {
+    emit(...message);
+  } else {
+    pending.push(message);
+  }
+  return socket;
+};
+
+const flushPending = () => {
+  pending.splice(0).forEach((message) => emit(...message));
+};
+
+socket.on("player_data", (player) => {
+  if (playerSid === null && player.sid) {
+    playerSid = player.sid;
+  }
+});
+
 socket.on("connect", () => {
   console.log("Socket connected");
+  if (playerSid !== null && socket.id !== playerSid) {
+    // Acknowledged once the server has handled it
+    emit("rejoin", { sid: playerSid }, flushPending);
+  } else {
+    flushPending();
+  }
 });
 
 socket.on("connect_error", (error) => {